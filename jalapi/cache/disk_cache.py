@@ -0,0 +1,288 @@
+# disk_cache.py
+"""
+Persistent cache module for JALAPI.
+
+This module provides a small SQLite-backed key/value store with size-bounded
+LRU eviction, used to skip work whose inputs have not changed since an
+earlier run.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from jalapi.logging.log_setup import logger
+
+# Defaults used when the cache section of the config leaves them out
+DEFAULT_CACHE_PATH = ".jalapi_cache/cache.db"
+DEFAULT_MAX_SIZE_MB = 512
+
+# Reads whose LRU timestamps are buffered before being written in one transaction
+TOUCH_BATCH = 64
+
+
+def content_digest(*parts: Any) -> str:
+    """
+    Hash any mix of bytes, strings and JSON-serializable values into a hex key.
+
+    Args:
+        *parts (Any): The values that together identify a cache entry
+
+    Returns:
+        str: SHA-256 hex digest of the parts
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        elif not isinstance(part, (bytes, bytearray, memoryview)):
+            part = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def file_digest(filepath: str, block_size: int = 1 << 20) -> str:
+    """
+    Hash a file's contents without reading it into memory at once.
+
+    Args:
+        filepath (str): Path to the file to hash
+        block_size (int, optional): Bytes read per step. Defaults to 1 MB.
+
+    Returns:
+        str: SHA-256 hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    SQLite key/value store with least-recently-used eviction.
+
+    Entries live in namespaces (e.g. "results") so several caches can share one
+    database file. Values are stored zlib-compressed. Once the stored size goes
+    over max_bytes, the least recently read entries are dropped. The stored
+    size is kept as a running total next to the entries, so writes do not
+    scan the table, and the access times of reads are buffered and written
+    TOUCH_BATCH at a time (or with the next write, flush or close). The cache
+    is safe to share between threads and between processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_SIZE_MB * 1024 * 1024):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str, optional): Path to the SQLite database file
+            max_bytes (int, optional): Compressed size above which entries are evicted
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._touched: Dict[Tuple[str, str], float] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " accessed REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        # Running total of the stored size, seeded once for databases created without it
+        self._db.execute("CREATE TABLE IF NOT EXISTS totals (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._db.execute(
+            "INSERT OR IGNORE INTO totals (name, value)"
+            " SELECT 'size', COALESCE(SUM(size), 0) FROM entries"
+        )
+        self._db.commit()
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        """
+        Look up an entry and mark it as recently used.
+
+        The access time is buffered and written with later ones, see flush.
+
+        Args:
+            namespace (str): Namespace of the entry
+            key (str): Key of the entry
+
+        Returns:
+            Optional[bytes]: The stored value, or None on a miss
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched[(namespace, key)] = time.time()
+            if len(self._touched) >= TOUCH_BATCH:
+                self._write_touches()
+                self._db.commit()
+
+        return zlib.decompress(row[0])
+
+    def set(self, namespace: str, key: str, value: bytes) -> None:
+        """
+        Store an entry, evicting old entries if the cache grows too large.
+
+        Args:
+            namespace (str): Namespace of the entry
+            key (str): Key of the entry
+            value (bytes): Value to store
+        """
+        compressed = zlib.compress(value)
+        with self._lock:
+            # Updating the total first starts the write transaction, so no other
+            # process can change the replaced entry before it is counted
+            self._db.execute(
+                "UPDATE totals SET value = value + ? - COALESCE("
+                " (SELECT size FROM entries WHERE namespace = ? AND key = ?), 0) WHERE name = 'size'",
+                (len(compressed), namespace, key),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, size, accessed)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, compressed, len(compressed), time.time()),
+            )
+            self._write_touches()
+            self._evict()
+            self._db.commit()
+
+    def get_json(self, namespace: str, key: str) -> Optional[Any]:
+        """
+        Look up an entry stored with set_json.
+
+        Args:
+            namespace (str): Namespace of the entry
+            key (str): Key of the entry
+
+        Returns:
+            Optional[Any]: The decoded value, or None on a miss
+        """
+        value = self.get(namespace, key)
+        return None if value is None else json.loads(value)
+
+    def set_json(self, namespace: str, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            namespace (str): Namespace of the entry
+            key (str): Key of the entry
+            value (Any): Value to store
+        """
+        self.set(namespace, key, json.dumps(value).encode("utf-8"))
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """
+        Remove all entries, or all entries of one namespace.
+
+        Args:
+            namespace (Optional[str]): Namespace to clear. Defaults to every namespace.
+        """
+        with self._lock:
+            if namespace is None:
+                self._touched.clear()
+                self._db.execute("DELETE FROM entries")
+                self._db.execute("UPDATE totals SET value = 0 WHERE name = 'size'")
+            else:
+                self._touched = {entry: at for entry, at in self._touched.items() if entry[0] != namespace}
+                self._db.execute(
+                    "UPDATE totals SET value = value - ("
+                    " SELECT COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?) WHERE name = 'size'",
+                    (namespace,),
+                )
+                self._db.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            self._db.commit()
+
+    def size(self) -> int:
+        """
+        Get the compressed size of all stored entries.
+
+        Returns:
+            int: The running total of stored bytes
+        """
+        with self._lock:
+            return self._db.execute("SELECT value FROM totals WHERE name = 'size'").fetchone()[0]
+
+    def flush(self) -> None:
+        """Write the buffered access times of recent reads."""
+        with self._lock:
+            if self._touched:
+                self._write_touches()
+                self._db.commit()
+
+    def close(self) -> None:
+        """Write buffered access times and close the database connection."""
+        self.flush()
+        with self._lock:
+            self._db.close()
+
+    def _write_touches(self) -> None:
+        """Write the buffered access times in the current transaction."""
+        if not self._touched:
+            return
+        self._db.executemany(
+            "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+            [(at, namespace, key) for (namespace, key), at in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is back under 90% of max_bytes."""
+        total = self._db.execute("SELECT value FROM totals WHERE name = 'size'").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        rows = self._db.execute("SELECT namespace, key, size FROM entries ORDER BY accessed").fetchall()
+        for namespace, key, size in rows:
+            if total <= target:
+                break
+            self._db.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+            total -= size
+            evicted += 1
+
+        self._db.execute("UPDATE totals SET value = ? WHERE name = 'size'", (total,))
+        logger.debug(f"Evicted {evicted} cache entries")
+
+
+def open_cache(config: Dict[str, Any]) -> Optional[DiskCache]:
+    """
+    Open the cache described by the "cache" section of the configuration.
+
+    Args:
+        config (Dict[str, Any]): Configuration parameters for the analysis process
+
+    Returns:
+        Optional[DiskCache]: The cache, or None if caching is disabled
+    """
+    cache_config = config.get("cache", {})
+    if not cache_config.get("enabled", True):
+        return None
+
+    return DiskCache(
+        path=cache_config.get("path", DEFAULT_CACHE_PATH),
+        max_bytes=int(cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB) * 1024 * 1024),
+    )
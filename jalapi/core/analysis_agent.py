@@ -1,14 +1,52 @@
 # analysis_agent.py
 
+import copy
 import json
-from typing import List, Dict, Any
-import jsbeautifier
-
-from jalapi.models.models import Endpoint
-from jalapi.core.llm_analyzer import LLMAnalyzer
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from jalapi.models.models import AuthInfo, Endpoint, SourceModule, VendorRegion
+from jalapi.core.llm_analyzer import DEFAULT_CONCURRENCY, LLMAnalyzer
 from jalapi.core.regex_analyzer import RegexAnalyzer
-from jalapi.core.endpoint_processor import EndpointProcessor
+from jalapi.core.endpoint_processor import API_PATTERNS, EndpointProcessor
+from jalapi.cache.disk_cache import content_digest, file_digest, open_cache
 from jalapi.logging.log_setup import logger
+from jalapi.utils.bundle import split_bundle
+from jalapi.utils.line_index import LineIndex
+from jalapi.utils.reflow import (
+    DEFAULT_LONG_LINE,
+    DEFAULT_MIN_LONG_FRACTION,
+    REFLOW_VERSION,
+    is_minified,
+    reflow,
+)
+from jalapi.utils.source import MappedSource
+from jalapi.utils.sourcemap import load_source_map, original_sources, source_map_path
+from jalapi.utils.stats import add_stats
+from jalapi.utils.timing import StageTimer
+from jalapi.utils.vendor import DEFAULT_MAX_GAP, DEFAULT_MIN_MATCHES, open_vendor_database
+
+# LLM provider and model used unless the config says otherwise
+DEFAULT_PROVIDER = "anthropic"
+DEFAULT_MODEL = "claude-3-5-sonnet-20241022"
+
+# Files at least this large are memory-mapped unless the config says otherwise
+DEFAULT_MMAP_THRESHOLD_MB = 32
+
+# Factor applied to the confidence of regex findings inside known vendor libraries
+DEFAULT_VENDOR_REGEX_WEIGHT = 0.3
+
+# Fewest modules a file must split into to be analyzed module by module
+DEFAULT_MIN_MODULES = 2
+
+# Costliest chunks listed in the usage summary unless the config says otherwise
+DEFAULT_REPORT_TOP = 5
+
+# Bump when a pipeline change makes previously cached results stale
+RESULT_CACHE_VERSION = 7
 
 
 class JavaScriptAnalysisAgent:
@@ -24,14 +62,43 @@ class JavaScriptAnalysisAgent:
         logger.debug("Initializing JavaScript Analysis Agent")
         self.config = config
         self.regex = RegexAnalyzer()
-        self.llm = LLMAnalyzer("anthropic", "claude-3-5-sonnet-20241022")
+        llm_config = config.get("llm", {})
+        # Recording must send every request and replaying must answer every request from
+        # the cassette, so neither is served from the cache
+        cassette_mode = llm_config.get("cassette", {}).get("mode")
+        self.cache = open_cache(config) if cassette_mode not in ("record", "replay") else None
+        self.vendor = open_vendor_database(config)
+        self.llm = LLMAnalyzer(
+            llm_config.get("provider", DEFAULT_PROVIDER),
+            llm_config.get("model", DEFAULT_MODEL),
+            cache=self.cache,
+            regex=self.regex,
+            provider_options=llm_config.get("fake"),
+            cassette=llm_config.get("cassette"),
+        )
+        self._cache_fingerprint = self._get_cache_fingerprint()
+        self._beautify_stats: Dict[str, int] = {}
+        self._excluded_modules = 0
+        self.timer = StageTimer(enabled=False)
 
     def analyze(self, filepath: str) -> Dict[str, Any]:
         """
         Analyze a JavaScript file to find API endpoints.
         
         Performs analysis using both regex pattern matching and LLM-based analysis,
-        then combines and deduplicates the results.
+        then combines and deduplicates the results. The LLM stage runs in a
+        background thread so the CPU-bound regex stage overlaps its network
+        wait, making the critical path max(regex, llm) rather than their sum.
+        If the result cache holds an
+        entry for the same file contents and analysis settings, it is returned
+        without analyzing the file again. Bundles with a source map embedding
+        their original sources are analyzed one original source at a time
+        instead, with no beautification and line numbers relative to the
+        original files. Unless timings.enabled is false, the summary's
+        "timings" section reports the wall time, CPU time and throughput of
+        each stage and the latency of LLM requests. The "usage" section
+        reports the tokens and estimated cost of the LLM requests sent,
+        with the costliest chunks.
         
         Args:
             filepath (str): Path to the JavaScript file to analyze
@@ -39,56 +106,613 @@ class JavaScriptAnalysisAgent:
         Returns:
             Dict[str, Any]: Analysis results containing source, summary, and endpoints
         """
-        # Load JavaScript
-        js_content = self._load_javascript(filepath)
-
-        # Find endpoints using regex
-        regex_endpoints = self.regex.discover_endpoints(js_content)
+        self.timer = self.llm.timer = StageTimer(self.config.get("timings", {}).get("enabled", True))
+        with self.timer.stage("total", os.path.getsize(filepath)):
+            results = self._analyze(filepath)
+        if self.cache is not None:
+            # Record which entries this file read, for least-recently-used eviction
+            self.cache.flush()
+
+        if self.timer.enabled:
+            results["summary"]["timings"] = self.timer.report()
+        return results
+
+    def _analyze(self, filepath: str) -> Dict[str, Any]:
+        """
+        Analyze a JavaScript file, measuring its stages with self.timer.
+        
+        Args:
+            filepath (str): Path to the JavaScript file to analyze
+            
+        Returns:
+            Dict[str, Any]: Analysis results containing source, summary, and endpoints
+        """
+        # Return stored results for unchanged files
+        cache_key = None
+        if self.cache is not None:
+            with self.timer.stage("cache_lookup", os.path.getsize(filepath)):
+                map_path = source_map_path(filepath)
+                cache_key = content_digest(
+                    file_digest(filepath),
+                    file_digest(map_path) if map_path is not None else None,
+                    self._cache_fingerprint,
+                )
+                cached = self.cache.get_json("results", cache_key)
+            if cached is not None:
+                logger.info(f"Using cached results for {filepath}")
+                cached["source"] = filepath
+                cached["summary"]["cache"] = {"result_hits": 1, "result_misses": 0}
+                return cached
+
+        self._beautify_stats = {}
+        module_stats = {}
+        layout = None
+        modules = self._load_source_modules(filepath)
+        if modules is None:
+            # Load JavaScript
+            source = self._load_javascript(filepath)
+            if isinstance(source, str):
+                layout, modules = self._split_bundle(source)
+
+        if modules is not None:
+            found, llm_stats, llm_cache_stats, module_stats, vendor_stats, usage = self._analyze_modules(
+                modules
+            )
+        else:
+            if isinstance(source, MappedSource):
+                js_content, encoding = source.data, source.encoding
+            else:
+                js_content, encoding = source, "utf-8"
 
-        # Find endpoints using LLM
-        llm_endpoints = self.llm.analyze_endpoints(js_content, self.config)
+            try:
+                found, (regex_time, llm_time, wall_time), vendor_stats = self._discover_endpoints(
+                    js_content, encoding, self.llm, self.config
+                )
+            finally:
+                if isinstance(source, MappedSource):
+                    source.close()
+            logger.info(
+                f"Stage times - regex: {regex_time:.2f}s, llm: {llm_time:.2f}s, "
+                f"overlapped wall time: {wall_time:.2f}s"
+            )
+            llm_stats, llm_cache_stats = dict(self.llm.run_stats), dict(self.llm.cache_stats)
+            usage = {**self.llm.usage_stats, "chunks": list(self.llm.chunk_usage)}
 
         # Combine endpoints (deduplicating identical paths)
-        all_endpoints = self._deduplicate_endpoints(regex_endpoints + llm_endpoints)
+        with self.timer.stage("dedup"):
+            all_endpoints = self._deduplicate_endpoints(found)
 
         # Generate basic stats
         stats = self._generate_stats(all_endpoints)
+        stats["llm"] = llm_stats
+        if vendor_stats:
+            stats["vendor"] = vendor_stats
+        if layout is not None:
+            stats["bundle"] = {
+                "layout": layout,
+                "modules": sum(module.module_id is not None for module in modules),
+                "runtime_pieces": sum(module.module_id is None for module in modules),
+            }
+        elif modules is not None:
+            stats["source_map"] = {
+                "modules": len(modules),
+                "excluded_modules": self._excluded_modules,
+            }
 
-        return {
-            "source": filepath,
-            "summary": stats,
-            "endpoints": [self._endpoint_to_dict(ep) for ep in all_endpoints],
-        }
+        with self.timer.stage("serialize"):
+            results = {
+                "source": filepath,
+                "summary": stats,
+                "endpoints": [self._endpoint_to_dict(ep) for ep in all_endpoints],
+            }
+            if cache_key is not None:
+                self.cache.set_json("results", cache_key, results)
+
+        if cache_key is not None:
+            results["summary"]["cache"] = {
+                "result_hits": 0,
+                "result_misses": 1,
+                **self._beautify_stats,
+                **module_stats,
+                **llm_cache_stats,
+            }
+        results["summary"]["usage"] = self._usage_summary(usage)
+
+        return results
+
+    def _usage_summary(self, usage: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the summary's "usage" section from the LLM token usage of a file.
+        
+        Only the llm.pricing.report_top costliest chunks are listed.
+        
+        Args:
+            usage (Dict[str, Any]): Summed usage_stats of the LLM analyzers, with the
+                chunk_usage records of every chunk sent as "chunks"
+            
+        Returns:
+            Dict[str, Any]: The token and cost totals, with the costliest chunks as "top_chunks"
+        """
+        report_top = self.config.get("llm", {}).get("pricing", {}).get("report_top", DEFAULT_REPORT_TOP)
+        chunks = sorted(
+            usage.pop("chunks", []),
+            key=lambda chunk: (chunk["cost_usd"], chunk["input_tokens"] + chunk["output_tokens"]),
+            reverse=True,
+        )
+        summary = {**usage, "cost_usd": round(usage.get("cost_usd", 0.0), 6)}
+        summary["top_chunks"] = [
+            {**chunk, "cost_usd": round(chunk["cost_usd"], 6)} for chunk in chunks[:report_top]
+        ]
+        return summary
+
+    def _discover_endpoints(
+        self,
+        js_content: Union[str, bytes],
+        encoding: str,
+        llm: LLMAnalyzer,
+        config: Dict[str, Any],
+    ) -> Tuple[List[Endpoint], Tuple[float, float, float], Dict[str, Any]]:
+        """
+        Find endpoints in one piece of code with both the regex and LLM stages.
+        
+        The LLM stage runs in a background thread so the CPU-bound regex stage
+        overlaps its network wait. The LLM analyzer's run_stats and cache_stats
+        describe this call afterwards. With a vendor fingerprint database,
+        regions recognized as third-party libraries are left out of LLM
+        requests, and regex findings inside them are down-weighted.
+        
+        Args:
+            js_content (Union[str, bytes]): The code, as text or bytes-like content
+            encoding (str): Encoding of bytes-like content
+            llm (LLMAnalyzer): The LLM analyzer to use
+            config (Dict[str, Any]): Configuration passed to the LLM analyzer
+            
+        Returns:
+            Tuple[List[Endpoint], Tuple[float, float, float], Dict[str, Any]]: Regex findings
+                followed by LLM findings, not yet deduplicated, the regex, LLM and overall
+                wall times, and the number of vendor regions and their bytes per library
+        """
+        stages_start = time.perf_counter()
+
+        # Index line offsets once for every stage
+        line_index = LineIndex(js_content)
+
+        vendor_config = self.config.get("vendor", {})
+        vendor_regions: List[VendorRegion] = []
+        if self.vendor is not None:
+            with self.timer.stage("vendor", len(js_content)):
+                vendor_regions = self.vendor.find_regions(
+                    js_content,
+                    min_matches=vendor_config.get("min_matches", DEFAULT_MIN_MATCHES),
+                    max_gap=vendor_config.get("max_gap", DEFAULT_MAX_GAP),
+                )
+
+        # The LLM stage starts first and runs while the regex stage uses the CPU.
+        # Leaving the with block waits for it, so the content stays valid throughout.
+        with ThreadPoolExecutor(max_workers=1) as stage_pool:
+            # Find endpoints using LLM
+            llm_future = stage_pool.submit(
+                self._timed,
+                "llm",
+                len(js_content),
+                llm.analyze_endpoints,
+                js_content,
+                config,
+                line_index,
+                encoding,
+                vendor_regions,
+            )
+
+            # Find endpoints using regex
+            regex_endpoints, regex_time = self._timed(
+                "regex", len(js_content), self.regex.discover_endpoints, js_content, line_index, encoding
+            )
+
+            llm_endpoints, llm_time = llm_future.result()
+
+        vendor_stats: Dict[str, Any] = {}
+        if vendor_regions:
+            weight = vendor_config.get("regex_weight", DEFAULT_VENDOR_REGEX_WEIGHT)
+            self._down_weight_vendor_findings(regex_endpoints, vendor_regions, line_index, weight)
+            library_bytes: Dict[str, int] = {}
+            for region in vendor_regions:
+                library_bytes[region.library] = library_bytes.get(region.library, 0) + region.end - region.start
+            vendor_stats = {"regions": len(vendor_regions), "bytes": library_bytes}
+
+        times = (regex_time, llm_time, time.perf_counter() - stages_start)
+        return regex_endpoints + llm_endpoints, times, vendor_stats
+
+    @staticmethod
+    def _down_weight_vendor_findings(
+        endpoints: List[Endpoint], regions: List[VendorRegion], line_index: LineIndex, weight: float
+    ) -> None:
+        """
+        Lower the confidence of findings on lines entirely inside vendor regions.
+        
+        Lines only partly inside a region, such as the single line of a
+        minified file, also hold application code and are left alone.
+        
+        Args:
+            endpoints (List[Endpoint]): Regex findings, updated in place
+            regions (List[VendorRegion]): The vendor regions of the analyzed code
+            line_index (LineIndex): Line index of the analyzed code
+            weight (float): Factor applied to the confidence of findings in the regions
+        """
+        vendor_lines = []
+        for region in regions:
+            first = line_index.line_of(region.start)
+            if line_index.line_start(first) < region.start:
+                first += 1
+            last = line_index.line_of(region.end)
+            line_end = line_index.length
+            if last < line_index.line_count:
+                line_end = line_index.line_start(last + 1) - 1
+            if line_end > region.end:
+                last -= 1
+            if first <= last:
+                vendor_lines.append((first, last))
+
+        for endpoint in endpoints:
+            line = endpoint.line_number
+            if line is not None and any(first <= line <= last for first, last in vendor_lines):
+                endpoint.confidence = round(endpoint.confidence * weight, 2)
+
+    def _load_source_modules(self, filepath: str) -> Optional[List[SourceModule]]:
+        """
+        Load the original source files of a bundle from its source map.
+        
+        Used when loading.source_maps is enabled (the default) and the file has
+        a source map embedding the content of every original source. Sources
+        whose names contain one of loading.source_maps.exclude are dropped.
+        
+        Args:
+            filepath (str): Path to the JavaScript file
+            
+        Returns:
+            Optional[List[SourceModule]]: The original sources to analyze, or None to analyze
+                                          the file itself
+        """
+        map_config = self.config.get("loading", {}).get("source_maps", {})
+        if not map_config.get("enabled", True):
+            return None
+
+        with self.timer.stage("source_map"):
+            source_map = load_source_map(filepath)
+            modules = original_sources(source_map) if source_map is not None else None
+        if modules is None:
+            return None
+
+        exclude = map_config.get("exclude", [])
+        kept = [
+            SourceModule(content, source=name)
+            for name, content in modules
+            if not any(part in name for part in exclude)
+        ]
+        self._excluded_modules = len(modules) - len(kept)
+        logger.info(
+            f"Analyzing {len(kept)} original sources from the source map of {filepath} "
+            f"({self._excluded_modules} excluded)"
+        )
+        return kept
+
+    def _split_bundle(self, content: str) -> Tuple[Optional[str], Optional[List[SourceModule]]]:
+        """
+        Split a webpack bundle into its modules.
+        
+        Used when loading.bundles is enabled (the default). Memory-mapped files
+        are never split, since splitting needs the whole file as text.
+        
+        Args:
+            content (str): The loaded file
+            
+        Returns:
+            Tuple[Optional[str], Optional[List[SourceModule]]]: The bundle layout and its modules,
+                with the code between modules as modules without an ID, or (None, None) to
+                analyze the file whole
+        """
+        bundle_config = self.config.get("loading", {}).get("bundles", {})
+        if not bundle_config.get("enabled", True):
+            return None, None
+
+        with self.timer.stage("split", len(content)):
+            bundle = split_bundle(content, bundle_config.get("min_modules", DEFAULT_MIN_MODULES))
+        if bundle is None:
+            return None, None
+
+        layout, spans = bundle
+        modules = []
+        line, counted = 1, 0
+        for module_id, start, end in spans:
+            line += content.count("\n", counted, start)
+            counted = start
+            modules.append(SourceModule(content[start:end], module_id=module_id, start_line=line))
+        logger.info(f"Split bundle into {len(modules)} pieces ({layout})")
+        return layout, modules
+
+    def _analyze_modules(
+        self, modules: List[SourceModule]
+    ) -> Tuple[
+        List[Endpoint], Dict[str, Any], Dict[str, int], Dict[str, int], Dict[str, Any], Dict[str, Any]
+    ]:
+        """
+        Find endpoints in each original source or bundle module of a file.
+        
+        Modules are analyzed in parallel, up to llm.concurrency at a time, with
+        that many requests in flight overall. Findings are tagged with their
+        original source or module ID. Line numbers of original sources are
+        relative to them; those of bundle modules are relative to the file.
+        Each module's findings are cached on its content and the analysis
+        settings, so only modules that changed since an earlier build are
+        analyzed again.
+        
+        Args:
+            modules (List[SourceModule]): The modules, in file order
+            
+        Returns:
+            Tuple[List[Endpoint], Dict[str, Any], Dict[str, int], Dict[str, int], Dict[str, Any], ...]:
+                The findings, LLM run stats and LLM cache stats summed over the analyzed
+                modules, module cache hits and misses, vendor stats summed over all modules,
+                and LLM token usage summed over the analyzed modules, with the usage of
+                each chunk sent as "chunks"
+        """
+        endpoints = []
+        llm_stats: Dict[str, Any] = {}
+        llm_cache_stats: Dict[str, int] = {}
+        usage: Dict[str, Any] = {}
+        chunks: List[Dict[str, Any]] = []
+        vendor_stats: Dict[str, Any] = {}
+        module_stats = {"module_hits": 0, "module_misses": 0} if self.cache is not None else {}
+
+        # Share the request limit between modules analyzed at the same time
+        concurrency = max(1, self.config.get("llm", {}).get("concurrency", DEFAULT_CONCURRENCY))
+        workers = min(concurrency, len(modules)) or 1
+        llm_config = {**self.config.get("llm", {}), "concurrency": max(1, concurrency // workers)}
+        config = {**self.config, "llm": llm_config}
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(self._analyze_module, module, config) for module in modules]
+            for module, future in zip(modules, futures):
+                found, module_vendor_stats, llm = future.result()
+                add_stats(vendor_stats, module_vendor_stats)
+                if self.cache is not None:
+                    module_stats["module_hits" if llm is None else "module_misses"] += 1
+                if llm is not None:
+                    add_stats(llm_stats, llm.run_stats)
+                    add_stats(llm_cache_stats, llm.cache_stats)
+                    add_stats(usage, llm.usage_stats)
+                    for chunk in llm.chunk_usage:
+                        chunk = dict(chunk)
+                        chunk["start_line"] += module.start_line - 1
+                        chunk["end_line"] += module.start_line - 1
+                        if module.source:
+                            chunk["source"] = module.source
+                        if module.module_id is not None:
+                            chunk["module"] = module.module_id
+                        chunks.append(chunk)
+
+                for endpoint in found:
+                    endpoint.source = module.source
+                    endpoint.module = module.module_id
+                    if endpoint.line_number is not None:
+                        endpoint.line_number += module.start_line - 1
+                endpoints.extend(found)
+
+        logger.info(
+            f"Analyzed {len(modules)} modules with {workers} workers in {time.perf_counter() - start:.2f}s"
+        )
+        usage["chunks"] = chunks
+        return endpoints, llm_stats, llm_cache_stats, module_stats, vendor_stats, usage
+
+    def _analyze_module(
+        self, module: SourceModule, config: Dict[str, Any]
+    ) -> Tuple[List[Endpoint], Dict[str, Any], Optional[LLMAnalyzer]]:
+        """
+        Find endpoints in one module, or load them from the cache.
+        
+        Runs in a worker thread with its own shallow copy of the LLM analyzer,
+        which shares the client and cache but keeps per-call stats apart.
+        
+        Args:
+            module (SourceModule): The module
+            config (Dict[str, Any]): Configuration passed to the LLM analyzer
+            
+        Returns:
+            Tuple[List[Endpoint], Dict[str, Any], Optional[LLMAnalyzer]]: Findings with line
+                numbers relative to the module, vendor stats, and the LLM analyzer copy whose
+                stats describe the module, which is None if the findings came from the cache
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = content_digest(module.content, self._cache_fingerprint)
+            cached = self.cache.get_json("modules", cache_key)
+            if cached is not None:
+                found = [self._endpoint_from_dict(entry) for entry in cached["endpoints"]]
+                return found, cached["vendor"], None
+
+        llm = copy.copy(self.llm)
+        found, _, vendor_stats = self._discover_endpoints(module.content, "utf-8", llm, config)
+        if cache_key is not None:
+            self.cache.set_json(
+                "modules",
+                cache_key,
+                {"endpoints": [asdict(endpoint) for endpoint in found], "vendor": vendor_stats},
+            )
+        return found, vendor_stats, llm
+
+    @staticmethod
+    def _endpoint_from_dict(entry: Dict[str, Any]) -> Endpoint:
+        """
+        Rebuild an Endpoint stored with dataclasses.asdict.
+        
+        Args:
+            entry (Dict[str, Any]): The stored fields
+            
+        Returns:
+            Endpoint: The endpoint
+        """
+        return Endpoint(**{**entry, "auth": AuthInfo(**entry["auth"])})
 
-    def _load_javascript(self, filepath: str) -> str:
+    def _timed(self, stage: str, size: int, func: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+        """
+        Call a function as a stage of self.timer and measure its wall time.
+        
+        Args:
+            stage (str): Name of the stage
+            size (int): Bytes the stage processes
+            func (Callable[..., Any]): The function to call
+            *args (Any): Positional arguments for the function
+            
+        Returns:
+            Tuple[Any, float]: The function's result and the seconds it took
+        """
+        start = time.perf_counter()
+        with self.timer.stage(stage, size):
+            result = func(*args)
+        return result, time.perf_counter() - start
+
+    def _get_cache_fingerprint(self) -> str:
+        """
+        Fingerprint everything besides the file contents that affects results.
+        
+        Covers the configuration (including prompts), the LLM provider and model,
+        the regex rules and endpoint patterns, the vendor fingerprint database
+        and RESULT_CACHE_VERSION, so a change to any of them invalidates
+        cached results.
+        
+        Returns:
+            str: Hex digest identifying the current analysis settings
+        """
+        settings = {key: value for key, value in self.config.items() if key != "cache"}
+        return content_digest(
+            RESULT_CACHE_VERSION,
+            settings,
+            self.llm.provider,
+            self.llm.model,
+            self.regex.patterns,
+            self.regex.rule_literals,
+            API_PATTERNS,
+            self.vendor.digest if self.vendor is not None else None,
+        )
+
+    def _load_javascript(self, filepath: str) -> Union[str, MappedSource]:
         """
         Load and process JavaScript content from a file.
         
+        Files at or above the configured mmap threshold are memory-mapped and
+        returned undecoded, so later stages can scan the bytes directly. They
+        are not beautified, since that needs the whole file as text. Reformatted
+        output of smaller minified files is cached on the file's contents and
+        the beautifier, so unchanged bundles are only reformatted once.
+        
         Args:
             filepath (str): Path to the JavaScript file to load
             
         Returns:
-            str: The content of the JavaScript file, beautified if minified
+            Union[str, MappedSource]: The content of the JavaScript file, reflowed or
+                                      beautified if minified, or a mapping of a large file
             
         Raises:
             FileNotFoundError: If the file does not exist
         """
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(filepath, "r", encoding="latin-1") as f:
-                content = f.read()
-
-        # Beautify minified files
-        if len(content.split("\n")) < 10:
+        threshold_mb = self.config.get("loading", {}).get(
+            "mmap_threshold_mb", DEFAULT_MMAP_THRESHOLD_MB
+        )
+        size = os.path.getsize(filepath)
+        if size >= threshold_mb * 1024 * 1024:
+            logger.debug(f"Memory-mapping large file {filepath}")
+            with self.timer.stage("load", size):
+                return MappedSource(filepath)
+
+        with self.timer.stage("load", size):
+            with open(filepath, "rb") as f:
+                data = f.read()
             try:
-                content = jsbeautifier.beautify(content)
-            except Exception as e:
-                logger.error(f"Failed to beautify content: {e}")
+                content = data.decode("utf-8")
+            except UnicodeDecodeError:
+                content = data.decode("latin-1")
+
+        # Break minified files into lines
+        beautify_config = self.config.get("loading", {}).get("beautify", {})
+        mode = beautify_config.get("mode", "reflow")
+        if mode != "none" and is_minified(
+            content,
+            long_line=beautify_config.get("long_line", DEFAULT_LONG_LINE),
+            min_long_fraction=beautify_config.get("min_long_fraction", DEFAULT_MIN_LONG_FRACTION),
+        ):
+            with self.timer.stage("beautify", len(data)):
+                content = self._beautify(content, mode, data)
 
         return content
 
+    def _beautify(self, content: str, mode: str, raw: bytes) -> str:
+        """
+        Reformat minified code with the configured beautifier, reusing cached output.
+        
+        Output is cached on a hash of the raw file contents, the beautifier and
+        its version and options. Failed beautification is not cached.
+        
+        Args:
+            content (str): The minified JavaScript code
+            mode (str): "reflow" or "jsbeautifier"
+            raw (bytes): The file contents content was decoded from
+            
+        Returns:
+            str: The reformatted code, or the original code if beautification failed
+        """
+        beautify, beautifier = self._get_beautifier(mode)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = content_digest(raw, beautifier)
+            cached = self.cache.get("beautified", cache_key)
+            self._beautify_stats = {"beautify_hits": int(cached is not None), "beautify_misses": int(cached is None)}
+            if cached is not None:
+                logger.debug("Using cached beautified output")
+                return cached.decode("utf-8")
+
+        try:
+            beautified = beautify(content)
+        except Exception as e:
+            logger.error(f"Failed to beautify content: {e}")
+            return content
+
+        if cache_key is not None:
+            self.cache.set("beautified", cache_key, beautified.encode("utf-8"))
+        return beautified
+
+    @staticmethod
+    def _get_beautifier(mode: str) -> Tuple[Callable[[str], str], Dict[str, Any]]:
+        """
+        Get the beautifier for a mode along with what identifies its output.
+        
+        The "reflow" mode only inserts line breaks at statement and brace
+        boundaries and is fast on large bundles. The "jsbeautifier" mode runs
+        the full beautifier, which is optional and much slower; if it is not
+        installed, reflow is used instead.
+        
+        Args:
+            mode (str): "reflow" or "jsbeautifier"
+            
+        Returns:
+            Tuple[Callable[[str], str], Dict[str, Any]]: The beautify function, and the
+                beautifier's name, version and options
+        """
+        if mode == "jsbeautifier":
+            try:
+                import jsbeautifier
+            except ImportError:
+                logger.warning("jsbeautifier is not installed, reflowing minified code instead")
+            else:
+                options = jsbeautifier.default_options()
+                return lambda content: jsbeautifier.beautify(content, options), {
+                    "name": "jsbeautifier",
+                    "version": getattr(jsbeautifier, "__version__", None),
+                    "options": vars(options),
+                }
+
+        return reflow, {"name": "reflow", "version": REFLOW_VERSION}
+
     def _deduplicate_endpoints(self, endpoints: List[Endpoint]) -> List[Endpoint]:
         """
         Remove duplicate endpoints while properly preserving detector information.
@@ -135,6 +759,13 @@ class JavaScriptAnalysisAgent:
                         detector=combined_detector,
                         # Combine context information if available
                         context=f"{existing.context or ''}\n{endpoint.context or ''}".strip(),
+                        rule=existing.rule or endpoint.rule,
+                        # Keep the location the finding was first reported at
+                        line_number=(
+                            existing.line_number if existing.line_number is not None else endpoint.line_number
+                        ),
+                        source=existing.source or endpoint.source,
+                        module=existing.module if existing.module is not None else endpoint.module,
                     )
 
                     unique_endpoints[key] = combined_endpoint
@@ -210,6 +841,18 @@ class JavaScriptAnalysisAgent:
         if endpoint.line_number is not None:
             result["line_number"] = endpoint.line_number
             
+        # Include the original source file, for bundles analyzed through their source map
+        if endpoint.source:
+            result["source"] = endpoint.source
+
+        # Include the bundle module, for bundles split into their modules
+        if endpoint.module is not None:
+            result["module"] = endpoint.module
+
+        # Include the regex rule that fired, if any
+        if endpoint.rule:
+            result["rule"] = endpoint.rule
+
         # Include context/usage_context if available
         if endpoint.context:
             result["usage_context"] = endpoint.context
@@ -0,0 +1,199 @@
+# batch.py
+"""
+Batch analysis module for JALAPI.
+
+This module expands directories, globs and file lists into JavaScript files and
+analyzes them in a pool of worker processes, isolating per-file failures.
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+
+from jalapi.core.analysis_agent import DEFAULT_REPORT_TOP, JavaScriptAnalysisAgent
+from jalapi.core.cassette import CassetteMissError
+from jalapi.logging.log_setup import logger, setup_logging
+from jalapi.utils.stats import add_stats
+from jalapi.utils.timing import finish_totals
+
+# File extensions picked up when a directory is given
+JS_EXTENSIONS = (".js", ".mjs", ".cjs")
+
+# Analysis agent owned by each worker process
+_worker_agent = None
+
+
+def collect_files(inputs: Iterable[str]) -> List[str]:
+    """
+    Expand directories, glob patterns and plain paths into a list of files.
+
+    Directories are searched recursively for JavaScript files. Duplicates are
+    dropped while keeping the order in which files were first found.
+
+    Args:
+        inputs (Iterable[str]): Files, directories or glob patterns
+
+    Returns:
+        List[str]: Paths of the files to analyze
+    """
+    files = []
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, dirs, names in os.walk(item):
+                dirs.sort()
+                files.extend(
+                    os.path.join(root, name) for name in sorted(names) if name.endswith(JS_EXTENSIONS)
+                )
+        elif glob.has_magic(item):
+            files.extend(path for path in sorted(glob.glob(item, recursive=True)) if os.path.isfile(path))
+        else:
+            files.append(item)
+
+    return list(dict.fromkeys(files))
+
+
+def read_file_list(list_path: str) -> List[str]:
+    """
+    Read a list of inputs, one per line, ignoring blank lines and # comments.
+
+    Args:
+        list_path (str): Path to the file list
+
+    Returns:
+        List[str]: The listed files, directories or glob patterns
+    """
+    with open(list_path, "r") as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def _init_worker(config: Dict[str, Any], debug: bool) -> None:
+    """
+    Set up logging and an analysis agent in a worker process.
+
+    Args:
+        config (Dict[str, Any]): Configuration parameters for the analysis process
+        debug (bool): Whether to enable debug logging
+    """
+    global _worker_agent
+    setup_logging(debug=debug)
+    _worker_agent = JavaScriptAnalysisAgent(config)
+
+
+def _analyze_file(filepath: str) -> Dict[str, Any]:
+    """
+    Analyze one file with the worker's agent, capturing any failure.
+
+    Args:
+        filepath (str): Path to the JavaScript file to analyze
+
+    Returns:
+        Dict[str, Any]: The analysis results, or an "error" entry if analysis failed,
+                        flagged with "cassette_miss" if a replayed prompt was missing
+    """
+    try:
+        return _worker_agent.analyze(filepath)
+    except CassetteMissError as e:
+        logger.error(f"Failed to analyze {filepath}: {e}")
+        return {"source": filepath, "error": str(e), "cassette_miss": True}
+    except Exception as e:
+        logger.error(f"Failed to analyze {filepath}: {e}")
+        return {"source": filepath, "error": str(e)}
+
+
+def analyze_batch(
+    files: List[str], config: Dict[str, Any], jobs: Optional[int] = None, debug: bool = False
+) -> Dict[str, Any]:
+    """
+    Analyze many JavaScript files in parallel worker processes.
+
+    Each worker runs the whole per-file pipeline (loading, beautification,
+    regex and LLM analysis). A failing file is recorded with its error and
+    does not stop the others.
+
+    Args:
+        files (List[str]): Paths of the files to analyze
+        config (Dict[str, Any]): Configuration parameters for the analysis process
+        jobs (Optional[int]): Number of worker processes. Defaults to the CPU count.
+        debug (bool, optional): Whether to enable debug logging in workers. Defaults to False.
+
+    Returns:
+        Dict[str, Any]: Merged results with a batch summary and per-file results keyed by path
+    """
+    results = {}
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(files) or 1))
+    logger.info(f"Analyzing {len(files)} files with {jobs} worker processes")
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(config, debug)
+    ) as pool:
+        futures = {pool.submit(_analyze_file, filepath): filepath for filepath in files}
+        for future in as_completed(futures):
+            filepath = futures[future]
+            try:
+                results[filepath] = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed or out of memory)
+                logger.error(f"Worker failed on {filepath}: {e}")
+                results[filepath] = {"source": filepath, "error": str(e)}
+
+    # Report files in input order regardless of completion order
+    results = {filepath: results[filepath] for filepath in files}
+    report_top = config.get("llm", {}).get("pricing", {}).get("report_top", DEFAULT_REPORT_TOP)
+    return {"summary": _batch_summary(results, report_top), "files": results}
+
+
+def _batch_summary(
+    results: Dict[str, Dict[str, Any]], report_top: int = DEFAULT_REPORT_TOP
+) -> Dict[str, Any]:
+    """
+    Aggregate per-file summaries into batch totals.
+
+    The LLM usage totals list the report_top files with the highest
+    estimated cost.
+
+    Args:
+        results (Dict[str, Dict[str, Any]]): Per-file results keyed by path
+        report_top (int, optional): Costliest files to list. Defaults to DEFAULT_REPORT_TOP.
+
+    Returns:
+        Dict[str, Any]: File counts (failed files and cassette misses among them) plus the sum of each numeric per-file statistic,
+                        including those nested in sections such as "cache"; throughputs
+                        and latencies in "timings" are recomputed from the sums
+    """
+    summary = {"files": len(results), "failed_files": 0, "cassette_misses": 0}
+
+    for result in results.values():
+        if "error" in result:
+            summary["failed_files"] += 1
+            summary["cassette_misses"] += int(result.get("cassette_miss", False))
+            continue
+        add_stats(summary, result["summary"])
+
+    if "timings" in summary:
+        finish_totals(summary["timings"])
+
+    usage = summary.get("usage")
+    if usage:
+        usage["cost_usd"] = round(usage["cost_usd"], 6)
+        costs = [
+            (filepath, result["summary"]["usage"])
+            for filepath, result in results.items()
+            if "error" not in result and result["summary"].get("usage", {}).get("requests")
+        ]
+        costs.sort(key=lambda item: (item[1]["cost_usd"], item[1]["input_tokens"]), reverse=True)
+        usage["top_files"] = [
+            {
+                "source": filepath,
+                "requests": file_usage["requests"],
+                "input_tokens": file_usage["input_tokens"],
+                "cached_input_tokens": file_usage["cached_input_tokens"],
+                "output_tokens": file_usage["output_tokens"],
+                "cost_usd": file_usage["cost_usd"],
+            }
+            for filepath, file_usage in costs[:report_top]
+        ]
+    return summary
+
@@ -0,0 +1,180 @@
+# cassette.py
+"""
+Record/replay cassettes for LLM responses.
+
+This module records every prompt and response pair sent to an LLM provider
+into a cassette file, and replays them later without network access, so
+full-pipeline runs over the same bundles become reproducible, fast and free.
+
+A cassette is a series of gzip members, each holding JSON lines of
+{"key", "response"} interactions. Recording appends one member per flush,
+so several analyzers, threads or worker processes can record into the same
+cassette, and gzip readers see the members as one stream. Keys hash the
+model, system prompt text and prompt; whether the system prompt was marked
+for provider-side caching does not change the key.
+"""
+
+import copy
+import gzip
+import json
+import os
+import threading
+from typing import Any, Dict, List, Union
+
+from jalapi.cache.disk_cache import content_digest
+from jalapi.logging.log_setup import logger
+
+# Default cassette location used when llm.cassette leaves it out
+DEFAULT_CASSETTE_PATH = ".jalapi_cache/llm.cassette.gz"
+
+# Bump when keys or responses change shape, so old cassettes stop matching
+CASSETTE_VERSION = 1
+
+# Hex digits of the digest kept as a key
+_KEY_LENGTH = 32
+
+
+class CassetteMissError(LookupError):
+    """Raised when replaying a prompt that is not in the cassette"""
+
+    pass
+
+
+def interaction_key(model: str, prompt: str, system: Union[str, List[Dict[str, Any]]]) -> str:
+    """
+    Compute the key of one request.
+
+    Args:
+        model (str): The model name
+        prompt (str): The rendered analysis prompt
+        system (Union[str, List[Dict[str, Any]]]): The system prompt, as text or content blocks
+
+    Returns:
+        str: Hex key identifying the request
+    """
+    if not isinstance(system, str):
+        system = "".join(block.get("text", "") for block in system)
+    return content_digest(CASSETTE_VERSION, model, system, prompt)[:_KEY_LENGTH]
+
+
+def load_cassette(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the interactions of a cassette.
+
+    Args:
+        path (str): Path to the cassette
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Responses keyed by interaction key; later recordings of
+                                   the same request win
+    """
+    interactions = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                interactions[entry["key"]] = entry["response"]
+    return interactions
+
+
+class RecordingProvider:
+    """Passes requests to a provider and records each successful response."""
+
+    def __init__(self, client: Any, path: str = DEFAULT_CASSETTE_PATH):
+        """
+        Wrap a provider client.
+
+        Args:
+            client (Any): The provider client requests are sent to
+            path (str, optional): Path of the cassette to append to
+        """
+        self.client = client
+        self.path = path
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+
+    def chat(
+        self, model: str, context: str, prompt: str, system: Union[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Send one request and record its response.
+
+        Args:
+            model (str): The model name
+            context (str): Extra context passed through to the client
+            prompt (str): The rendered analysis prompt
+            system (Union[str, List[Dict[str, Any]]]): The system prompt
+
+        Returns:
+            Dict[str, Any]: The provider's parsed response
+        """
+        response = self.client.chat(model, context, prompt, system)
+        line = json.dumps({"key": interaction_key(model, prompt, system), "response": response})
+        with self._lock:
+            self._pending.append(line)
+        return response
+
+    def flush(self) -> None:
+        """Append the responses recorded since the last flush to the cassette as one gzip member."""
+        with self._lock:
+            if not self._pending:
+                return
+            lines, self._pending = self._pending, []
+
+        data = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A single write to a file opened for appending keeps concurrent members whole
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        logger.debug(f"Recorded {len(lines)} LLM responses to {self.path}")
+
+
+class ReplayProvider:
+    """Answers requests from a cassette, failing on any request it does not hold."""
+
+    def __init__(self, path: str = DEFAULT_CASSETTE_PATH):
+        """
+        Load a cassette to replay.
+
+        Args:
+            path (str, optional): Path of the cassette
+
+        Raises:
+            FileNotFoundError: If the cassette does not exist
+        """
+        self.path = path
+        self.interactions = load_cassette(path)
+        logger.info(f"Replaying {len(self.interactions)} recorded LLM responses from {path}")
+
+    def chat(
+        self, model: str, context: str, prompt: str, system: Union[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Look up the recorded response of one request.
+
+        Args:
+            model (str): The model name
+            context (str): Extra context, which is not part of the key
+            prompt (str): The rendered analysis prompt
+            system (Union[str, List[Dict[str, Any]]]): The system prompt
+
+        Returns:
+            Dict[str, Any]: The recorded response
+
+        Raises:
+            CassetteMissError: If the cassette holds no response for the request
+        """
+        key = interaction_key(model, prompt, system)
+        response = self.interactions.get(key)
+        if response is None:
+            excerpt = " ".join(prompt.split())[:120]
+            raise CassetteMissError(
+                f"No recorded response in cassette {self.path} for {model} prompt {key} "
+                f"({excerpt!r}...); record it again with llm.cassette.mode set to record"
+            )
+        return copy.deepcopy(response)
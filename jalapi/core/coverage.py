@@ -0,0 +1,118 @@
+# coverage.py
+"""
+Regex coverage module for JALAPI.
+
+This module measures how much of a chunk's endpoint usage the regex stage has
+already resolved, so chunks that the LLM could add nothing to can be skipped.
+"""
+
+import re
+from typing import Dict, Optional
+
+from jalapi.models.models import ChunkCoverage
+from jalapi.core.endpoint_processor import EndpointProcessor
+from jalapi.core.regex_analyzer import RegexAnalyzer
+
+# Plain string literals holding a path or URL
+_URL_LITERAL = re.compile(r"(['\"`])((?:https?:|wss?:)?/[^'\"`\s]*)\1")
+
+# Rules that match the request call itself rather than any literal that looks like a path
+CALL_SITE_RULES = frozenset(
+    {"axios_method", "axios_config", "fetch", "fetch_template", "jquery_ajax", "jquery_method"}
+)
+
+# Calls naming their HTTP method: axios.post('/x') or $.get('/x')
+_METHOD_CALL = re.compile(
+    r"(?:\baxios|\$)\.(get|post|put|delete|patch)\s*\(\s*(['\"`])([^'\"`]+)\2", re.IGNORECASE
+)
+
+# fetch calls, with the start of an options object literal written inline, if any
+_FETCH_CALL = re.compile(r"\bfetch\s*\(\s*(['\"`])([^'\"`]+)\1\s*(\)|,\s*\{([^}]*))")
+
+# Config-object calls: axios({...}) and $.ajax({...}), up to the first closing brace
+_CONFIG_CALL = re.compile(r"(?:\baxios|\$\.ajax)\s*\(\s*\{([^}]*)")
+_URL_KEY = re.compile(r"\burl\s*:\s*(['\"`])([^'\"`]+)\1")
+_METHOD_KEY = re.compile(r"\b(?:method|type)\s*:\s*['\"`](\w+)['\"`]")
+
+# Ways of building URLs at runtime that regex extraction cannot follow
+_DYNAMIC_URL = re.compile(
+    r"`[^`]*\$\{"                                      # interpolated template literals
+    r"|['\"`](?:https?:|wss?:)?/[^'\"`]*['\"`]\s*\+"  # path literal followed by +
+    r"|\+\s*['\"`](?:https?:|wss?:)?/"                # + followed by a path literal
+    r"|\bnew\s+URL\s*\(|\bURLSearchParams\b"           # URL constructors
+)
+
+
+def call_site_methods(chunk: str) -> Dict[str, Optional[str]]:
+    """
+    Find the HTTP method each request call in a chunk states for its path literal.
+
+    Only the call itself counts: the method name of axios.post( or $.get(,
+    a method key of an options object written inline in fetch('/x', {...}),
+    a method or type key next to the url key of axios({...}) or
+    $.ajax({...}), and GET for a fetch without options. Calls whose options
+    are built elsewhere state no method. A path called with different
+    methods maps to None.
+
+    Args:
+        chunk (str): The code segment to search
+
+    Returns:
+        Dict[str, Optional[str]]: Upper-case method keyed by normalized path
+    """
+    calls = []
+    for match in _METHOD_CALL.finditer(chunk):
+        calls.append((match.group(3), match.group(1)))
+    for match in _FETCH_CALL.finditer(chunk):
+        if match.group(3) == ")":
+            calls.append((match.group(2), "GET"))
+            continue
+        method = _METHOD_KEY.search(match.group(4))
+        if method:
+            calls.append((match.group(2), method.group(1)))
+    for match in _CONFIG_CALL.finditer(chunk):
+        url, method = _URL_KEY.search(match.group(1)), _METHOD_KEY.search(match.group(1))
+        if url and method:
+            calls.append((url.group(2), method.group(1)))
+
+    methods: Dict[str, Optional[str]] = {}
+    for path, method in calls:
+        path, method = EndpointProcessor.normalize_path(path), method.upper()
+        methods[path] = method if methods.get(path, method) == method else None
+    return methods
+
+
+def measure_coverage(chunk: str, regex: RegexAnalyzer) -> ChunkCoverage:
+    """
+    Measure how many endpoint literals in a chunk the regex stage resolves.
+
+    A literal counts as resolved when the regex analyzer, run over the chunk,
+    reports the same normalized path from a call-site rule, and the call
+    itself states its HTTP method (see call_site_methods). The method the
+    regex analyzer guesses from surrounding text is not evidence enough.
+
+    Args:
+        chunk (str): The code segment to measure
+        regex (RegexAnalyzer): Analyzer used to resolve the chunk's literals
+
+    Returns:
+        ChunkCoverage: Endpoint literal counts and whether URLs are built dynamically
+    """
+    paths = [EndpointProcessor.normalize_path(match.group(2)) for match in _URL_LITERAL.finditer(chunk)]
+    paths = [path for path, is_api in zip(paths, EndpointProcessor.classify_many(paths)) if is_api]
+
+    coverage = ChunkCoverage(
+        url_literals=len(paths),
+        dynamic=_DYNAMIC_URL.search(chunk) is not None,
+    )
+    if not paths:
+        return coverage
+
+    methods = call_site_methods(chunk)
+    resolved = {
+        endpoint.path
+        for endpoint in regex.discover_endpoints(chunk)
+        if endpoint.rule in CALL_SITE_RULES and methods.get(endpoint.path) is not None
+    }
+    coverage.resolved_literals = sum(1 for path in paths if path in resolved)
+    return coverage
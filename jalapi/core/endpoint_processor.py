@@ -7,12 +7,56 @@ found during analysis.
 """
 
 import re
-from typing import List, Dict, Any
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable
+
+# Patterns that mark a URL string as an API endpoint
+API_PATTERNS = [
+    r"/api/",
+    r"/v\d+/",
+    r"/graphql",
+    r"/rest/",
+    r"/auth/",
+    r"/oauth2?/",
+    r"/rpc/",
+    r"/webhook",
+    r"/data",
+    r"/service",
+    r"/events?/",
+    r"/users?/",
+    r"/\w+/\{\w+\}",  # Parameterized routes
+    r"/ml[-/]",
+    r"/sync",
+    r"/reports?/",
+    r"/tasks/",
+    r"/export/",
+    r"/version-info/",
+    r"/features/",
+    r"/preferences",
+    r"/profile$",
+    r"/activity/",
+    r"/mfa/",
+    r"/challenge$",
+    r"/predict$",
+    r"/token$",
+    r"/refresh$",
+    r"/revoke$",
+    r"/test$",
+]
+
+# Every pattern starts with a slash, so the combined classifier is only tried there
+_API_PATTERN = re.compile("/(?:" + "|".join(f"(?:{p[1:]})" for p in API_PATTERNS) + ")", re.IGNORECASE)
+_TEMPLATE_VARIABLE = re.compile(r"\${([^}]+)}")
+_REPEATED_SLASHES = re.compile(r"/+")
+
+# Number of distinct strings remembered by the cached classifiers
+CACHE_SIZE = 65536
 
 
 class EndpointProcessor:
     """Utility class for processing and normalizing API endpoints."""
     @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
     def normalize_path(url: str) -> str:
         """
         Normalize API endpoint paths to a consistent format.
@@ -24,23 +68,25 @@ class EndpointProcessor:
             str: Normalized path with consistent formatting
         """
         # Convert template variables
-        url = re.sub(r"\${([^}]+)}", r"{\1}", url)
+        url = _TEMPLATE_VARIABLE.sub(r"{\1}", url)
 
         # Strip quotes
         url = url.strip("`'\"")
 
         # Normalize slashes
-        url = re.sub(r"/+", "/", url)
+        url = _REPEATED_SLASHES.sub("/", url)
 
         return url
 
     @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
     def is_endpoint(url: str) -> bool:
         """
         Determine if a URL string is likely an API endpoint.
         
-        Uses pattern matching against common API path patterns to identify
-        whether a URL represents an actual API endpoint.
+        Uses a single precompiled pattern combining common API path patterns to
+        identify whether a URL represents an actual API endpoint. Results are
+        cached per raw string.
         
         Args:
             url (str): The URL or path to check
@@ -51,39 +97,22 @@ class EndpointProcessor:
         # Normalize the URL string
         url = url.strip("`'\"")
 
-        # More comprehensive patterns for API endpoints
-        api_patterns = [
-            r"/api/",
-            r"/v\d+/",
-            r"/graphql",
-            r"/rest/",
-            r"/auth/",
-            r"/oauth2?/",
-            r"/rpc/",
-            r"/webhook",
-            r"/data",
-            r"/service",
-            r"/events?/",
-            r"/users?/",
-            r"/\w+/\{\w+\}",  # Parameterized routes
-            r"/ml[-/]",
-            r"/sync",
-            r"/reports?/",
-            r"/tasks/",
-            r"/export/",
-            r"/version-info/",
-            r"/features/",
-            r"/preferences",
-            r"/profile$",
-            r"/activity/",
-            r"/mfa/",
-            r"/challenge$",
-            r"/predict$",
-            r"/token$",
-            r"/refresh$",
-            r"/revoke$",
-            r"/test$",
-        ]
+        # Simply check if the URL contains any of the API patterns
+        return _API_PATTERN.search(url) is not None
 
-        # Simply check if the URL contains any of these patterns
-        return any(re.search(pattern, url, re.IGNORECASE) for pattern in api_patterns)
+    @staticmethod
+    def classify_many(urls: Iterable[str]) -> List[bool]:
+        """
+        Classify a batch of URL strings in one call.
+        
+        Each distinct string is classified once, however often it repeats.
+        
+        Args:
+            urls (Iterable[str]): The URLs or paths to check
+            
+        Returns:
+            List[bool]: is_endpoint result for each URL, in input order
+        """
+        urls = list(urls)
+        results = {url: EndpointProcessor.is_endpoint(url) for url in dict.fromkeys(urls)}
+        return [results[url] for url in urls]
@@ -0,0 +1,208 @@
+# fake_provider.py
+"""
+Offline stand-in LLM provider for JALAPI.
+
+This module provides a provider with the same chat(model, context, prompt,
+system) surface as the real clients that answers locally, for benchmarking
+and load-testing the LLM stage without network access or cost. Its answers
+are derived deterministically from the prompt: every path or URL string
+literal in the chunk is reported as an endpoint. Latency, jitter, failures
+and rate-limit responses can be injected. Each injection is drawn from the
+prompt, the seed and how often the prompt was sent before, so a run is
+reproducible however its requests are scheduled.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Union
+
+from jalapi.utils.tokens import estimate_tokens
+
+# Provider name selecting the fake provider in llm.provider
+FAKE_PROVIDER = "fake"
+
+# Defaults used when the llm.fake section of the config leaves them out
+DEFAULT_LATENCY_MS = 200
+DEFAULT_JITTER_MS = 50
+
+# Seconds a rate-limited caller is told to wait
+DEFAULT_RETRY_AFTER = 1.0
+
+# Marker of the analysis prompt after which the chunk's code starts
+_CODE_MARKER = "MAIN CODE:"
+
+# Plain string literals holding a path or URL
+_URL_LITERAL = re.compile(r"""(['"`])((?:https?:|wss?:)?/[^'"`\s]*)\1""")
+
+# HTTP method named on the line of a literal, e.g. axios.post( or method: "PUT"
+_METHOD = re.compile(r"\b(get|post|put|patch|delete)\b", re.IGNORECASE)
+
+
+class FakeProviderError(RuntimeError):
+    """Injected provider failure"""
+
+    status_code = 500
+
+
+class FakeRateLimitError(FakeProviderError):
+    """Injected rate-limit response"""
+
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float = DEFAULT_RETRY_AFTER):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FakeProvider:
+    """
+    Answers chat requests locally with endpoints found in the prompt.
+
+    Responses carry Anthropic-style usage: estimated input and output
+    tokens, with a system prompt marked with cache_control counted as a
+    cache write the first time it is seen and as a cache read afterwards.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = DEFAULT_LATENCY_MS,
+        jitter_ms: float = DEFAULT_JITTER_MS,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Create a fake provider.
+
+        Args:
+            latency_ms (float, optional): Mean response time in milliseconds. Defaults to 200.
+            jitter_ms (float, optional): Largest deviation from the mean latency, in either
+                direction. Defaults to 50.
+            error_rate (float, optional): Fraction of requests failing with FakeProviderError.
+                Defaults to 0.0.
+            rate_limit_rate (float, optional): Fraction of requests rejected with
+                FakeRateLimitError. Defaults to 0.0.
+            seed (int, optional): Seed of the injected latencies and failures. Defaults to 0.
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        self.requests = 0
+        self._sent: Dict[int, int] = {}
+        self._cached_systems = set()
+        self._lock = threading.Lock()
+
+    def chat(
+        self, model: str, context: str, prompt: str, system: Union[str, List[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Answer one request after the injected latency.
+
+        Args:
+            model (str): The model name, which does not change the answer
+            context (str): Extra context, unused like in the analyzer's requests
+            prompt (str): The rendered analysis prompt
+            system (Union[str, List[Dict[str, Any]]]): The system prompt, as text or as
+                content blocks
+
+        Returns:
+            Dict[str, Any]: "endpoints" found in the prompt's code and "usage"
+
+        Raises:
+            FakeRateLimitError: If the request is picked to be rate limited
+            FakeProviderError: If the request is picked to fail
+        """
+        prompt_hash = zlib.crc32(prompt.encode("utf-8", errors="replace"))
+        with self._lock:
+            self.requests += 1
+            attempt = self._sent.get(prompt_hash, 0)
+            self._sent[prompt_hash] = attempt + 1
+        draws = random.Random(f"{self.seed}:{prompt_hash}:{attempt}")
+
+        latency = self.latency_ms + draws.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, latency) / 1000)
+
+        outcome = draws.random()
+        if outcome < self.rate_limit_rate:
+            raise FakeRateLimitError("rate limit exceeded (injected)")
+        if outcome < self.rate_limit_rate + self.error_rate:
+            raise FakeProviderError("provider error (injected)")
+
+        endpoints = self._find_endpoints(prompt)
+        return {"endpoints": endpoints, "usage": self._usage(prompt, system, endpoints)}
+
+    @staticmethod
+    def _find_endpoints(prompt: str) -> List[Dict[str, Any]]:
+        """
+        Report every path or URL literal of the prompt's code, once per path and method.
+
+        Args:
+            prompt (str): The rendered analysis prompt
+
+        Returns:
+            List[Dict[str, Any]]: Endpoints in the analyzer's response format, with line
+                                  numbers relative to the code
+        """
+        _, marker, code = prompt.partition(_CODE_MARKER)
+        if not marker:
+            code = prompt
+
+        endpoints = []
+        seen = set()
+        for line_number, line in enumerate(code.split("\n"), 1):
+            for match in _URL_LITERAL.finditer(line):
+                method = _METHOD.search(line)
+                endpoint = {
+                    "path": match.group(2),
+                    "method": method.group(1).upper() if method else "UNKNOWN",
+                    "confidence": 0.9,
+                    "usage_context": line.strip()[:200],
+                    "line_number": line_number,
+                    "auth": {"required": False, "type": None, "location": None},
+                }
+                if (endpoint["path"], endpoint["method"]) not in seen:
+                    seen.add((endpoint["path"], endpoint["method"]))
+                    endpoints.append(endpoint)
+        return endpoints
+
+    def _usage(
+        self, prompt: str, system: Union[str, List[Dict[str, Any]]], endpoints: List[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """
+        Estimate the token usage of one request.
+
+        Args:
+            prompt (str): The rendered analysis prompt
+            system (Union[str, List[Dict[str, Any]]]): The system prompt
+            endpoints (List[Dict[str, Any]]): The endpoints answered
+
+        Returns:
+            Dict[str, int]: input_tokens, cache_creation_input_tokens, cache_read_input_tokens
+                            and output_tokens
+        """
+        usage = {
+            "input_tokens": estimate_tokens(prompt),
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "output_tokens": estimate_tokens(json.dumps({"endpoints": endpoints})),
+        }
+        if isinstance(system, str):
+            usage["input_tokens"] += estimate_tokens(system)
+            return usage
+
+        for block in system:
+            tokens = estimate_tokens(block.get("text", ""))
+            if "cache_control" not in block:
+                usage["input_tokens"] += tokens
+                continue
+            with self._lock:
+                cached = block["text"] in self._cached_systems
+                self._cached_systems.add(block["text"])
+            usage["cache_read_input_tokens" if cached else "cache_creation_input_tokens"] += tokens
+        return usage
@@ -1,14 +1,62 @@
 # llm_analyzer.py
 
 import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 import voidwire_parlai
 
-from typing import List, Dict, Optional, Tuple, Any
+from typing import Callable, List, Dict, Iterator, Optional, Tuple, Any, Union
 
-from jalapi.utils.chunk import chunk_code, simple_chunk_code
-from jalapi.models.models import AuthInfo, Endpoint
+from jalapi.utils.chunk import chunk_code, config_context, simple_chunk_spans, token_chunk_spans
+from jalapi.utils.line_index import LineIndex
+from jalapi.utils.timing import StageTimer
+from jalapi.utils.tokens import CHARS_PER_TOKEN, context_window, estimate_tokens, load_exact_counter, request_cost
+from jalapi.utils.triage import DEFAULT_TRIAGE_THRESHOLD, score_chunk
+from jalapi.models.models import AuthInfo, ChunkRegion, Endpoint, VendorRegion
 from jalapi.logging.log_setup import logger
 from jalapi.core.endpoint_processor import EndpointProcessor
+from jalapi.cache.disk_cache import DiskCache, content_digest
+from jalapi.core.coverage import measure_coverage
+from jalapi.core.fake_provider import FAKE_PROVIDER, FakeProvider
+from jalapi.core.cassette import (
+    DEFAULT_CASSETTE_PATH,
+    CassetteMissError,
+    RecordingProvider,
+    ReplayProvider,
+)
+from jalapi.core.regex_analyzer import RegexAnalyzer
+
+
+# Chunk requests in flight at once unless the config says otherwise
+DEFAULT_CONCURRENCY = 4
+
+# Fraction of a chunk's endpoint literals regex must resolve for it to be skipped
+DEFAULT_COVERAGE_THRESHOLD = 1.0
+
+# Gaps between vendor regions up to this long are left out when they hold no code
+MAX_TRIVIAL_GAP = 256
+
+# Token budget of one request (prompts, context and chunk) in token chunking mode
+DEFAULT_MAX_REQUEST_TOKENS = 2500
+DEFAULT_OVERLAP_TOKENS = 300
+
+# Tokens of the context window kept free for the model's response
+DEFAULT_RESPONSE_TOKENS = 4096
+
+# Shortest prefix the provider will cache (Anthropic's minimum for Sonnet and Opus)
+DEFAULT_PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Values of llm.cassette.mode
+CASSETTE_MODES = ("none", "record", "replay")
+
+# Token counts and cost recorded for each request
+USAGE_KEYS = ("input_tokens", "cache_write_tokens", "cached_input_tokens", "output_tokens", "cost_usd")
+
+# Stands in for the configuration context in each chunk prompt once it has
+# moved into the cached system prompt
+CONTEXT_IN_SYSTEM = "(see IMPORTANT CONFIGURATION in the system prompt)"
 
 
 class LLMAnalyzerError(Exception):
@@ -23,94 +71,746 @@ class LLMAnalyzer:
     extraction.
     """
 
-    def __init__(self, provider: str, model: str, debug: bool = False):
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        debug: bool = False,
+        cache: Optional[DiskCache] = None,
+        regex: Optional[RegexAnalyzer] = None,
+        provider_options: Optional[Dict[str, Any]] = None,
+        cassette: Optional[Dict[str, Any]] = None,
+    ):
         """
         Initialize the LLM Analyzer with the specified provider and model.
         
         Args:
-            provider (str): The name of the LLM provider (e.g., "anthropic")
+            provider (str): The name of the LLM provider (e.g., "anthropic"), or "fake" for the
+                offline FakeProvider
             model (str): The specific model to use (e.g., "claude-3-5-sonnet-20241022")
             debug (bool, optional): Whether to enable debug mode. Defaults to False.
+            cache (Optional[DiskCache]): Cache for per-chunk responses. Defaults to None (no caching).
+            regex (Optional[RegexAnalyzer]): Regex analyzer used to measure per-chunk coverage.
+                Defaults to None (no coverage-based skipping).
+            provider_options (Optional[Dict[str, Any]]): Keyword arguments of FakeProvider when
+                provider is "fake". Defaults to None.
+            cassette (Optional[Dict[str, Any]]): The llm.cassette settings. With mode "record",
+                every response is recorded into the cassette at path; with mode "replay",
+                responses come from it and the provider is never contacted. Either mode
+                bypasses the per-chunk response cache. Defaults to None (mode "none").
+            
+        Raises:
+            ValueError: If the cassette mode is unknown
         """
         logger.debug("Initializing LLM Analyzer")
+        self.provider = provider
         self.model = model
-        self.client = voidwire_parlai.create_provider(provider)
+        cassette = cassette or {}
+        mode = cassette.get("mode", "none")
+        cassette_path = cassette.get("path", DEFAULT_CASSETTE_PATH)
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected one of {', '.join(CASSETTE_MODES)}")
+
+        if mode == "replay":
+            self.client = ReplayProvider(cassette_path)
+        elif provider == FAKE_PROVIDER:
+            self.client = FakeProvider(**(provider_options or {}))
+        else:
+            self.client = voidwire_parlai.create_provider(provider)
+        if mode == "record":
+            self.client = RecordingProvider(self.client, cassette_path)
+
+        # Every request must reach the cassette, so responses are not cached while one is in use
+        self.cache = cache if mode == "none" else None
+        self.regex = regex
+        self.cache_stats: Dict[str, int] = {}
+        self.run_stats: Dict[str, int] = {}
+        self.usage_stats: Dict[str, Any] = {}
+        self.chunk_usage: List[Dict[str, Any]] = []
+        self._stats_lock = threading.Lock()
+        self._mark_probe_lock = threading.Lock()
+        self._prompt_cache: Dict[str, Any] = {}
+        self._mark_prefix = False
+        # Whether the client accepts a marked system prompt, None until a request tells
+        self._mark_supported: Optional[bool] = None
+        self._prefix_warm = False
+        self._prices: Optional[Dict[str, float]] = None
+        self.timer = StageTimer(enabled=False)
 
-    def analyze_endpoints(self, js: str, config: Dict[str, Any]) -> List[Endpoint]:
+    def analyze_endpoints(
+        self,
+        js: Union[str, bytes],
+        config: Dict[str, Any],
+        line_index: Optional[LineIndex] = None,
+        encoding: str = "utf-8",
+        vendor_regions: Optional[List[VendorRegion]] = None,
+    ) -> List[Endpoint]:
         """
         Analyze JavaScript code to identify API endpoints using a language model.
         
+        Chunks are sent to the provider concurrently, up to llm.concurrency
+        requests at a time. Results are collected in chunk order, so output is
+        deterministic, and a failing chunk does not affect the others. When
+        llm.triage is enabled, chunks scoring below its threshold on local
+        signals of API usage are skipped without a request. When llm.coverage
+        is enabled, so are chunks whose endpoint literals the regex stage
+        already finds at request calls stating their HTTP method, and that
+        build no URLs dynamically.
+        With llm.chunking.mode set to "tokens", chunks are sized against a
+        per-request token budget rather than a fixed number of characters.
+        With llm.prompt_cache enabled, the file's configuration context is
+        sent once as part of the system prompt, so every request starts with
+        the same prefix, and that prefix is marked for provider-side caching.
+        Consecutive chunks overlap; a finding in an overlap is kept only from
+        the chunk owning that part of it (see ChunkRegion), so each is
+        reported once with a stable line number. Regions recognized as known
+        vendor libraries are cut out before chunking, so only the code between
+        them is chunked and sent. Time spent chunking and the latency of each
+        request are recorded in self.timer. Responses recorded into a cassette
+        are written to it before returning; replaying a prompt missing from the
+        cassette raises CassetteMissError. Afterwards, usage_stats holds the
+        input, cached input, cache write and output tokens of the requests
+        sent, with their estimated cost at the model's llm.pricing.models
+        prices, and chunk_usage holds the same for each chunk sent.
+        
         Args:
-            js (str): JavaScript code to analyze
+            js (Union[str, bytes]): JavaScript code to analyze, as text or bytes-like content
             config (Dict[str, Any]): Configuration for the analysis, including prompts
+            line_index (Optional[LineIndex]): Line index of js, built here if not given
+            encoding (str, optional): Encoding of bytes-like content. Defaults to "utf-8".
+            vendor_regions (Optional[List[VendorRegion]]): Regions of js recognized as
+                third-party libraries
             
         Returns:
             List[Endpoint]: List of discovered API endpoints
+            
+        Raises:
+            CassetteMissError: If a prompt is missing from the replayed cassette
         """
         logger.debug("Starting enhanced LLM analysis")
         all_endpoints = []
-        chunks = simple_chunk_code(js)
+        self.cache_stats = {"llm_chunk_hits": 0, "llm_chunk_misses": 0}
+        self.usage_stats = {
+            "requests": 0,
+            "estimated_requests": 0,
+            "unpriced_requests": 0,
+            "input_tokens": 0,
+            "cache_write_tokens": 0,
+            "cached_input_tokens": 0,
+            "output_tokens": 0,
+            "cost_usd": 0.0,
+        }
+        self.chunk_usage = []
+        self.run_stats = {
+            "chunks": 0,
+            "skipped_chunks": 0,
+            "skipped_tokens": 0,
+            "overlap_dropped_findings": 0,
+            "coverage": {
+                "measured_chunks": 0,
+                "dynamic_chunks": 0,
+                "url_literals": 0,
+                "resolved_literals": 0,
+                "skipped_chunks": 0,
+                "skipped_tokens": 0,
+            },
+            "prompt_cache": {
+                "requests": 0,
+                "cached_input_tokens": 0,
+                "uncached_input_tokens": 0,
+            },
+            "vendor": {
+                "excluded_bytes": 0,
+                "excluded_tokens": 0,
+            },
+        }
+        if line_index is None:
+            line_index = LineIndex(js)
         system_prompt = config["system_prompt"]
         analysis_prompt = config["analysis_prompt"]
 
-        for chunk, context, start_line in chunks:
-            logger.debug(f"Context: #{context}")
-            ap = analysis_prompt.format(code_chunk=chunk, context=context)
-            logger.debug(ap)
-            try:
-                logger.debug(f"Analyzing chunk of size {len(chunk)}")
-                response = self.client.chat(
-                    self.model,
-                    "",
-                    ap,
-                    system_prompt,
-                )
+        llm_config = config.get("llm", {})
+        context = config_context(js, encoding)
+        vendor_spans = self._merge_regions(vendor_regions or [])
+        spans = self.timer.iterate(
+            "chunking",
+            self._chunk_spans(
+                js, llm_config, system_prompt, analysis_prompt, context, line_index, encoding, vendor_spans
+            ),
+            size=lambda span: span[1] - span[0],
+        )
+        concurrency = max(1, llm_config.get("concurrency", DEFAULT_CONCURRENCY))
+        triage_config = llm_config.get("triage", {})
+        triage_threshold = triage_config.get("threshold", DEFAULT_TRIAGE_THRESHOLD)
+        coverage_config = llm_config.get("coverage", {})
+        coverage_threshold = coverage_config.get("threshold", DEFAULT_COVERAGE_THRESHOLD)
+        measure = self.regex is not None and coverage_config.get("enabled", False)
+        self._prompt_cache = llm_config.get("prompt_cache", {})
+        self._mark_prefix = (
+            self._prompt_cache.get("enabled", False)
+            and self._prompt_cache.get("mark", True)
+            and self._mark_supported is not False
+        )
+        self._prefix_warm = False
+        self._prices = llm_config.get("pricing", {}).get("models", {}).get(self.model)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            pending = deque()
+            previous = None
+            for start, end, start_line in spans:
+                self.run_stats["chunks"] += 1
+                chunk = js[start:end]
+                if not isinstance(chunk, str):
+                    chunk = bytes(chunk).decode(encoding, errors="replace")
+                system, prompt = self._render_request(chunk, context, system_prompt, analysis_prompt)
+
+                # Skip chunks with no local sign of API usage
+                if triage_config.get("enabled", False) and score_chunk(chunk) < triage_threshold:
+                    logger.debug(f"Skipping chunk at line {start_line} after triage")
+                    self.run_stats["skipped_chunks"] += 1
+                    self.run_stats["skipped_tokens"] += estimate_tokens(prompt) + estimate_tokens(system)
+                    continue
+
+                # Skip chunks the regex stage already fully resolves
+                if measure and self._covered_by_regex(chunk, coverage_threshold):
+                    logger.debug(f"Skipping chunk at line {start_line} covered by regex")
+                    self.run_stats["coverage"]["skipped_chunks"] += 1
+                    self.run_stats["coverage"]["skipped_tokens"] += estimate_tokens(
+                        prompt
+                    ) + estimate_tokens(system)
+                    continue
 
-                logger.debug("LLM Response:")
-                logger.debug(response)
-
-                for ep in response["endpoints"]:
-                    if not isinstance(ep, dict) or "path" not in ep:
-                        continue
-
-                    # Enhanced confidence scoring
-                    base_confidence = ep.get("confidence", 0.8)
-                    # Boost confidence for well-evidenced endpoints
-                    if ep.get("evidence") and ep.get("usage_context"):
-                        base_confidence = min(1.0, base_confidence + 0.1)
-
-                    auth_info = AuthInfo(
-                        required=ep.get("auth", {}).get("required", False),
-                        type=ep.get("auth", {}).get("type"),
-                        location=ep.get("auth", {}).get("location"),
-                    )
-
-                    # Get relative line number from LLM if available, or use chunk start line
-                    relative_line = ep.get("line_number", 0)
-                    if relative_line > 0:
-                        # If LLM provided a line number within the chunk, add it to chunk start line
-                        absolute_line = start_line + relative_line - 1
-                    else:
-                        # Otherwise just use chunk start line
-                        absolute_line = start_line
-                    
-                    endpoint = Endpoint(
-                        path=ep["path"],
-                        method=ep.get("method", "UNKNOWN"),
-                        auth=auth_info,
-                        confidence=base_confidence,
-                        detector="llm",
-                        context=ep.get("usage_context", ep.get("evidence", "")),
-                        line_number=absolute_line
-                    )
-
-                    # Only add if it's a valid endpoint
-                    # if EndpointProcessor.is_endpoint(endpoint.path):
-                    all_endpoints.append(endpoint)
-
-            except Exception as e:
-                logger.error(f"Unexpected error in LLM analysis: {e}")
-                logger.debug(f"Error details: {str(e)}")
+                region = ChunkRegion(start, end, start_line)
+                if previous is not None:
+                    region.follow(previous)
+                previous = region
 
+                future = pool.submit(self._analyze_chunk, chunk, start_line, system, prompt)
+                pending.append((future, chunk, region))
+                # Keep a bounded number of chunks queued so lazy chunking stays lazy. A
+                # chunk's owned region is final once the next chunk has been queued.
+                if len(pending) >= concurrency * 2:
+                    all_endpoints.extend(self._owned_findings(*pending.popleft(), js, encoding))
+
+            while pending:
+                all_endpoints.extend(self._owned_findings(*pending.popleft(), js, encoding))
+
+        if isinstance(self.client, RecordingProvider):
+            self.client.flush()
         logger.info(f"LLM analysis complete - found {len(all_endpoints)} endpoints")
         return all_endpoints
+
+    def _chunk_spans(
+        self,
+        js: Union[str, bytes],
+        llm_config: Dict[str, Any],
+        system_prompt: str,
+        analysis_prompt: str,
+        context: str,
+        line_index: LineIndex,
+        encoding: str,
+        vendor_spans: List[Tuple[int, int]],
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Split code into chunk spans as configured in llm.chunking, leaving out vendor spans.
+        
+        In token mode, one request may use up to llm.chunking.max_tokens, capped
+        by the model's context window minus response_tokens. The system prompt,
+        the analysis prompt template and the configuration context are
+        reserved out of that budget. Each stretch of code between vendor spans
+        is chunked on its own; short ones holding no code (such as the
+        punctuation between two libraries) are dropped. The bytes left out
+        are counted in run_stats["vendor"].
+        
+        Args:
+            js (Union[str, bytes]): JavaScript code to chunk
+            llm_config (Dict[str, Any]): The "llm" section of the configuration
+            system_prompt (str): System prompt for the model
+            analysis_prompt (str): Analysis prompt template
+            context (str): Configuration context of the file
+            line_index (LineIndex): Line index of js
+            encoding (str): Encoding of bytes-like content
+            vendor_spans (List[Tuple[int, int]]): Sorted, non-overlapping vendor spans
+            
+        Returns:
+            Iterator[Tuple[int, int, int]]: (start_offset, end_offset, start_line) of each chunk
+        """
+        chunk_stretch = self._stretch_chunker(
+            js, llm_config, system_prompt, analysis_prompt, context, line_index, encoding
+        )
+        if not vendor_spans:
+            return chunk_stretch(0, len(js))
+        return self._chunk_around(js, vendor_spans, chunk_stretch, encoding)
+
+    def _chunk_around(
+        self,
+        js: Union[str, bytes],
+        vendor_spans: List[Tuple[int, int]],
+        chunk_stretch: Callable[[int, int], Iterator[Tuple[int, int, int]]],
+        encoding: str,
+    ) -> Iterator[Tuple[int, int, int]]:
+        """
+        Chunk the stretches of code between vendor spans.
+        
+        Args:
+            js (Union[str, bytes]): JavaScript code to chunk
+            vendor_spans (List[Tuple[int, int]]): Sorted, non-overlapping vendor spans
+            chunk_stretch (Callable[[int, int], Iterator[Tuple[int, int, int]]]): Chunks the code
+                between two offsets
+            encoding (str): Encoding of bytes-like content
+            
+        Yields:
+            Tuple[int, int, int]: (start_offset, end_offset, start_line) of each chunk
+        """
+        stats = self.run_stats["vendor"]
+        for start, end in vendor_spans:
+            stats["excluded_bytes"] += end - start
+            stats["excluded_tokens"] += (end - start) // CHARS_PER_TOKEN
+
+        stretches = zip([0] + [end for _, end in vendor_spans], [start for start, _ in vendor_spans] + [len(js)])
+        for start, end in stretches:
+            if start >= end:
+                continue
+            if end - start <= MAX_TRIVIAL_GAP:
+                gap = js[start:end]
+                if not isinstance(gap, str):
+                    gap = bytes(gap).decode(encoding, errors="replace")
+                if not any(character.isalnum() for character in gap):
+                    continue
+            yield from chunk_stretch(start, end)
+
+    def _stretch_chunker(
+        self,
+        js: Union[str, bytes],
+        llm_config: Dict[str, Any],
+        system_prompt: str,
+        analysis_prompt: str,
+        context: str,
+        line_index: LineIndex,
+        encoding: str,
+    ) -> Callable[[int, int], Iterator[Tuple[int, int, int]]]:
+        """
+        Build the chunker configured in llm.chunking for stretches of the code.
+        
+        Args:
+            js (Union[str, bytes]): JavaScript code to chunk
+            llm_config (Dict[str, Any]): The "llm" section of the configuration
+            system_prompt (str): System prompt for the model
+            analysis_prompt (str): Analysis prompt template
+            context (str): Configuration context of the file
+            line_index (LineIndex): Line index of js
+            encoding (str): Encoding of bytes-like content
+            
+        Returns:
+            Callable[[int, int], Iterator[Tuple[int, int, int]]]: Yields the chunk spans of the
+                code between a start and an end offset
+        """
+        chunking = llm_config.get("chunking", {})
+        if chunking.get("mode", "chars") != "tokens":
+            return lambda start, end: simple_chunk_spans(
+                js, line_index=line_index, start_offset=start, end_offset=end
+            )
+
+        count_tokens = estimate_tokens
+        if chunking.get("exact_tokens", False):
+            count_tokens = load_exact_counter() or estimate_tokens
+
+        max_tokens = min(
+            chunking.get("max_tokens", DEFAULT_MAX_REQUEST_TOKENS),
+            context_window(self.model) - chunking.get("response_tokens", DEFAULT_RESPONSE_TOKENS),
+        )
+        reserved_tokens = (
+            count_tokens(system_prompt)
+            + count_tokens(analysis_prompt.format(code_chunk="", context=""))
+            + count_tokens(context)
+        )
+        return lambda start, end: token_chunk_spans(
+            js,
+            max_tokens=max_tokens,
+            overlap_tokens=chunking.get("overlap_tokens", DEFAULT_OVERLAP_TOKENS),
+            reserved_tokens=reserved_tokens,
+            count_tokens=count_tokens,
+            line_index=line_index,
+            encoding=encoding,
+            start_offset=start,
+            end_offset=end,
+        )
+
+    @staticmethod
+    def _merge_regions(regions: List[VendorRegion]) -> List[Tuple[int, int]]:
+        """
+        Merge vendor regions into sorted, non-overlapping spans.
+        
+        Args:
+            regions (List[VendorRegion]): Regions ordered by start offset
+            
+        Returns:
+            List[Tuple[int, int]]: (start, end) of the merged spans
+        """
+        spans: List[Tuple[int, int]] = []
+        for region in regions:
+            if spans and region.start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], region.end))
+            else:
+                spans.append((region.start, region.end))
+        return spans
+
+    def _render_request(
+        self, chunk: str, context: str, system_prompt: str, analysis_prompt: str
+    ) -> Tuple[str, str]:
+        """
+        Render the system prompt and analysis prompt of one chunk request.
+        
+        With llm.prompt_cache enabled, the configuration context is appended
+        to the system prompt, which is then identical for every chunk of the
+        file, and the analysis prompt only points to it. Otherwise the context
+        is embedded in every analysis prompt.
+        
+        Args:
+            chunk (str): The code segment to analyze
+            context (str): Configuration context of the file
+            system_prompt (str): System prompt for the model
+            analysis_prompt (str): Analysis prompt template
+            
+        Returns:
+            Tuple[str, str]: The system prompt and the rendered analysis prompt
+        """
+        if not self._prompt_cache.get("enabled", False) or not context:
+            return system_prompt, analysis_prompt.format(code_chunk=chunk, context=context)
+
+        return (
+            f"{system_prompt}\n\n{context}",
+            analysis_prompt.format(code_chunk=chunk, context=CONTEXT_IN_SYSTEM),
+        )
+
+    def _owned_findings(
+        self, future: Future, chunk: str, region: ChunkRegion, js: Union[str, bytes], encoding: str
+    ) -> List[Endpoint]:
+        """
+        Wait for a chunk's findings and keep those located in its owned region.
+        
+        A finding is located at the first occurrence of its path in the chunk,
+        starting from the line the model reported, or at the start of that
+        line if the path does not occur literally.
+        
+        Args:
+            future (Future): The pending result of _analyze_chunk
+            chunk (str): The code segment that was analyzed
+            region (ChunkRegion): Span and owned region of the chunk
+            js (Union[str, bytes]): The analyzed code, to tell character from byte offsets
+            encoding (str): Encoding of bytes-like content
+            
+        Returns:
+            List[Endpoint]: The chunk's findings that it owns
+        """
+        endpoints = future.result()
+        if region.owned_start == region.start and region.owned_end == region.end:
+            return endpoints
+
+        chunk_lines = LineIndex(chunk)
+        owned = []
+        for endpoint in endpoints:
+            line_start = chunk_lines.line_start(endpoint.line_number - region.start_line + 1)
+            position = chunk.find(endpoint.path, line_start)
+            if position < 0:
+                position = chunk.find(endpoint.path)
+            if position < 0:
+                position = line_start
+            if not isinstance(js, str):
+                position = len(chunk[:position].encode(encoding, errors="replace"))
+
+            if region.owns(region.start + position):
+                owned.append(endpoint)
+
+        self.run_stats["overlap_dropped_findings"] += len(endpoints) - len(owned)
+        return owned
+
+    def _covered_by_regex(self, chunk: str, threshold: float) -> bool:
+        """
+        Measure a chunk's regex coverage, record it, and decide whether to skip it.
+        
+        Args:
+            chunk (str): The code segment to measure
+            threshold (float): Minimum fraction of endpoint literals that must be resolved
+            
+        Returns:
+            bool: True if the LLM call for this chunk can be skipped
+        """
+        coverage = measure_coverage(chunk, self.regex)
+        stats = self.run_stats["coverage"]
+        stats["measured_chunks"] += 1
+        stats["dynamic_chunks"] += int(coverage.dynamic)
+        stats["url_literals"] += coverage.url_literals
+        stats["resolved_literals"] += coverage.resolved_literals
+        return coverage.fully_covered(threshold)
+
+    def _analyze_chunk(self, chunk: str, start_line: int, system_prompt: str, prompt: str) -> List[Endpoint]:
+        """
+        Analyze a single chunk and map its findings to file line numbers.
+        
+        Args:
+            chunk (str): The code segment to analyze
+            start_line (int): Line number of the first line of the chunk
+            system_prompt (str): System prompt for the request
+            prompt (str): Rendered analysis prompt for the chunk
+            
+        Returns:
+            List[Endpoint]: Endpoints found in the chunk, empty if the request failed
+            
+        Raises:
+            CassetteMissError: If the chunk's prompt is missing from the replayed cassette
+        """
+        endpoints = []
+        # Last line of the chunk, used to keep LLM line numbers inside it
+        end_line = start_line + chunk.count("\n")
+        logger.debug(prompt)
+        try:
+            logger.debug(f"Analyzing chunk of size {len(chunk)}")
+            found, usage = self._request_endpoints(prompt, system_prompt)
+            if usage is not None:
+                with self._stats_lock:
+                    self.chunk_usage.append({"start_line": start_line, "end_line": end_line, **usage})
+            for ep in found:
+                if not isinstance(ep, dict) or "path" not in ep:
+                    continue
+
+                # Enhanced confidence scoring
+                base_confidence = ep.get("confidence", 0.8)
+                # Boost confidence for well-evidenced endpoints
+                if ep.get("evidence") and ep.get("usage_context"):
+                    base_confidence = min(1.0, base_confidence + 0.1)
+
+                auth_info = AuthInfo(
+                    required=ep.get("auth", {}).get("required", False),
+                    type=ep.get("auth", {}).get("type"),
+                    location=ep.get("auth", {}).get("location"),
+                )
+
+                # Get relative line number from LLM if available, or use chunk start line
+                relative_line = ep.get("line_number", 0)
+                if relative_line > 0:
+                    # If LLM provided a line number within the chunk, add it to chunk start line
+                    absolute_line = min(start_line + relative_line - 1, end_line)
+                else:
+                    # Otherwise just use chunk start line
+                    absolute_line = start_line
+                
+                endpoint = Endpoint(
+                    path=ep["path"],
+                    method=ep.get("method", "UNKNOWN"),
+                    auth=auth_info,
+                    confidence=base_confidence,
+                    detector="llm",
+                    context=ep.get("usage_context", ep.get("evidence", "")),
+                    line_number=absolute_line
+                )
+
+                # Only add if it's a valid endpoint
+                # if EndpointProcessor.is_endpoint(endpoint.path):
+                endpoints.append(endpoint)
+
+        except CassetteMissError:
+            # A replay missing a prompt would silently lose findings, so stop the run
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error in LLM analysis: {e}")
+            logger.debug(f"Error details: {str(e)}")
+
+        return endpoints
+
+    def _request_endpoints(
+        self, prompt: str, system_prompt: str
+    ) -> Tuple[List[Any], Optional[Dict[str, Any]]]:
+        """
+        Send one rendered prompt to the provider and return the endpoints it reports.
+        
+        Responses are cached on a hash of the provider, model, system prompt and
+        rendered prompt, so an identical chunk seen in another file or an
+        earlier run is not sent again. Only successful responses are cached.
+        The latency of requests actually sent is recorded in self.timer.
+        
+        Args:
+            prompt (str): The rendered analysis prompt for one chunk
+            system_prompt (str): System prompt for the model
+            
+        Returns:
+            Tuple[List[Any], Optional[Dict[str, Any]]]: The parsed "endpoints" list from the
+                model's response, and the request's token usage, or None if it was cached
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = content_digest(self.provider, self.model, system_prompt, prompt)
+            cached = self.cache.get_json("llm_chunks", cache_key)
+            with self._stats_lock:
+                self.cache_stats["llm_chunk_hits" if cached is not None else "llm_chunk_misses"] += 1
+            if cached is not None:
+                logger.debug("Using cached LLM response")
+                return cached, None
+
+        sent = time.perf_counter()
+        response = self._send(prompt, system_prompt)
+        self.timer.record_latency(time.perf_counter() - sent)
+
+        logger.debug("LLM Response:")
+        logger.debug(response)
+        usage = self._record_usage(response, prompt, system_prompt)
+
+        endpoints = response["endpoints"]
+        if cache_key is not None:
+            self.cache.set_json("llm_chunks", cache_key, endpoints)
+        return endpoints, usage
+
+    def _send(self, prompt: str, system_prompt: str) -> Dict[str, Any]:
+        """
+        Send one request, marking the system prompt for provider-side caching if enabled.
+        
+        The mark is an Anthropic cache_control block around the system prompt.
+        Until a marked request has succeeded, marked requests are sent one at
+        a time, and a rejection of one (a 400 or invalid_request_error, or a
+        response without an "endpoints" list) is taken as the client not
+        accepting structured system prompts (as is a TypeError from a client
+        that cannot take content blocks): a warning is logged, marking is
+        turned off for this analyzer and the request is sent again as plain
+        text. Other failures, such as timeouts, rate limits and server
+        errors, fail the chunk as usual and leave marking undecided.
+        
+        Args:
+            prompt (str): The rendered analysis prompt for one chunk
+            system_prompt (str): System prompt for the request
+            
+        Returns:
+            Dict[str, Any]: The provider's parsed response
+        """
+        with self._stats_lock:
+            mark, decided = self._mark_prefix, self._mark_supported is not None
+        if mark and not decided:
+            # Concurrent first requests wait for one to find out whether marking works
+            with self._mark_probe_lock:
+                with self._stats_lock:
+                    mark, decided = self._mark_prefix, self._mark_supported is not None
+                if mark and not decided:
+                    return self._probe_marked(prompt, system_prompt)
+
+        if mark:
+            return self.client.chat(self.model, "", prompt, self._marked_system(system_prompt))
+        return self.client.chat(self.model, "", prompt, system_prompt)
+
+    def _probe_marked(self, prompt: str, system_prompt: str) -> Dict[str, Any]:
+        """
+        Send the first marked request, falling back to plain text if the client rejects it.
+        
+        Args:
+            prompt (str): The rendered analysis prompt for one chunk
+            system_prompt (str): System prompt for the request
+            
+        Returns:
+            Dict[str, Any]: The provider's parsed response
+        """
+        try:
+            response = self.client.chat(self.model, "", prompt, self._marked_system(system_prompt))
+        except Exception as e:
+            if not self._is_rejection(e):
+                raise
+            problem = str(e)
+        else:
+            if isinstance(response, dict) and isinstance(response.get("endpoints"), list):
+                with self._stats_lock:
+                    self._mark_supported = True
+                return response
+            problem = f"response without endpoints: {str(response)[:200]}"
+
+        logger.warning(f"Provider rejected the cached system prompt, sending plain text instead ({problem})")
+        with self._stats_lock:
+            self._mark_supported = self._mark_prefix = False
+        return self.client.chat(self.model, "", prompt, system_prompt)
+
+    @staticmethod
+    def _marked_system(system_prompt: str) -> List[Dict[str, Any]]:
+        """
+        Wrap the system prompt in a content block marked for provider-side caching.
+        
+        Args:
+            system_prompt (str): System prompt for the request
+            
+        Returns:
+            List[Dict[str, Any]]: The system prompt as Anthropic content blocks
+        """
+        return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+    @staticmethod
+    def _is_rejection(error: Exception) -> bool:
+        """
+        Check whether a failed request was rejected as invalid rather than failing transiently.
+        
+        Args:
+            error (Exception): The exception raised by the client
+            
+        Returns:
+            bool: True for a 400 response, an invalid_request_error or a TypeError
+        """
+        if isinstance(error, TypeError):
+            return True
+        status = getattr(error, "status_code", None) or getattr(error, "status", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        return status == 400 or "invalid_request_error" in str(error)
+
+    def _record_usage(self, response: Dict[str, Any], prompt: str, system_prompt: str) -> Dict[str, Any]:
+        """
+        Add the token usage and estimated cost of one request to the run's statistics.
+        
+        Usage reported by the provider is used when the response carries it.
+        Otherwise tokens are estimated: output from the returned endpoints, and
+        the system prompt is taken to be read from the cache once an earlier
+        request of the run has completed with it, prompt caching is enabled
+        and it is at least llm.prompt_cache.min_tokens long. Requests to a
+        model missing from llm.pricing.models are counted as unpriced.
+        
+        Args:
+            response (Dict[str, Any]): The provider's parsed response
+            prompt (str): The rendered analysis prompt that was sent
+            system_prompt (str): The system prompt that was sent
+            
+        Returns:
+            Dict[str, Any]: input_tokens (uncached), cache_write_tokens, cached_input_tokens,
+                output_tokens, estimated and cost_usd of the request
+        """
+        usage = response.get("usage")
+        min_tokens = self._prompt_cache.get("min_tokens", DEFAULT_PROMPT_CACHE_MIN_TOKENS)
+
+        with self._stats_lock:
+            if isinstance(usage, dict):
+                request = {
+                    "input_tokens": usage.get("input_tokens", 0),
+                    "cache_write_tokens": usage.get("cache_creation_input_tokens", 0),
+                    "cached_input_tokens": usage.get("cache_read_input_tokens", 0),
+                    "output_tokens": usage.get("output_tokens", 0),
+                    "estimated": False,
+                }
+            else:
+                prefix_tokens = estimate_tokens(system_prompt)
+                cacheable = self._prompt_cache.get("enabled", False) and prefix_tokens >= min_tokens
+                cached = prefix_tokens if cacheable and self._prefix_warm else 0
+                request = {
+                    "input_tokens": prefix_tokens + estimate_tokens(prompt) - cached,
+                    "cache_write_tokens": 0,
+                    "cached_input_tokens": cached,
+                    "output_tokens": estimate_tokens(json.dumps(response.get("endpoints", []))),
+                    "estimated": True,
+                }
+                self._prefix_warm = True
+            request["cost_usd"] = request_cost(request, self._prices) if self._prices is not None else 0.0
+
+            stats = self.run_stats["prompt_cache"]
+            stats["requests"] += 1
+            stats["cached_input_tokens"] += request["cached_input_tokens"]
+            stats["uncached_input_tokens"] += request["input_tokens"] + request["cache_write_tokens"]
+
+            totals = self.usage_stats
+            totals["requests"] += 1
+            totals["estimated_requests"] += int(request["estimated"])
+            totals["unpriced_requests"] += int(self._prices is None)
+            for key in USAGE_KEYS:
+                totals[key] += request[key]
+
+        return request
@@ -7,35 +7,37 @@ using regular expression pattern matching.
 """
 
 import re
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple, Union
 
 from jalapi.models.models import AuthInfo, Endpoint
 from jalapi.logging.log_setup import logger
 from jalapi.core.endpoint_processor import EndpointProcessor
+from jalapi.utils.line_index import LineIndex
+from jalapi.utils.prefilter import LiteralPrefilter
 
 
 class RegexAnalyzer:
     """Find API endpoints using regex patterns"""
 
     def __init__(self):
-        # Patterns for finding API endpoints
+        # Patterns for finding API endpoints, as (rule name, pattern) pairs
         self.patterns = [
             # Axios
-            r'axios\.(?:get|post|put|delete|patch)\s*\(\s*[\'"`]([^\'"`]+)[\'"`]',
-            r'axios\s*\(\s*{\s*url:\s*[\'"`]([^\'"`]+)[\'"`]',
+            ("axios_method", r'axios\.(?:get|post|put|delete|patch)\s*\(\s*[\'"`]([^\'"`]+)[\'"`]'),
+            ("axios_config", r'axios\s*\(\s*{\s*url:\s*[\'"`]([^\'"`]+)[\'"`]'),
             # Fetch
-            r'fetch\s*\(\s*[\'"`]([^\'"`]+)[\'"`]',
-            r"fetch\s*\(\s*`([^`]+)`",
+            ("fetch", r'fetch\s*\(\s*[\'"`]([^\'"`]+)[\'"`]'),
+            ("fetch_template", r"fetch\s*\(\s*`([^`]+)`"),
             # jQuery
-            r'\$\.ajax\s*\(\s*{\s*url:\s*[\'"`]([^\'"`]+)[\'"`]',
-            r'\$\.(get|post|put|delete|patch)\s*\(\s*[\'"`]([^\'"`]+)[\'"`]',
+            ("jquery_ajax", r'\$\.ajax\s*\(\s*{\s*url:\s*[\'"`]([^\'"`]+)[\'"`]'),
+            ("jquery_method", r'\$\.(get|post|put|delete|patch)\s*\(\s*[\'"`]([^\'"`]+)[\'"`]'),
             # Common patterns
-            r'url\s*:\s*[\'"`]([^\'"`]+)[\'"`]',
-            r'endpoint\s*:\s*[\'"`]([^\'"`]+)[\'"`]',
-            r'path\s*:\s*[\'"`]([^\'"`]+)[\'"`]',
+            ("url_property", r'url\s*:\s*[\'"`]([^\'"`]+)[\'"`]'),
+            ("endpoint_property", r'endpoint\s*:\s*[\'"`]([^\'"`]+)[\'"`]'),
+            ("path_property", r'path\s*:\s*[\'"`]([^\'"`]+)[\'"`]'),
             # API endpoints
-            r'[\'"`](\/api\/[^\'"`]+)[\'"`]',
-            r'[\'"`](\/v\d+\/[^\'"`]+)[\'"`]',
+            ("api_literal", r'[\'"`](\/api\/[^\'"`]+)[\'"`]'),
+            ("versioned_literal", r'[\'"`](\/v\d+\/[^\'"`]+)[\'"`]'),
         ]
 
         # Simple auth detection patterns
@@ -46,85 +48,227 @@ class RegexAnalyzer:
             (r"token\s*:", "token", "body"),
         ]
 
-    def discover_endpoints(self, js_content: str) -> List[Endpoint]:
+        # Literal each rule requires, with how many characters of the rule
+        # can precede it. Rules are only tried where one of these occurs.
+        self.rule_literals = {
+            "axios_method": ("axios", 0),
+            "axios_config": ("axios", 0),
+            "fetch": ("fetch", 0),
+            "fetch_template": ("fetch", 0),
+            "jquery_ajax": ("$.", 0),
+            "jquery_method": ("$.", 0),
+            "url_property": ("url", 0),
+            "endpoint_property": ("endpoint", 0),
+            "path_property": ("path", 0),
+            "api_literal": ("/api/", 1),
+            "versioned_literal": ("/v", 1),
+        }
+
+        self._prefilter = LiteralPrefilter(literal for literal, _ in self.rule_literals.values())
+        self._literal_offsets = sorted({offset for _, offset in self.rule_literals.values()})
+        self._scanner, self._rule_groups = self._compile_scanner(self.patterns)
+        self._scanner_bytes, _ = self._compile_scanner(self.patterns, as_bytes=True)
+        self._rule_order = {name: index for index, (name, _) in enumerate(self.patterns)}
+        self._rules = [re.compile(pattern, re.IGNORECASE) for _, pattern in self.patterns]
+        self._rules_bytes = [re.compile(pattern.encode(), re.IGNORECASE) for _, pattern in self.patterns]
+
+    def _compile_scanner(
+        self, patterns: List[Tuple[str, str]], as_bytes: bool = False
+    ) -> Tuple[Pattern, Dict[str, range]]:
+        """
+        Compile the rule list into a single scanner that tries every rule at an offset.
+
+        Each rule is wrapped in a named group inside a zero-width lookahead, so
+        matches from different rules may overlap just as they did when every
+        pattern was scanned separately. match.lastgroup names the rule that fired.
+
+        Args:
+            patterns (List[Tuple[str, str]]): (rule name, pattern) pairs
+            as_bytes (bool, optional): Compile for scanning bytes instead of text. Defaults to False.
+
+        Returns:
+            Tuple[Pattern, Dict[str, range]]: The compiled scanner and, per rule,
+                                              the indexes of its capture groups
+        """
+        alternatives = []
+        rule_groups = {}
+        group_index = 0
+
+        for name, pattern in patterns:
+            group_count = re.compile(pattern).groups
+            # The named wrapper group comes first, then the rule's own groups
+            rule_groups[name] = range(group_index + 2, group_index + 2 + group_count)
+            group_index += 1 + group_count
+            alternatives.append(f"(?P<{name}>{pattern})")
+
+        scanner = "(?=" + "|".join(alternatives) + ")"
+        if as_bytes:
+            scanner = scanner.encode()
+        return re.compile(scanner, re.IGNORECASE), rule_groups
+
+    def discover_endpoints(
+        self,
+        js_content: Union[str, bytes],
+        line_index: Optional[LineIndex] = None,
+        encoding: str = "utf-8",
+    ) -> List[Endpoint]:
         """
         Find all API endpoints in JavaScript code using regex pattern matching.
         
-        Iterates through multiple regex patterns to identify API endpoints in the code,
-        then extracts context to determine HTTP method and authentication requirements.
+        Runs the combined rule scanner at the offsets found by the literal
+        prefilter, then extracts context to determine HTTP method and
+        authentication requirements. Bytes-like content (such as a mapped
+        file) is scanned as is; only captured paths and context windows are decoded.
         
         Args:
-            js_content (str): JavaScript code content to analyze
+            js_content (Union[str, bytes]): JavaScript code content to analyze
+            line_index (Optional[LineIndex]): Line index of js_content, built here if not given
+            encoding (str, optional): Encoding of bytes-like content. Defaults to "utf-8".
             
         Returns:
             List[Endpoint]: List of discovered API endpoints
         """
+        if line_index is None:
+            line_index = LineIndex(js_content)
+
         endpoints = []
         seen_paths = set()
 
-        for pattern in self.patterns:
-            for match in re.finditer(pattern, js_content, re.IGNORECASE):
-                # Extract path
-                path = None
-                for group in match.groups():
-                    if group and ("/" in group or "api" in group.lower()):
-                        path = group
-                        break
-
-                if not path:
-                    continue
-
-                # Normalize path
-                path = EndpointProcessor.normalize_path(path)
-
-                # Skip if not an endpoint or already seen
-                if not EndpointProcessor.is_endpoint(path) or path in seen_paths:
-                    continue
-
-                seen_paths.add(path)
-
-                # Get context for method and auth detection
-                context = self._get_context(js_content, match.start(), 200)
-
-                # Detect method
-                method = "UNKNOWN"
-                method_match = re.search(
-                    r"(get|post|put|delete|patch)", context, re.IGNORECASE
-                )
-                if method_match:
-                    method = method_match.group(1).upper()
-
-                # Detect auth
-                auth = self._detect_auth(context)
-
-                # Calculate line number
-                line_number = js_content[:match.start()].count('\n') + 1
-                
-                # Create endpoint
-                endpoint = Endpoint(
-                    path=path,
-                    method=method,
-                    auth=auth,
-                    confidence=0.7,
-                    detector="regex",
-                    line_number=line_number
-                )
-
-                endpoints.append(endpoint)
+        # Process matches rule by rule, in pattern order, so the first rule to
+        # report a path keeps it exactly as with one scan per pattern
+        candidates = sorted(self._scan(js_content, encoding))
+        rule_end = {}
+
+        for rule_index, start, end, groups in candidates:
+            rule = self.patterns[rule_index][0]
+
+            # A rule never matches inside its own previous match
+            if start < rule_end.get(rule, 0):
+                continue
+            rule_end[rule] = end
+
+            # Extract path
+            path = None
+            for group in groups:
+                if group and ("/" in group or "api" in group.lower()):
+                    path = group
+                    break
+
+            if not path:
+                continue
+
+            # Normalize path
+            path = EndpointProcessor.normalize_path(path)
+
+            # Skip if not an endpoint or already seen
+            if not EndpointProcessor.is_endpoint(path) or path in seen_paths:
+                continue
+
+            seen_paths.add(path)
+
+            # Get context for method and auth detection
+            context = self._get_context(js_content, start, 200)
+            if not isinstance(context, str):
+                context = context.decode(encoding, errors="replace")
+
+            # Detect method
+            method = "UNKNOWN"
+            method_match = re.search(
+                r"(get|post|put|delete|patch)", context, re.IGNORECASE
+            )
+            if method_match:
+                method = method_match.group(1).upper()
+
+            # Detect auth
+            auth = self._detect_auth(context)
+
+            # Calculate line number
+            line_number = line_index.line_of(start)
+            
+            # Create endpoint
+            endpoint = Endpoint(
+                path=path,
+                method=method,
+                auth=auth,
+                confidence=0.7,
+                detector="regex",
+                line_number=line_number,
+                rule=rule,
+            )
+
+            endpoints.append(endpoint)
 
         return endpoints
 
-    def _get_context(self, content: str, position: int, window: int = 200) -> str:
+    def _scan(
+        self, js_content: Union[str, bytes], encoding: str = "utf-8"
+    ) -> Iterator[Tuple[int, int, int, Tuple[Optional[str], ...]]]:
+        """
+        Find candidate offsets with one literal prefilter pass and yield every rule match.
+
+        The combined scanner is only tried at offsets where a rule's required
+        literal occurs. It reports the first rule that matches at an offset;
+        later rules are then tried at that same offset only, since two rules can
+        match there with different captures (e.g. fetch and fetch_template).
+
+        Args:
+            js_content (Union[str, bytes]): JavaScript code content to scan
+            encoding (str, optional): Encoding used to decode captures from bytes-like content
+
+        Yields:
+            Tuple[int, int, int, Tuple[Optional[str], ...]]: (rule index, start, end, groups)
+                                                              for each match
+        """
+        candidates = {
+            hit - offset
+            for hit in self._prefilter.find(js_content)
+            for offset in self._literal_offsets
+            if hit >= offset
+        }
+
+        if isinstance(js_content, str):
+            scanner, rules = self._scanner, self._rules
+
+            def decode(groups):
+                return groups
+        else:
+            scanner, rules = self._scanner_bytes, self._rules_bytes
+
+            def decode(groups):
+                return tuple(g.decode(encoding, errors="replace") if g else g for g in groups)
+
+        for position in sorted(candidates):
+            match = scanner.match(js_content, position)
+            if not match:
+                continue
+
+            rule = match.lastgroup
+            rule_index = self._rule_order[rule]
+            start = position
+
+            yield (
+                rule_index,
+                start,
+                match.end(rule),
+                decode(tuple(match.group(index) for index in self._rule_groups[rule])),
+            )
+
+            for later_index in range(rule_index + 1, len(rules)):
+                later = rules[later_index].match(js_content, start)
+                if later:
+                    yield later_index, start, later.end(), decode(later.groups())
+
+    def _get_context(self, content: Union[str, bytes], position: int, window: int = 200) -> Union[str, bytes]:
         """
         Get a window of code surrounding a specific position.
         
         Args:
-            content (str): The full JavaScript content
+            content (Union[str, bytes]): The full JavaScript content
             position (int): Position in the content to center the window on
             window (int, optional): Total size of the context window. Defaults to 200.
             
         Returns:
-            str: A substring of the content centered around the position
+            Union[str, bytes]: A slice of the content centered around the position
         """
         start = max(0, position - window // 2)
         end = min(len(content), position + window // 2)
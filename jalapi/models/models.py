@@ -39,6 +39,12 @@ class Endpoint:
         detector (str): Detection method used ("regex", "llm", or combinations like "regex+llm")
         context (Optional[str]): Additional context about how/where the endpoint was found
         line_number (Optional[int]): Line number in the source file where the endpoint was found
+        rule (Optional[str]): Name of the regex rule that matched, for regex findings
+        source (Optional[str]): Original source file the endpoint was found in, when a bundle
+                                was analyzed through its source map; line_number is then
+                                relative to that file
+        module (Optional[str]): ID of the bundle module the endpoint was found in, when a
+                                bundle was split into its modules
     """
 
     path: str
@@ -48,6 +54,9 @@ class Endpoint:
     detector: str = "regex"
     context: Optional[str] = None
     line_number: Optional[int] = None
+    rule: Optional[str] = None
+    source: Optional[str] = None
+    module: Optional[str] = None
 
     def __post_init__(self):
         """
@@ -59,3 +68,133 @@ class Endpoint:
         """
         if self.auth is None:
             self.auth = AuthInfo()
+
+
+@dataclass
+class SourceModule:
+    """
+    Represents a part of a file that is analyzed and cached on its own.
+    
+    Attributes:
+        content (str): The code of the part
+        source (Optional[str]): Original source file, for sources taken from a source map
+        module_id (Optional[str]): Module ID, for modules split out of a bundle; None for
+                                   original sources and for code between modules
+        start_line (int): Line of the file the content starts at, for modules split out of a
+                          bundle; original sources keep their own line numbers and use 1
+    """
+
+    content: str
+    source: Optional[str] = None
+    module_id: Optional[str] = None
+    start_line: int = 1
+
+
+@dataclass
+class VendorRegion:
+    """
+    Represents a region of a file recognized as a known third-party library.
+    
+    Attributes:
+        library (str): Name of the library
+        start (int): Offset of the first character of the region
+        end (int): Offset just past the last character of the region
+        matches (int): Number of the library's fingerprints found in the region
+    """
+
+    library: str
+    start: int
+    end: int
+    matches: int = 0
+
+
+@dataclass
+class ChunkCoverage:
+    """
+    Represents how much of a code chunk's endpoint usage the regex stage resolved.
+    
+    Attributes:
+        url_literals (int): Number of string literals in the chunk that look like API endpoints
+        resolved_literals (int): How many of those the regex stage found with a known HTTP method
+        dynamic (bool): Whether the chunk builds URLs dynamically (interpolation, concatenation,
+                        URL constructors), which regex cannot resolve
+    """
+
+    url_literals: int = 0
+    resolved_literals: int = 0
+    dynamic: bool = False
+
+    @property
+    def ratio(self) -> Optional[float]:
+        """Fraction of endpoint literals resolved, or None if the chunk has none."""
+        if self.url_literals == 0:
+            return None
+        return self.resolved_literals / self.url_literals
+
+    def fully_covered(self, threshold: float = 1.0) -> bool:
+        """
+        Check whether the regex stage already covers the chunk.
+        
+        Args:
+            threshold (float, optional): Minimum resolved fraction. Defaults to 1.0.
+            
+        Returns:
+            bool: True if the chunk has endpoint literals, no dynamic URL
+                  construction and at least the threshold fraction resolved
+        """
+        return not self.dynamic and self.ratio is not None and self.ratio >= threshold
+
+
+@dataclass
+class ChunkRegion:
+    """
+    Represents the span of a chunk sent to the LLM and the part of it that it owns.
+    
+    Consecutive chunks overlap, so a finding in the overlap can be reported by
+    both. Each finding is kept only by the chunk whose owned region contains
+    it. The boundary between two chunks is the middle of their overlap, so
+    both have seen some code on either side of it.
+    
+    Attributes:
+        start (int): Offset of the first character (or byte) of the chunk
+        end (int): Offset just past the end of the chunk
+        start_line (int): Line number of the first line of the chunk
+        owned_start (Optional[int]): Start of the owned region. Defaults to start.
+        owned_end (Optional[int]): End of the owned region. Defaults to end.
+    """
+
+    start: int
+    end: int
+    start_line: int
+    owned_start: Optional[int] = None
+    owned_end: Optional[int] = None
+
+    def __post_init__(self):
+        """Default the owned region to the whole chunk."""
+        if self.owned_start is None:
+            self.owned_start = self.start
+        if self.owned_end is None:
+            self.owned_end = self.end
+
+    def follow(self, previous: "ChunkRegion") -> None:
+        """
+        Split ownership of the overlap with the previous chunk at its middle.
+        
+        Args:
+            previous (ChunkRegion): The chunk sent to the LLM just before this one
+        """
+        boundary = (self.start + previous.end) // 2 if previous.end > self.start else self.start
+        previous.owned_end = boundary
+        self.owned_start = boundary
+
+    def owns(self, offset: int) -> bool:
+        """
+        Check whether a finding at an offset belongs to this chunk.
+        
+        Args:
+            offset (int): Offset of the finding in the file
+            
+        Returns:
+            bool: True if the offset lies in the owned region
+        """
+        return self.owned_start <= offset < self.owned_end
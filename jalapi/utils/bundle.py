@@ -0,0 +1,203 @@
+# bundle.py
+"""
+Bundle splitting for JALAPI.
+
+This module splits webpack bundles into their modules, so each module can be
+analyzed and cached on its own. Two layouts are recognized: module maps (the
+object or array of module functions that minified chunks push onto
+webpackChunk*/webpackJsonp, or that __webpack_modules__ is set to), parsed
+with the reflow lexer, and the "/***/" module markers of development builds.
+Code between modules, such as the webpack runtime, is kept as separate
+pieces without a module ID, so splitting never drops code.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from jalapi.utils.reflow import end_of_expression
+
+# A module ID with the span of a file it covers; the ID is None for code between modules
+ModuleSpan = Tuple[Optional[str], int, int]
+
+# Start of a module map: a chunk pushed onto the JSONP array, or __webpack_modules__
+_MODULE_MAP = re.compile(
+    r"""webpack(?:Chunk|Jsonp)[\w$]*["']?\]?\s*\|\|\s*\[\]\s*\)\s*\.push\(\s*\[\s*\[[^\]]*\]\s*,\s*([{\[])"""
+    r"|__webpack_modules__\s*=\s*\(?\s*([{\[])"
+)
+
+# Whitespace and comments between module map entries
+_GAP = re.compile(r"(?:\s+|/\*.*?\*/|//[^\n]*)*", re.DOTALL)
+
+# Separators, whitespace and comments that are not worth analyzing between modules
+_FILLER = re.compile(r"(?:[\s,]+|/\*.*?\*/|//[^\n]*)*", re.DOTALL)
+
+# Key of a module map entry
+_KEY = re.compile(r"""(?:(\d+)|"([^"\n]*)"|'([^'\n]*)'|([A-Za-z_$][\w$]*))\s*:""")
+
+# Module marker of a development build: /***/ "./src/a.js": or /* 12 */ followed by /***/
+_MARKER = re.compile(
+    r"""^/\*\*\*/ (?:"([^"\n]+)"|'([^'\n]+)'|(\d+)):[^\S\n]*$"""
+    r"|^/\* (\d+) \*/\n(?=/\*\*\*/ )",
+    re.MULTILINE,
+)
+
+# Runtime line following the last module of a development build
+_RUNTIME_LINE = re.compile(r"^/\*{6}/", re.MULTILINE)
+
+
+def split_bundle(content: str, min_modules: int = 2) -> Optional[Tuple[str, List[ModuleSpan]]]:
+    """
+    Split a bundle into its modules.
+
+    Module maps are looked for first, then development build markers. A
+    module map whose entries do not parse cleanly is not used, so a lexing
+    mistake leads to analyzing the file whole rather than to wrong modules.
+
+    Args:
+        content (str): The bundle's code
+        min_modules (int, optional): Fewest modules for the file to count as a bundle. Defaults to 2.
+
+    Returns:
+        Optional[Tuple[str, List[ModuleSpan]]]: The layout ("module_map" or "markers") and
+            (module ID, start, end) spans covering the whole file in order, or None if the
+            file is not a recognized bundle
+    """
+    for layout, find_modules in (("module_map", _module_map_spans), ("markers", _marker_spans)):
+        modules = find_modules(content)
+        if len(modules) >= min_modules:
+            return layout, _fill_gaps(content, modules)
+    return None
+
+
+def _module_map_spans(content: str) -> List[ModuleSpan]:
+    """
+    Find the modules in every module map of a file.
+
+    Args:
+        content (str): The bundle's code
+
+    Returns:
+        List[ModuleSpan]: Spans of the module entries, each from its key (or, in arrays,
+                          its function) to the end of its function
+    """
+    modules: List[ModuleSpan] = []
+    position = 0
+
+    while True:
+        anchor = _MODULE_MAP.search(content, position)
+        if anchor is None:
+            return modules
+        opener = anchor.group(1) or anchor.group(2)
+        parse = _object_entries if opener == "{" else _array_entries
+        entries, position = parse(content, anchor.end())
+        if entries is None:
+            position = anchor.end()
+        else:
+            modules.extend(entries)
+
+
+def _object_entries(content: str, position: int) -> Tuple[Optional[List[ModuleSpan]], int]:
+    """
+    Parse the entries of a module map object.
+
+    Args:
+        content (str): The bundle's code
+        position (int): Offset just after the object's opening brace
+
+    Returns:
+        Tuple[Optional[List[ModuleSpan]], int]: The entries, or None if the object does not
+                                                parse, and the offset after the object
+    """
+    entries: List[ModuleSpan] = []
+    while True:
+        position = _GAP.match(content, position).end()
+        if content.startswith("}", position):
+            return entries, position + 1
+        key = _KEY.match(content, position)
+        if key is None:
+            return None, position
+        end = end_of_expression(content, key.end())
+        if end >= len(content) or content[end] not in ",}":
+            return None, position
+        module_id = next(group for group in key.groups() if group is not None)
+        entries.append((module_id, key.start(), end))
+        position = end + (content[end] == ",")
+
+
+def _array_entries(content: str, position: int) -> Tuple[Optional[List[ModuleSpan]], int]:
+    """
+    Parse the entries of a module map array, whose module IDs are the indexes.
+
+    Args:
+        content (str): The bundle's code
+        position (int): Offset just after the array's opening bracket
+
+    Returns:
+        Tuple[Optional[List[ModuleSpan]], int]: The entries, or None if the array does not
+                                                parse, and the offset after the array
+    """
+    entries: List[ModuleSpan] = []
+    index = 0
+    while True:
+        position = _GAP.match(content, position).end()
+        if content.startswith("]", position):
+            return entries, position + 1
+        if content.startswith(",", position):
+            # A hole left by a module moved to another chunk
+            index += 1
+            position += 1
+            continue
+        end = end_of_expression(content, position)
+        if end >= len(content) or content[end] not in ",]":
+            return None, position
+        entries.append((str(index), position, end))
+        index += 1
+        position = end + (content[end] == ",")
+
+
+def _marker_spans(content: str) -> List[ModuleSpan]:
+    """
+    Find the modules of a development build by their "/***/" markers.
+
+    Each module runs from its marker to the next marker, or to the next
+    runtime line for the last one.
+
+    Args:
+        content (str): The bundle's code
+
+    Returns:
+        List[ModuleSpan]: Spans of the modules, each starting at its marker
+    """
+    markers = [
+        (next(group for group in match.groups() if group is not None), match.start())
+        for match in _MARKER.finditer(content)
+    ]
+    modules: List[ModuleSpan] = []
+    for index, (module_id, start) in enumerate(markers):
+        end = markers[index + 1][1] if index + 1 < len(markers) else len(content)
+        runtime = _RUNTIME_LINE.search(content, start, end)
+        modules.append((module_id, start, runtime.start() if runtime else end))
+    return modules
+
+
+def _fill_gaps(content: str, modules: List[ModuleSpan]) -> List[ModuleSpan]:
+    """
+    Add the code between modules as pieces without a module ID.
+
+    Args:
+        content (str): The bundle's code
+        modules (List[ModuleSpan]): Module spans in file order
+
+    Returns:
+        List[ModuleSpan]: Spans covering the whole file, leaving out gaps holding nothing
+                          but whitespace, commas and comments
+    """
+    spans: List[ModuleSpan] = []
+    position = 0
+    for module_id, start, end in modules + [(None, len(content), len(content))]:
+        if not _FILLER.fullmatch(content, position, start):
+            spans.append((None, position, start))
+        if module_id is not None:
+            spans.append((module_id, start, end))
+        position = end
+    return spans
@@ -8,7 +8,25 @@ critical configuration sections are included.
 """
 
 import re
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Iterator, Optional, Tuple, Union
+
+from jalapi.utils.line_index import LineIndex
+from jalapi.utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+from jalapi.logging.log_setup import logger
+
+
+# Lines that start a function, where chunk_code starts a new chunk. The pattern
+# is matched at line starts within the whole file, so whitespace may not cross
+# a line break. Every alternative ends in the keyword, which is searched first.
+_FUNCTION_START = re.compile(
+    r"^[^\S\n]*(?:async[^\S\n]+)?function"
+    r"|^[^\S\n]*const[^\S\n]+\w+[^\S\n]*=[^\S\n]*(?:async[^\S\n]+)?function",
+    re.MULTILINE,
+)
+_FUNCTION_KEYWORD = "function"
+
+# Non-blank lines at the end of a chunk that chunk_code returns as its context
+_CONTEXT_LINES = 5
 
 
 def chunk_code(code: str, max_chunk_size: int = 4000) -> List[Tuple[str, str]]:
@@ -26,107 +44,446 @@ def chunk_code(code: str, max_chunk_size: int = 4000) -> List[Tuple[str, str]]:
         List[Tuple[str, str]]: List of (chunk, context) tuples where context contains
                               relevant surrounding code for better analysis
     """
-    # Split on function boundaries or large blocks
-    chunks = []
-    lines = code.split("\n")
-    current_chunk = []
-    current_context = []
-
-    for line in lines:
-        # Look for function/block starts
-        if re.match(
-            r"^\s*(async\s+)?function|^\s*const\s+\w+\s*=\s*(?:async\s+)?function",
-            line,
-        ):
-            if current_chunk:
-                chunks.append(
-                    ("\n".join(current_chunk), "\n".join(current_context[-5:]))
-                )
-            current_chunk = []
-            current_context = []
-        current_chunk.append(line)
-        # Keep last 5 lines as context
-        if len(line.strip()) > 0:
-            current_context.append(line)
-            if len(current_context) > 5:
-                current_context.pop(0)
-
-        # Check chunk size and split if needed
-        if len("\n".join(current_chunk)) > max_chunk_size:
-            chunks.append(("\n".join(current_chunk), "\n".join(current_context[-5:])))
-            current_chunk = []
-            current_context = []
-
-    if current_chunk:
-        chunks.append(("\n".join(current_chunk), "\n".join(current_context[-5:])))
-
-    return chunks
-
-
-def simple_chunk_code(code: str, max_size: int = 3000, overlap: int = 1000) -> List[Tuple[str, str, int]]:
+    return [
+        (code[start:end], _tail_context(code, start, end))
+        for start, end, _ in chunk_code_spans(code, max_chunk_size)
+    ]
+
+
+def chunk_code_spans(code: str, max_chunk_size: int = 4000) -> Iterator[Tuple[int, int, int]]:
     """
-    Improved chunking with better overlap and context preservation.
+    Yield the spans of the chunks chunk_code splits code into.
     
-    Splits code at logical boundaries with overlap between chunks, and extracts
-    configuration sections to include as context with each chunk for better analysis.
+    A chunk is a run of whole lines. A new chunk starts at every line that
+    begins a function, and a chunk ends after the first line that takes its
+    length over max_chunk_size. Each boundary is found with one find from the
+    chunk's start, and line numbers are kept as a running newline count, so
+    the cost is linear in the size of the code.
     
     Args:
         code (str): JavaScript code to chunk
-        max_size (int, optional): Maximum size of each chunk. Defaults to 3000.
-        overlap (int, optional): Overlap size between consecutive chunks. Defaults to 1000.
+        max_chunk_size (int, optional): Maximum size of each chunk. Defaults to 4000.
+        
+    Yields:
+        Tuple[int, int, int]: (start_offset, end_offset, start_line) of each chunk; the
+                              end offset excludes the newline ending the chunk's last line
+    """
+    functions = _function_line_starts(code)
+    next_function = next(functions, None)
+    start, line = 0, 1
+
+    while True:
+        # A function on the chunk's first line does not split it
+        while next_function is not None and next_function <= start:
+            next_function = next(functions, None)
+
+        # End of the line that first takes the chunk over the size limit, if any
+        oversize = None
+        if start + max_chunk_size < len(code):
+            oversize = code.find("\n", start + max_chunk_size + 1)
+            if oversize < 0:
+                oversize = len(code)
+
+        if next_function is not None and (oversize is None or next_function <= oversize):
+            end, next_start = next_function - 1, next_function
+        elif oversize is not None:
+            end, next_start = oversize, oversize + 1
+        else:
+            end = len(code)
+
+        yield start, end, line
+        if end == len(code):
+            break
+
+        line += code.count("\n", start, next_start)
+        start = next_start
+
+
+def _function_line_starts(code: str) -> Iterator[int]:
+    """
+    Yield the offset of every line that starts a function, in increasing order.
+    
+    Args:
+        code (str): JavaScript code to search
+        
+    Yields:
+        int: Offset of the first character of the line
+    """
+    previous = -1
+    position = code.find(_FUNCTION_KEYWORD)
+
+    while position >= 0:
+        # Only test each line once, at its first keyword, searching back no
+        # further than the previous keyword
+        newline = code.rfind("\n", max(previous, 0), position)
+        if newline >= 0 or previous < 0:
+            line_start = newline + 1
+            if _FUNCTION_START.match(code, line_start):
+                yield line_start
+        previous = position
+        position = code.find(_FUNCTION_KEYWORD, position + 1)
+
+
+def _tail_context(code: str, start: int, end: int) -> str:
+    """
+    Get the last few non-blank lines of a chunk, read backwards from its end.
+    
+    Args:
+        code (str): JavaScript code the chunk comes from
+        start (int): Start offset of the chunk
+        end (int): End offset of the chunk
         
     Returns:
-        List[Tuple[str, str, int]]: List of (chunk, context, start_line) tuples where:
-                                  - chunk: the code segment
-                                  - context: configuration objects that define URLs/endpoints
-                                  - start_line: the starting line number of the chunk
-    """
-    chunks = []
-    start = 0
-
-    # Find key configuration objects that define URLs/endpoints
-    config_matches = list(
-        re.finditer(
-            r"const\s+(?:CONFIG|config|API|api|endpoints|ENDPOINTS|routes|ROUTES)\s*=",
-            code,
-        )
+        str: Up to _CONTEXT_LINES non-blank lines, joined by newlines
+    """
+    lines = []
+    while len(lines) < _CONTEXT_LINES:
+        newline = code.rfind("\n", start, end)
+        line = code[newline + 1 if newline >= 0 else start:end]
+        if line.strip():
+            lines.append(line)
+        if newline < 0:
+            break
+        end = newline
+
+    return "\n".join(reversed(lines))
+
+
+# Definitions of configuration objects that describe URLs/endpoints
+_CONFIG_DEFINITION = r"const\s+(?:CONFIG|config|API|api|endpoints|ENDPOINTS|routes|ROUTES)\s*="
+_CONFIG_PATTERN = re.compile(_CONFIG_DEFINITION)
+_CONFIG_PATTERN_BYTES = re.compile(_CONFIG_DEFINITION.encode())
+
+# Logical boundaries to end a chunk on, in order of preference. "\n});" is not
+# listed: "\n}" is its prefix and is always found first wherever it occurs.
+_CHUNK_DELIMITERS = ["\n}", "\n  });", "\n    });"]
+_CHUNK_DELIMITERS_BYTES = [delimiter.encode() for delimiter in _CHUNK_DELIMITERS]
+
+# Token-sized chunks never shrink below this, even when the context is large
+MIN_CHUNK_TOKENS = 128
+
+# Fraction of the token budget a chunk must reach before fitting stops
+_PACKING_TARGET = 0.95
+
+# Rounds of measuring and rescaling a chunk to fit its token budget
+_FIT_ROUNDS = 4
+
+
+def _code_helpers(code: Union[str, bytes], encoding: str):
+    """
+    Get the config pattern, delimiters, newline and decoder matching the type of code.
+
+    Args:
+        code (Union[str, bytes]): JavaScript code to chunk
+        encoding (str): Encoding of bytes-like code
+
+    Returns:
+        Tuple: (config pattern, chunk delimiters, newline, decode function)
+    """
+    if isinstance(code, str):
+        return _CONFIG_PATTERN, _CHUNK_DELIMITERS, "\n", lambda segment: segment
+
+    return (
+        _CONFIG_PATTERN_BYTES,
+        _CHUNK_DELIMITERS_BYTES,
+        b"\n",
+        lambda segment: bytes(segment).decode(encoding, errors="replace"),
     )
+
+
+def _config_context(code: Union[str, bytes], config_pattern, decode) -> str:
+    """
+    Collect the configuration objects that define URLs/endpoints into a context block.
+
+    Args:
+        code (Union[str, bytes]): JavaScript code to search
+        config_pattern (Pattern): Pattern matching configuration definitions
+        decode (Callable): Turns a slice of code into text
+
+    Returns:
+        str: Context sent with every chunk, empty if no configuration was found
+    """
     config_sections = []
 
-    for match in config_matches:
+    for match in config_pattern.finditer(code):
         # Extract roughly 500 chars after the config definition
         config_start = match.start()
         config_end = min(match.end() + 500, len(code))
-        config_sections.append(code[config_start:config_end])
+        config_sections.append(decode(code[config_start:config_end]))
 
     config_context = "\n\n".join(config_sections)
 
-    while start < len(code):
-        end = min(start + max_size, len(code))
+    # Add config context to each chunk
+    if config_context:
+        return f"IMPORTANT CONFIGURATION:\n{config_context}"
+    return ""
+
+
+def config_context(code: Union[str, bytes], encoding: str = "utf-8") -> str:
+    """
+    Get the configuration context that chunkers send with every chunk of code.
+
+    Args:
+        code (Union[str, bytes]): JavaScript code, as text or bytes-like content
+        encoding (str, optional): Encoding of bytes-like code. Defaults to "utf-8".
+
+    Returns:
+        str: The "IMPORTANT CONFIGURATION" block, empty if no configuration was found
+    """
+    config_pattern, _, _, decode = _code_helpers(code, encoding)
+    return _config_context(code, config_pattern, decode)
+
+
+def simple_chunk_code(
+    code: Union[str, bytes],
+    max_size: int = 3000,
+    overlap: int = 1000,
+    line_index: Optional[LineIndex] = None,
+    encoding: str = "utf-8",
+) -> Iterator[Tuple[str, str, int]]:
+    """
+    Improved chunking with better overlap and context preservation.
+    
+    Splits code at logical boundaries with overlap between chunks, and extracts
+    configuration sections to include as context with each chunk for better analysis.
+    Chunks are produced lazily. Bytes-like code (such as a mapped file) is split
+    by byte offsets and only the chunks themselves are decoded.
+    
+    Args:
+        code (Union[str, bytes]): JavaScript code to chunk
+        max_size (int, optional): Maximum size of each chunk. Defaults to 3000.
+        overlap (int, optional): Overlap size between consecutive chunks. Defaults to 1000.
+        line_index (Optional[LineIndex]): Line index of code, built here if not given
+        encoding (str, optional): Encoding of bytes-like code. Defaults to "utf-8".
+        
+    Yields:
+        Tuple[str, str, int]: (chunk, context, start_line) tuples where:
+                              - chunk: the code segment
+                              - context: configuration objects that define URLs/endpoints
+                              - start_line: the starting line number of the chunk
+    """
+    _, _, _, decode = _code_helpers(code, encoding)
+    context = config_context(code, encoding)
+
+    for start, end, start_line in simple_chunk_spans(code, max_size, overlap, line_index):
+        yield decode(code[start:end]), context, start_line
+
+
+def simple_chunk_spans(
+    code: Union[str, bytes],
+    max_size: int = 3000,
+    overlap: int = 1000,
+    line_index: Optional[LineIndex] = None,
+    start_offset: int = 0,
+    end_offset: Optional[int] = None,
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yield the spans of the chunks simple_chunk_code splits code into.
+    
+    Each chunk is at most max_size long and ends at the last logical boundary
+    inside that window, if any. Only the window itself is searched and line
+    numbers come from the line index, so each chunk costs O(max_size).
+    
+    Args:
+        code (Union[str, bytes]): JavaScript code to chunk, as text or bytes-like content
+        max_size (int, optional): Maximum size of each chunk. Defaults to 3000.
+        overlap (int, optional): Overlap size between consecutive chunks. Defaults to 1000.
+        line_index (Optional[LineIndex]): Line index of code, built here if not given
+        start_offset (int, optional): Offset at which to start chunking. Defaults to 0.
+        end_offset (Optional[int]): Offset at which to stop chunking. Defaults to the end of code.
+        
+    Yields:
+        Tuple[int, int, int]: (start_offset, end_offset, start_line) of each chunk
+    """
+    if line_index is None:
+        line_index = LineIndex(code)
+
+    delimiters = _CHUNK_DELIMITERS if isinstance(code, str) else _CHUNK_DELIMITERS_BYTES
+    # Ensure we make meaningful progress but maintain overlap
+    progress = max(max_size // 3, max_size - overlap)
+    length = len(code) if end_offset is None else end_offset
+    start = start_offset
+
+    while start < length:
+        end = min(start + max_size, length)
 
         # Try to end at logical boundaries
-        if end < len(code):
-            for delimiter in ["\n}", "\n});", "\n  });", "\n    });"]:
+        if end < length:
+            for delimiter in delimiters:
                 last_delimiter = code.rfind(delimiter, start, end)
                 if last_delimiter > start:
                     end = last_delimiter + len(delimiter)
                     break
 
-        chunk = code[start:end]
+        yield start, end, line_index.line_of(start)
+        start = min(end, start + progress)
 
-        # Calculate starting line number of this chunk
-        start_line = code[:start].count('\n') + 1
-        
-        # Add config context to each chunk
-        if config_context:
-            context = f"IMPORTANT CONFIGURATION:\n{config_context}"
-        else:
-            context = ""
 
-        chunks.append((chunk, context, start_line))
+def token_chunk_code(
+    code: Union[str, bytes],
+    max_tokens: int = 1000,
+    overlap_tokens: int = 250,
+    reserved_tokens: int = 0,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+    line_index: Optional[LineIndex] = None,
+    encoding: str = "utf-8",
+) -> Iterator[Tuple[str, str, int]]:
+    """
+    Chunk code against a token budget instead of a character count.
+
+    Each request carries the chunk, the configuration context and the prompts,
+    so the chunk itself gets max_tokens minus reserved_tokens minus the
+    context's tokens.
+
+    Args:
+        code (Union[str, bytes]): JavaScript code to chunk
+        max_tokens (int, optional): Token budget of one request. Defaults to 1000.
+        overlap_tokens (int, optional): Approximate overlap between consecutive chunks, in tokens.
+            Defaults to 250.
+        reserved_tokens (int, optional): Tokens of the budget taken by the prompts. Defaults to 0.
+        count_tokens (Callable[[str], int], optional): Token counter. Defaults to estimate_tokens.
+        line_index (Optional[LineIndex]): Line index of code, built here if not given
+        encoding (str, optional): Encoding of bytes-like code. Defaults to "utf-8".
+
+    Yields:
+        Tuple[str, str, int]: (chunk, context, start_line) tuples, as from simple_chunk_code
+    """
+    _, _, _, decode = _code_helpers(code, encoding)
+    context = config_context(code, encoding)
+    spans = token_chunk_spans(
+        code,
+        max_tokens=max_tokens,
+        overlap_tokens=overlap_tokens,
+        reserved_tokens=reserved_tokens + count_tokens(context),
+        count_tokens=count_tokens,
+        line_index=line_index,
+        encoding=encoding,
+    )
+
+    for start, end, start_line in spans:
+        yield decode(code[start:end]), context, start_line
+
+
+def token_chunk_spans(
+    code: Union[str, bytes],
+    max_tokens: int = 1000,
+    overlap_tokens: int = 250,
+    reserved_tokens: int = 0,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+    line_index: Optional[LineIndex] = None,
+    encoding: str = "utf-8",
+    start_offset: int = 0,
+    end_offset: Optional[int] = None,
+) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yield the spans of chunks that each fit max_tokens minus reserved_tokens.
+
+    Chunk length is fitted to the budget by measuring candidate spans and
+    rescaling with the measured token density, so dense minified or non-ASCII
+    code gets shorter chunks and sparse code longer ones. A chunk ends at a
+    logical boundary in its second half if there is one, otherwise at a line
+    break.
+
+    Args:
+        code (Union[str, bytes]): JavaScript code to chunk
+        max_tokens (int, optional): Token budget of one request. Defaults to 1000.
+        overlap_tokens (int, optional): Approximate overlap between consecutive chunks, in tokens.
+            Defaults to 250.
+        reserved_tokens (int, optional): Tokens of the budget taken by everything but the chunk,
+            such as the prompts and configuration context. Defaults to 0.
+        count_tokens (Callable[[str], int], optional): Token counter. Defaults to estimate_tokens.
+        line_index (Optional[LineIndex]): Line index of code, built here if not given
+        encoding (str, optional): Encoding of bytes-like code. Defaults to "utf-8".
+        start_offset (int, optional): Offset at which to start chunking. Defaults to 0.
+        end_offset (Optional[int]): Offset at which to stop chunking. Defaults to the end of code.
+
+    Yields:
+        Tuple[int, int, int]: (start_offset, end_offset, start_line) of each chunk
+    """
+    if line_index is None:
+        line_index = LineIndex(code)
+
+    _, delimiters, newline, decode = _code_helpers(code, encoding)
+
+    budget = max_tokens - reserved_tokens
+    if budget < MIN_CHUNK_TOKENS:
+        logger.warning(
+            f"Prompts and context leave {budget} of {max_tokens} tokens per chunk, "
+            f"using {MIN_CHUNK_TOKENS}"
+        )
+        budget = MIN_CHUNK_TOKENS
+
+    # Characters (or bytes) per token, refined from each measured chunk
+    density = float(CHARS_PER_TOKEN)
+    limit = len(code) if end_offset is None else end_offset
+    start = start_offset
+
+    while start < limit:
+        length, tokens = _fit_chunk(code, start, limit, budget, density, count_tokens, decode)
+        end = start + length
+        density = length / max(tokens, 1)
+
+        # Try to end at logical boundaries, without giving up more than half the chunk
+        if end < limit:
+            floor = start + length // 2
+            for boundary in delimiters + [newline]:
+                last_boundary = code.rfind(boundary, floor, end)
+                if last_boundary > start:
+                    end = last_boundary + len(boundary)
+                    break
+
+        yield start, end, line_index.line_of(start)
+
+        if end >= limit:
+            break
 
         # Ensure we make meaningful progress but maintain overlap
-        progress = max(max_size // 3, max_size - overlap)
-        start = min(end, start + progress)
+        size = end - start
+        start += max(size // 3, size - int(overlap_tokens * density))
+
+
+def _fit_chunk(
+    code: Union[str, bytes],
+    start: int,
+    limit: int,
+    budget: int,
+    density: float,
+    count_tokens: Callable[[str], int],
+    decode: Callable,
+) -> Tuple[int, int]:
+    """
+    Find a chunk length starting at an offset that fills close to a token budget.
+
+    Args:
+        code (Union[str, bytes]): JavaScript code being chunked
+        start (int): Start offset of the chunk
+        limit (int): Offset the chunk may not extend past
+        budget (int): Maximum tokens of the chunk
+        density (float): Expected characters per token
+        count_tokens (Callable[[str], int]): Token counter
+        decode (Callable): Turns a slice of code into text
+
+    Returns:
+        Tuple[int, int]: The chunk length and its token count
+    """
+    remaining = limit - start
+    length = max(1, min(remaining, int(budget * density)))
+    best = (0, 0)
+
+    for _ in range(_FIT_ROUNDS):
+        tokens = count_tokens(decode(code[start:start + length]))
+        if tokens <= budget:
+            best = max(best, (length, tokens))
+            if length == remaining or tokens >= budget * _PACKING_TARGET:
+                break
+        # Rescale towards the budget using the density just measured
+        length = max(1, min(remaining, int(length * budget * _PACKING_TARGET / max(tokens, 1))))
+
+    # Nothing fitted yet, so keep halving until something does
+    while best[0] == 0:
+        tokens = count_tokens(decode(code[start:start + length]))
+        if tokens <= budget or length == 1:
+            best = (length, tokens)
+        length = max(1, length // 2)
 
-    return chunks
+    return best
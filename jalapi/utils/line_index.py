@@ -0,0 +1,89 @@
+# line_index.py
+"""
+Line offset index for JALAPI.
+
+This module provides a lookup structure that maps character offsets in a file
+to line and column numbers, built once per file instead of recounting newlines
+for every match or chunk.
+"""
+
+import re
+from bisect import bisect_left
+from typing import List, Tuple, Union
+
+_NEWLINE = re.compile("\n")
+_NEWLINE_BYTES = re.compile(b"\n")
+
+
+class LineIndex:
+    """Map offsets in a piece of content to 1-based line and column numbers."""
+
+    def __init__(self, content: Union[str, bytes]):
+        """
+        Build the index from the newline offsets of the content.
+
+        Args:
+            content (Union[str, bytes]): The text, or any bytes-like object such as a mapped file
+        """
+        newline = _NEWLINE if isinstance(content, str) else _NEWLINE_BYTES
+        self._newlines: List[int] = [m.start() for m in newline.finditer(content)]
+        self.length = len(content)
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the content."""
+        return len(self._newlines) + 1
+
+    def line_of(self, offset: int) -> int:
+        """
+        Get the line number containing an offset.
+
+        Equivalent to content[:offset].count("\\n") + 1, without copying or scanning.
+
+        Args:
+            offset (int): Offset into the content
+
+        Returns:
+            int: The 1-based line number
+        """
+        return bisect_left(self._newlines, offset) + 1
+
+    def line_col(self, offset: int) -> Tuple[int, int]:
+        """
+        Get the line and column of an offset.
+
+        Args:
+            offset (int): Offset into the content
+
+        Returns:
+            Tuple[int, int]: The 1-based (line, column) pair
+        """
+        line = self.line_of(offset)
+        return line, offset - self.line_start(line) + 1
+
+    def line_start(self, line: int) -> int:
+        """
+        Get the offset of the first character of a line.
+
+        Args:
+            line (int): The 1-based line number
+
+        Returns:
+            int: Offset of the start of the line
+        """
+        if line <= 1:
+            return 0
+        return self._newlines[min(line, self.line_count) - 2] + 1
+
+    def lines_in(self, start: int, end: int) -> int:
+        """
+        Count the newlines inside the span [start, end).
+
+        Args:
+            start (int): Start offset of the span
+            end (int): End offset of the span
+
+        Returns:
+            int: Number of newline characters within the span
+        """
+        return bisect_left(self._newlines, end) - bisect_left(self._newlines, start)
@@ -0,0 +1,72 @@
+# prefilter.py
+"""
+Literal prefilter for JALAPI.
+
+This module provides a multi-literal search that finds every occurrence of a
+set of required literals in one pass, so expensive regexes only need to be
+tried at the few offsets where they can possibly match.
+"""
+
+import re
+import string
+from typing import Iterable, Iterator, Union
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+class LiteralPrefilter:
+    """
+    Find ASCII case-insensitive occurrences of several literals at once.
+
+    All literals are combined into one alternation and searched over an ASCII
+    lowercased copy of the content, which lets the regex engine skip ahead on
+    the literals' first characters in C. The copy is made one block at a time
+    so memory stays bounded on large inputs.
+    """
+
+    # Characters lowercased and searched per block
+    BLOCK_SIZE = 1 << 20
+
+    def __init__(self, literals: Iterable[str]):
+        """
+        Initialize the prefilter with the literals to search for.
+
+        Args:
+            literals (Iterable[str]): ASCII literals that candidate regions must contain
+        """
+        self.literals = sorted({literal.lower() for literal in literals}, key=len, reverse=True)
+        self._overlap = max(len(literal) for literal in self.literals) - 1
+        self._pattern = re.compile("|".join(re.escape(literal) for literal in self.literals))
+        self._pattern_bytes = re.compile(
+            b"|".join(re.escape(literal.encode("ascii")) for literal in self.literals)
+        )
+
+    def find(self, content: Union[str, bytes]) -> Iterator[int]:
+        """
+        Yield the offset of every literal occurrence, in increasing order.
+
+        Occurrences may overlap; each offset is reported once even when several
+        literals start there.
+
+        Args:
+            content (Union[str, bytes]): Text or bytes-like content to search
+
+        Yields:
+            int: Offset at which one of the literals starts
+        """
+        is_text = isinstance(content, str)
+        pattern = self._pattern if is_text else self._pattern_bytes
+
+        for block_start in range(0, len(content), self.BLOCK_SIZE):
+            # Extend each block so literals crossing its end are still found
+            block = content[block_start:block_start + self.BLOCK_SIZE + self._overlap]
+            if is_text:
+                block = block.lower() if block.isascii() else block.translate(_ASCII_LOWER)
+            else:
+                block = bytes(block).lower()
+
+            limit = min(self.BLOCK_SIZE, len(block))
+            match = pattern.search(block)
+            while match and match.start() < limit:
+                yield block_start + match.start()
+                match = pattern.search(block, match.start() + 1)
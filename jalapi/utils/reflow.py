@@ -0,0 +1,263 @@
+# reflow.py
+"""
+Minified code detection and reflow for JALAPI.
+
+This module decides from line-length statistics whether a file is minified,
+and provides a lightweight alternative to full beautification: a lexer that
+only inserts line breaks at statement and brace boundaries, leaving strings,
+regex literals, template literals and comments untouched. That is enough to
+give chunking logical boundaries and give findings useful line numbers, at a
+small fraction of the cost of jsbeautifier.
+"""
+
+import re
+from typing import List
+
+# Bump when a change to reflow alters its output, so cached output is not reused
+REFLOW_VERSION = 1
+
+# Lines longer than this count towards a file being minified
+DEFAULT_LONG_LINE = 500
+
+# Fraction of a file held in long lines above which it counts as minified
+DEFAULT_MIN_LONG_FRACTION = 0.5
+
+# Tokens whose contents the lexer skips over
+_LITERALS = (
+    r"""(?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*")"""
+    r"|(?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))"
+    r"|(?P<slash>/)"
+    r"|(?P<template>`)"
+)
+
+# Everything the reflow lexer has to look at; other characters are copied as they are
+_TOKEN = re.compile(_LITERALS + r"|(?P<punct>[;{}()\[\]])", re.DOTALL)
+
+# Everything end_of_expression has to look at
+_EXPRESSION_TOKEN = re.compile(_LITERALS + r"|(?P<punct>[,;{}()\[\]])", re.DOTALL)
+
+# Rest of a regex literal after its opening slash
+_REGEX_BODY = re.compile(r"(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*")
+
+# Template literal text up to the closing backtick or the next substitution
+_TEMPLATE_TEXT = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*", re.DOTALL)
+
+# Identifier or keyword ending right before a slash
+_WORD_BEFORE = re.compile(r"[A-Za-z0-9_$]+$")
+
+# Keywords after which a slash starts a regex literal rather than a division
+_REGEX_KEYWORDS = frozenset(
+    {"return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+     "case", "do", "else", "yield", "await"}
+)
+
+# Characters after which a slash is a division
+_DIVISION_PRECEDERS = frozenset(")]}")
+
+# Characters after a closing brace that continue the same expression or statement
+_CONTINUATIONS = frozenset(",;.)]([:?&|+-*/%=<>")
+
+
+def is_minified(
+    content: str,
+    long_line: int = DEFAULT_LONG_LINE,
+    min_long_fraction: float = DEFAULT_MIN_LONG_FRACTION,
+) -> bool:
+    """
+    Decide from line lengths whether code is minified.
+
+    Walks the lines once, adding up how much of the content sits in lines
+    longer than long_line, and stops as soon as the outcome is certain. A
+    bundle of twenty 1 MB lines is caught just like a single-line file,
+    while a readable file with a few long lines is not.
+
+    Args:
+        content (str): The code to check
+        long_line (int, optional): Length above which a line counts as long. Defaults to 500.
+        min_long_fraction (float, optional): Fraction of the content that must be in long
+            lines. Defaults to 0.5.
+
+    Returns:
+        bool: True if the content looks minified
+    """
+    total = len(content)
+    if total <= long_line:
+        return False
+
+    needed = total * min_long_fraction
+    long_chars = 0
+    start = 0
+
+    while start <= total:
+        end = content.find("\n", start)
+        if end < 0:
+            end = total
+        if end - start > long_line:
+            long_chars += end - start
+            if long_chars >= needed:
+                return True
+        # Stop once the remaining content could not reach the fraction
+        if long_chars + (total - end) < needed:
+            return False
+        start = end + 1
+
+    return False
+
+
+def reflow(content: str) -> str:
+    """
+    Insert line breaks at statement and brace boundaries of JavaScript code.
+
+    Breaks go after each ";" outside parentheses and brackets, after each
+    "{", and before and after each "}" unless the expression continues (as
+    in "})," or "}.bind("); empty braces stay together. Existing line breaks
+    are kept and no line break is inserted inside a string, regex literal,
+    template literal or comment, so removing the inserted line breaks gives
+    back the original code.
+
+    Args:
+        content (str): The code to reflow
+
+    Returns:
+        str: The code with line breaks added
+    """
+    pieces: List[str] = []
+    # Innermost open brackets; "`" marks the brace that opened a template substitution
+    brackets: List[str] = []
+    copied = 0
+    position = 0
+
+    def emit(upto: int, newline: bool) -> None:
+        nonlocal copied
+        pieces.append(content[copied:upto])
+        copied = upto
+        if newline and upto < len(content) and content[upto] != "\n":
+            pieces.append("\n")
+
+    while True:
+        match = _TOKEN.search(content, position)
+        if match is None:
+            break
+        kind = match.lastgroup
+        start, position = match.start(), match.end()
+
+        if kind == "slash" and _starts_regex(content, start):
+            body = _REGEX_BODY.match(content, position)
+            if body:
+                position = body.end()
+        elif kind == "template":
+            position = _skip_template_text(content, position, brackets)
+        elif kind == "punct":
+            char = content[start]
+            inside_template = "`" in brackets
+
+            if char in "([":
+                brackets.append(char)
+            elif char in ")]":
+                if brackets and brackets[-1] in "([":
+                    brackets.pop()
+            elif char == "{":
+                brackets.append(char)
+                if not inside_template:
+                    # Leave empty blocks and object literals on one line
+                    emit(position, content[position:position + 1] != "}")
+            elif char == "}":
+                opener = brackets.pop() if brackets else "{"
+                if opener == "`":
+                    # Back inside the template literal's text
+                    position = _skip_template_text(content, position, brackets)
+                elif not inside_template:
+                    if start > copied and content[start - 1] != "\n":
+                        emit(start, True)
+                    following = content[position:position + 1]
+                    emit(position, following not in _CONTINUATIONS)
+            elif not inside_template and (not brackets or brackets[-1] == "{"):
+                # A ";" ending a statement, not one inside for (;;)
+                emit(position, True)
+
+    pieces.append(content[copied:])
+    return "".join(pieces)
+
+
+def end_of_expression(content: str, position: int) -> int:
+    """
+    Find where the JavaScript expression starting at an offset ends.
+
+    The expression ends at the first ",", ";" or closing bracket outside any
+    bracket it opens itself, skipping strings, regex literals, template
+    literals and comments with the same lexer as reflow.
+
+    Args:
+        content (str): The code
+        position (int): Offset the expression starts at
+
+    Returns:
+        int: Offset of the character ending the expression, or len(content) if none does
+    """
+    # Innermost open brackets; "`" marks the brace that opened a template substitution
+    brackets: List[str] = []
+
+    while True:
+        match = _EXPRESSION_TOKEN.search(content, position)
+        if match is None:
+            return len(content)
+        kind = match.lastgroup
+        start, position = match.start(), match.end()
+
+        if kind == "slash" and _starts_regex(content, start):
+            body = _REGEX_BODY.match(content, position)
+            if body:
+                position = body.end()
+        elif kind == "template":
+            position = _skip_template_text(content, position, brackets)
+        elif kind == "punct":
+            char = content[start]
+            if char in "([{":
+                brackets.append(char)
+            elif not brackets:
+                return start
+            elif char in ")]}":
+                if brackets.pop() == "`":
+                    position = _skip_template_text(content, position, brackets)
+
+
+def _starts_regex(content: str, slash: int) -> bool:
+    """
+    Decide whether a slash starts a regex literal rather than a division.
+
+    Args:
+        content (str): The code being reflowed
+        slash (int): Offset of the slash
+
+    Returns:
+        bool: True if the slash follows an operator, punctuation or keyword
+    """
+    before = content[max(0, slash - 32):slash].rstrip()
+    if not before:
+        return True
+    if before[-1] in _DIVISION_PRECEDERS:
+        return False
+    word = _WORD_BEFORE.search(before)
+    if word:
+        return word.group() in _REGEX_KEYWORDS
+    return True
+
+
+def _skip_template_text(content: str, position: int, brackets: List[str]) -> int:
+    """
+    Skip template literal text, entering a substitution if one starts.
+
+    Args:
+        content (str): The code being reflowed
+        position (int): Offset just after the backtick or the substitution's closing brace
+        brackets (List[str]): Open bracket stack, pushed to when a substitution starts
+
+    Returns:
+        int: Offset to continue lexing from
+    """
+    position = _TEMPLATE_TEXT.match(content, position).end()
+    if content.startswith("${", position):
+        brackets.append("`")
+        return position + 2
+    # Closing backtick, or the end of an unterminated template
+    return min(position + 1, len(content))
@@ -0,0 +1,87 @@
+# source.py
+"""
+Memory-mapped source loading for JALAPI.
+
+This module provides a read-only, memory-mapped view of large JavaScript files
+so they can be scanned as bytes without holding decoded copies in memory.
+Only the slices that are actually needed are decoded.
+"""
+
+import codecs
+import mmap
+from typing import Union
+
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Detect the text encoding of a file from a leading sample of its bytes.
+
+    Args:
+        sample (bytes): The first bytes of the file
+
+    Returns:
+        str: "utf-8" if the sample decodes as UTF-8, otherwise "latin-1"
+    """
+    # Incremental decoding tolerates a multi-byte character cut off at the end
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        decoder.decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+class MappedSource:
+    """A JavaScript file mapped into memory and exposed as bytes."""
+
+    # Bytes read from the start of the file to detect its encoding
+    SAMPLE_SIZE = 1 << 16
+
+    def __init__(self, filepath: str):
+        """
+        Map a file into memory and detect its encoding.
+
+        Args:
+            filepath (str): Path to the file to map
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        self.filepath = filepath
+        self._file = open(filepath, "rb")
+        try:
+            self.data: Union[mmap.mmap, bytes] = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except ValueError:
+            # Empty files cannot be mapped
+            self.data = b""
+        self.encoding = detect_encoding(self.data[:self.SAMPLE_SIZE])
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __enter__(self) -> "MappedSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def decode(self, start: int = 0, end: int = None) -> str:
+        """
+        Decode a slice of the mapped bytes.
+
+        Args:
+            start (int, optional): Start offset of the slice. Defaults to 0.
+            end (int, optional): End offset of the slice. Defaults to the end of the file.
+
+        Returns:
+            str: The decoded text, with undecodable bytes replaced
+        """
+        return self.data[start:end].decode(self.encoding, errors="replace")
+
+    def close(self) -> None:
+        """Release the mapping and the underlying file."""
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
@@ -0,0 +1,168 @@
+# sourcemap.py
+"""
+Source map loading for JALAPI.
+
+This module finds the source map of a bundled JavaScript file, either inline
+as a data URL, referenced by a sourceMappingURL comment, or next to the file
+as <file>.map, and extracts the original source files embedded in its
+sourcesContent. Analyzing those directly avoids beautifying the bundle and
+reports line numbers against the original files.
+"""
+
+import base64
+import json
+import mmap
+import os
+import posixpath
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from jalapi.logging.log_setup import logger
+
+# Comment naming a file's source map; "//@" is the deprecated form of "//#"
+_SOURCE_MAPPING_URL = re.compile(rb"(?://|/\*)[#@][ \t]*sourceMappingURL=([^\s*]+)")
+
+# Marker searched for from the end of a file, where the comment belongs
+_URL_MARKER = b"sourceMappingURL="
+
+# Bytes before the marker that may hold the start of its comment
+_MARKER_LOOKBEHIND = 8
+
+# Whitespace allowed after the comment at the end of a file
+_WHITESPACE = re.compile(rb"\s*")
+
+
+def source_map_path(filepath: str) -> Optional[str]:
+    """
+    Get the path of a file's external source map, if it has one on disk.
+
+    Args:
+        filepath (str): Path to the bundled JavaScript file
+
+    Returns:
+        Optional[str]: Path of the .map file, or None if the map is inline, remote or missing
+    """
+    return _map_file(filepath, _source_mapping_url(filepath))
+
+
+def load_source_map(filepath: str) -> Optional[Dict[str, Any]]:
+    """
+    Load the source map of a bundled JavaScript file.
+
+    An inline data URL or a local file named by the sourceMappingURL
+    comment ending the file is used first, then <file>.map next to the
+    file. Remote URLs are not fetched.
+
+    Args:
+        filepath (str): Path to the bundled JavaScript file
+
+    Returns:
+        Optional[Dict[str, Any]]: The parsed source map, or None if there is none or it is unreadable
+    """
+    url = _source_mapping_url(filepath)
+    try:
+        if url is not None and url.startswith("data:"):
+            header, _, payload = url.partition(",")
+            if header.endswith(";base64"):
+                text = base64.b64decode(payload).decode("utf-8")
+            else:
+                text = unquote(payload)
+        else:
+            path = _map_file(filepath, url)
+            if path is None:
+                if url is not None:
+                    logger.debug(f"Source map {url} of {filepath} is not available locally")
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        source_map = json.loads(text)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable source map of {filepath}: {e}")
+        return None
+
+    if not isinstance(source_map, dict):
+        logger.warning(f"Ignoring malformed source map of {filepath}")
+        return None
+    return source_map
+
+
+def original_sources(source_map: Dict[str, Any]) -> Optional[List[Tuple[str, str]]]:
+    """
+    Get the original source files embedded in a source map.
+
+    Names are resolved against the map's sourceRoot. A map that does not
+    embed the content of every source would leave code unanalyzed, so it
+    is treated as having no usable sources.
+
+    Args:
+        source_map (Dict[str, Any]): A parsed source map
+
+    Returns:
+        Optional[List[Tuple[str, str]]]: (name, content) of each original source, in map order,
+                                         or None if the map does not embed all of them
+    """
+    sources = source_map.get("sources") or []
+    contents = source_map.get("sourcesContent") or []
+    if not sources or len(contents) < len(sources):
+        return None
+    if not all(isinstance(content, str) for content in contents[:len(sources)]):
+        return None
+
+    root = source_map.get("sourceRoot") or ""
+    return [
+        (posixpath.join(root, name) if root else name, content)
+        for name, content in zip(sources, contents)
+    ]
+
+
+def _map_file(filepath: str, url: Optional[str]) -> Optional[str]:
+    """
+    Resolve a sourceMappingURL to a local file, or fall back to <file>.map.
+
+    Args:
+        filepath (str): Path to the bundled JavaScript file
+        url (Optional[str]): URL from the file's sourceMappingURL comment, if any
+
+    Returns:
+        Optional[str]: Path of an existing .map file, or None
+    """
+    if url is None:
+        path = filepath + ".map"
+    elif url.startswith("data:") or "://" in url:
+        return None
+    else:
+        path = os.path.join(os.path.dirname(filepath), unquote(url.split("?", 1)[0].split("#", 1)[0]))
+    return path if os.path.isfile(path) else None
+
+
+def _source_mapping_url(filepath: str) -> Optional[str]:
+    """
+    Find the URL in the sourceMappingURL comment ending a file.
+
+    The file is memory-mapped and searched backwards, since the comment is
+    at the end and an inline map can be larger than the code itself. Only
+    whitespace may follow the comment, so code that merely mentions
+    sourceMappingURL (such as a bundled source map library) is not mistaken
+    for it.
+
+    Args:
+        filepath (str): Path to the JavaScript file
+
+    Returns:
+        Optional[str]: The URL, or None if the file does not end with such a comment
+    """
+    if os.path.getsize(filepath) == 0:
+        return None
+
+    with open(filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        marker = data.rfind(_URL_MARKER)
+        if marker < 0:
+            return None
+        line_end = data.find(b"\n", marker)
+        if line_end < 0:
+            line_end = len(data)
+        if _WHITESPACE.match(data, line_end).end() != len(data):
+            return None
+        match = _SOURCE_MAPPING_URL.search(data, max(0, marker - _MARKER_LOOKBEHIND), line_end)
+        return match.group(1).decode("utf-8", errors="replace") if match else None
@@ -0,0 +1,24 @@
+# stats.py
+"""
+Statistics helpers for JALAPI.
+
+This module merges the nested dictionaries of counters that analysis stages
+report, such as per-module or per-file summaries, into running totals.
+"""
+
+from typing import Any, Dict
+
+
+def add_stats(totals: Dict[str, Any], stats: Dict[str, Any]) -> None:
+    """
+    Add numeric statistics into running totals, recursing into nested sections.
+
+    Args:
+        totals (Dict[str, Any]): Running totals, updated in place
+        stats (Dict[str, Any]): Statistics to add
+    """
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            add_stats(totals.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            totals[key] = totals.get(key, 0) + value
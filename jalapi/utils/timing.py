@@ -0,0 +1,233 @@
+# timing.py
+"""
+Stage timing for JALAPI.
+
+This module measures where analysis time goes: the wall time, CPU time and
+amount of input of each pipeline stage (loading, beautification, regex and
+LLM analysis, chunking, deduplication, serialization), and the latency of
+each LLM request. A disabled timer hands out one shared no-op stage, so
+instrumented code costs next to nothing when timings are turned off.
+"""
+
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Latency percentiles reported for LLM requests
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+class _Stage:
+    """Context manager measuring one run of a stage; size may be set while it runs."""
+
+    __slots__ = ("timer", "name", "size", "_wall", "_cpu")
+
+    def __init__(self, timer: "StageTimer", name: str, size: int):
+        self.timer = timer
+        self.name = name
+        self.size = size
+
+    def __enter__(self) -> "_Stage":
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.timer.add(
+            self.name, time.perf_counter() - self._wall, time.thread_time() - self._cpu, self.size
+        )
+
+
+class _NoStage:
+    """Stand-in for _Stage when timing is disabled."""
+
+    __slots__ = ("size",)
+
+    def __enter__(self) -> "_NoStage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+class StageTimer:
+    """
+    Accumulates per-stage wall time, CPU time and bytes, and LLM request latencies.
+
+    A stage entered several times, e.g. once per bundle module, accumulates
+    over all of its runs. CPU time is that of the thread running the stage,
+    so a stage waiting on worker threads (such as the LLM stage) reports
+    little CPU time. Stages may run in several threads at once.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Create a timer.
+
+        Args:
+            enabled (bool, optional): Whether to measure anything. Defaults to True.
+        """
+        self.enabled = enabled
+        self._stages: Dict[str, List[float]] = {}
+        self._latencies: List[float] = []
+        self._lock = threading.Lock()
+        self._no_stage = _NoStage()
+
+    def stage(self, name: str, size: int = 0) -> Any:
+        """
+        Measure a stage over a with block.
+
+        Args:
+            name (str): The stage's name
+            size (int, optional): Bytes (or characters of text) the stage processes. Can also
+                be set on the returned object inside the block. Defaults to 0.
+
+        Returns:
+            Any: A context manager measuring the block
+        """
+        if not self.enabled:
+            return self._no_stage
+        return _Stage(self, name, size)
+
+    def add(self, name: str, wall: float, cpu: float, size: int = 0) -> None:
+        """
+        Add one run of a stage measured elsewhere.
+
+        Args:
+            name (str): The stage's name
+            wall (float): Wall time of the run in seconds
+            cpu (float): CPU time of the run in seconds
+            size (int, optional): Bytes the run processed. Defaults to 0.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            totals = self._stages.setdefault(name, [0.0, 0.0, 0, 0])
+            totals[0] += wall
+            totals[1] += cpu
+            totals[2] += size
+            totals[3] += 1
+
+    def iterate(
+        self, name: str, items: Iterable[T], size: Optional[Callable[[T], int]] = None
+    ) -> Iterator[T]:
+        """
+        Measure the time spent producing the items of a lazy iterable as one stage.
+
+        Time spent by the caller between items is not counted.
+
+        Args:
+            name (str): The stage's name
+            items (Iterable[T]): The iterable, e.g. a chunk generator
+            size (Optional[Callable[[T], int]]): Bytes each item stands for. Defaults to None.
+
+        Returns:
+            Iterator[T]: The items
+        """
+        if not self.enabled:
+            return iter(items)
+        return self._iterate(name, iter(items), size)
+
+    def _iterate(self, name: str, items: Iterator[T], size: Optional[Callable[[T], int]]) -> Iterator[T]:
+        """Generator behind iterate."""
+        wall = cpu = 0.0
+        total = 0
+        try:
+            while True:
+                wall_start, cpu_start = time.perf_counter(), time.thread_time()
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                finally:
+                    wall += time.perf_counter() - wall_start
+                    cpu += time.thread_time() - cpu_start
+                if size is not None:
+                    total += size(item)
+                yield item
+        finally:
+            self.add(name, wall, cpu, total)
+
+    def record_latency(self, seconds: float) -> None:
+        """
+        Record the latency of one LLM request.
+
+        Args:
+            seconds (float): Time from sending the request to receiving its response
+        """
+        if self.enabled:
+            with self._lock:
+                self._latencies.append(seconds)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the measurements.
+
+        Returns:
+            Dict[str, Any]: "stages" with wall_s, cpu_s, bytes, bytes_per_s and runs of each
+                stage in the order first measured, and "llm_latency" with the request count,
+                total_s, p50_s, p90_s, p99_s and max_s
+        """
+        with self._lock:
+            stages = {name: list(totals) for name, totals in self._stages.items()}
+            latencies = sorted(self._latencies)
+
+        report: Dict[str, Any] = {
+            "stages": {
+                name: {
+                    "wall_s": round(wall, 6),
+                    "cpu_s": round(cpu, 6),
+                    "bytes": size,
+                    "bytes_per_s": round(size / wall) if wall > 0 else 0,
+                    "runs": runs,
+                }
+                for name, (wall, cpu, size, runs) in stages.items()
+            },
+        }
+        if latencies:
+            latency = {"requests": len(latencies), "total_s": round(sum(latencies), 4)}
+            for percentile in LATENCY_PERCENTILES:
+                latency[f"p{percentile}_s"] = round(_percentile(latencies, percentile), 4)
+            latency["max_s"] = round(latencies[-1], 4)
+            report["llm_latency"] = latency
+        return report
+
+
+def _percentile(ordered: List[float], percentile: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+
+    Args:
+        ordered (List[float]): Values in ascending order, at least one
+        percentile (float): The percentile, from 0 to 100
+
+    Returns:
+        float: The smallest value at or above the given fraction of values
+    """
+    rank = max(1, math.ceil(percentile / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def finish_totals(timings: Dict[str, Any]) -> None:
+    """
+    Fix up timings summed over several files with add_stats.
+
+    Throughputs are recomputed from the summed bytes and wall times.
+    Latency percentiles cannot be summed, so they are replaced with the
+    mean latency.
+
+    Args:
+        timings (Dict[str, Any]): Summed timings, updated in place
+    """
+    for stage in timings.get("stages", {}).values():
+        wall = stage.get("wall_s", 0)
+        stage["bytes_per_s"] = round(stage.get("bytes", 0) / wall) if wall > 0 else 0
+
+    latency = timings.get("llm_latency")
+    if latency:
+        for key in [key for key in latency if key.startswith("p") or key == "max_s"]:
+            del latency[key]
+        latency["mean_s"] = round(latency["total_s"] / max(1, latency["requests"]), 4)
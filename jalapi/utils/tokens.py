@@ -0,0 +1,141 @@
+# tokens.py
+"""
+Token estimation utilities for JALAPI.
+
+This module provides a fast local estimate of how many tokens a piece of text
+will cost when sent to a language model, optional exact counting when a
+tokenizer is installed, the context window sizes of known models, and the
+estimated cost of a request from per-model token prices.
+"""
+
+import math
+import string
+from typing import Callable, Dict, Optional
+
+from jalapi.logging.log_setup import logger
+
+# Average characters per token for identifiers and plain ASCII prose
+CHARS_PER_TOKEN = 4
+
+# Context window of each known model, in tokens
+MODEL_CONTEXT_TOKENS = {
+    "claude-3-5-sonnet-20241022": 200000,
+    "claude-3-5-haiku-20241022": 200000,
+    "claude-3-opus-20240229": 200000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+}
+
+# Context window assumed for models missing from MODEL_CONTEXT_TOKENS
+DEFAULT_CONTEXT_TOKENS = 100000
+
+# Identifier characters, which tokenizers merge into few word pieces
+_WORD_CHARS = (string.ascii_letters + string.digits + "_$").encode("ascii")
+_NOT_SYMBOL = _WORD_CHARS + string.whitespace.encode("ascii")
+
+# Maps identifier bytes to "a" and every other byte to " ", so runs can be counted
+_WORD_MASK = bytes.maketrans(
+    bytes(range(256)), bytes(ord("a") if byte in _WORD_CHARS else ord(" ") for byte in range(256))
+)
+
+# Every byte below 0x80, deleted to measure the non-ASCII part of a text
+_ASCII_BYTES = bytes(range(128))
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text.
+
+    Identifier runs cost about one token per CHARS_PER_TOKEN characters, but
+    at least one each. Punctuation and operators, which dominate minified
+    code, cost about one token per character, and so does every non-ASCII
+    character. Whitespace is mostly merged into neighbouring tokens, except
+    for line breaks. Counting is done with bytes.translate and bytes.count,
+    so it runs in C without building per-token objects.
+
+    Args:
+        text (str): The text to estimate
+
+    Returns:
+        int: Approximate token count
+    """
+    if not text:
+        return 0
+
+    data = text.encode("utf-8", errors="replace")
+    masked = data.translate(_WORD_MASK)
+    words = masked.count(b" a") + masked.startswith(b"a")
+    word_chars = len(data) - len(data.translate(None, _WORD_CHARS))
+    word_tokens = max(words, math.ceil(word_chars / CHARS_PER_TOKEN))
+
+    # Non-ASCII bytes survive as symbols, so count their characters once each
+    symbol_bytes = len(data.translate(None, _NOT_SYMBOL))
+    if not text.isascii():
+        non_ascii_bytes = len(data.translate(None, _ASCII_BYTES))
+        non_ascii_chars = len(text) - (len(data) - non_ascii_bytes)
+        symbol_bytes += non_ascii_chars - non_ascii_bytes
+
+    return word_tokens + symbol_bytes + data.count(b"\n")
+
+
+def load_exact_counter(encoding_name: str = "cl100k_base") -> Optional[Callable[[str], int]]:
+    """
+    Load an exact token counter from the optional tiktoken package.
+
+    The encoding is not the one every provider uses, but is much closer to a
+    real tokenizer than the local estimate.
+
+    Args:
+        encoding_name (str, optional): tiktoken encoding to count with. Defaults to "cl100k_base".
+
+    Returns:
+        Optional[Callable[[str], int]]: Function counting the tokens of a text, or None
+                                        if tiktoken is not installed
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken is not installed, falling back to estimated token counts")
+        return None
+
+    tokenizer = tiktoken.get_encoding(encoding_name)
+    return lambda text: len(tokenizer.encode(text, disallowed_special=()))
+
+
+def context_window(model: str) -> int:
+    """
+    Get the context window of a model.
+
+    Args:
+        model (str): The model name
+
+    Returns:
+        int: Context window in tokens, or DEFAULT_CONTEXT_TOKENS for unknown models
+    """
+    return MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+
+
+def request_cost(usage: Dict[str, int], prices: Dict[str, float]) -> float:
+    """
+    Estimate the cost of one request from its token usage.
+
+    Prices are per million tokens. Prompt-cache writes and reads are
+    charged at the input price unless cache_write and cache_read prices
+    are given.
+
+    Args:
+        usage (Dict[str, int]): input_tokens (uncached), cache_write_tokens,
+            cached_input_tokens and output_tokens of the request
+        prices (Dict[str, float]): input, output, and optionally cache_write and
+            cache_read prices of the model
+
+    Returns:
+        float: Cost in the currency of the prices
+    """
+    input_price = prices.get("input", 0.0)
+    return (
+        usage.get("input_tokens", 0) * input_price
+        + usage.get("cache_write_tokens", 0) * prices.get("cache_write", input_price)
+        + usage.get("cached_input_tokens", 0) * prices.get("cache_read", input_price)
+        + usage.get("output_tokens", 0) * prices.get("output", 0.0)
+    ) / 1_000_000
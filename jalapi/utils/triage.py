@@ -0,0 +1,67 @@
+# triage.py
+"""
+Chunk triage utilities for JALAPI.
+
+This module scores code chunks on cheap local signals of API usage, such as
+URL-like string literals and network calls, so chunks with no sign of
+endpoints can be kept away from the language model.
+"""
+
+import re
+from typing import Dict
+
+# Minimum score a chunk needs to be sent to the model unless the config says otherwise
+DEFAULT_TRIAGE_THRESHOLD = 2.0
+
+# Signals of endpoint-related code, with the weight each occurrence adds
+SIGNALS = {
+    # Network sinks
+    "sink": (
+        r"\bfetch\s*\(|\baxios\b|XMLHttpRequest|\.open\s*\(\s*['\"`][A-Za-z]+['\"`]"
+        r"|\$\.(?:ajax|get|post|getJSON)\b|sendBeacon|\bnew\s+(?:WebSocket|EventSource)\b",
+        3.0,
+    ),
+    # URL construction
+    "url_constructor": (r"\bnew\s+URL\s*\(|\bURLSearchParams\b", 3.0),
+    # String literals that look like paths or URLs
+    "url_literal": (r"['\"`](?:https?:|wss?:)?/[^'\"`\s]*['\"`]", 2.0),
+    # Template literals with interpolation
+    "template_literal": (r"`[^`]*\$\{", 1.0),
+    # References to configuration objects and base URLs
+    "config_reference": (r"\b(?:CONFIG|API|ENDPOINTS|ROUTES)\b|\b(?:base|api)_?(?:url|path)\b", 1.0),
+    # HTTP methods spelled out as strings
+    "http_method": (r"['\"`](?:GET|POST|PUT|DELETE|PATCH)['\"`]", 1.0),
+}
+
+_SIGNAL_PATTERN = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, (pattern, _) in SIGNALS.items()), re.IGNORECASE
+)
+
+
+def count_signals(chunk: str) -> Dict[str, int]:
+    """
+    Count the occurrences of each signal in a chunk.
+
+    Args:
+        chunk (str): The code segment to inspect
+
+    Returns:
+        Dict[str, int]: Number of occurrences per signal name
+    """
+    counts = dict.fromkeys(SIGNALS, 0)
+    for match in _SIGNAL_PATTERN.finditer(chunk):
+        counts[match.lastgroup] += 1
+    return counts
+
+
+def score_chunk(chunk: str) -> float:
+    """
+    Score how likely a chunk is to contain API endpoints.
+
+    Args:
+        chunk (str): The code segment to score
+
+    Returns:
+        float: Weighted sum of the signals found; 0.0 if there are none
+    """
+    return sum(SIGNALS[name][1] * count for name, count in count_signals(chunk).items())
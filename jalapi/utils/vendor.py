@@ -0,0 +1,339 @@
+# vendor.py
+"""
+Vendor library fingerprinting for JALAPI.
+
+This module recognizes well-known third-party libraries (lodash, axios,
+moment, React, core-js, ...) embedded in a bundle, using winnowed
+fingerprints of normalized statements. Code is split into statements at
+";", "{" and "}", short identifiers (the ones minifiers rename) and
+whitespace are normalized away, and every run of KGRAM consecutive
+statements is hashed. Winnowing keeps the smallest hash of each WINDOW
+consecutive runs, so two copies of a library share fingerprints even when
+they were minified separately or are surrounded by different code.
+
+A database maps fingerprints to libraries. It is built locally from the
+library builds to recognize and stored as gzipped JSON.
+"""
+
+import gzip
+import json
+import os
+import re
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from jalapi.cache.disk_cache import content_digest
+from jalapi.logging.log_setup import logger
+from jalapi.models.models import VendorRegion
+
+# Defaults used when the vendor section of the config leaves them out
+DEFAULT_DATABASE_PATH = ".jalapi_cache/vendor_fingerprints.json.gz"
+DEFAULT_MIN_MATCHES = 3
+DEFAULT_MAX_GAP = 4096
+
+# Bump when fingerprinting changes, so databases built earlier are rebuilt
+DATABASE_VERSION = 1
+
+# Consecutive statements hashed together into one fingerprint candidate
+KGRAM = 4
+
+# Candidates per winnowing window; one fingerprint is kept from each
+WINDOW = 4
+
+# Normalized statements shorter than this are too generic to fingerprint
+MIN_STATEMENT = 12
+
+# Characters (or bytes) of code normalized at a time
+SCAN_WINDOW = 1 << 20
+
+_HASH_MULTIPLIER = 1000003
+_HASH_MASK = (1 << 64) - 1
+
+# Identifiers of up to three characters, which minifiers rename; longer names are
+# mostly properties, globals and API names that survive minification
+_SHORT_IDENTIFIER = re.compile(r"(?<![.\w$])[A-Za-z_$][\w$]{0,2}(?![\w$])")
+_SHORT_IDENTIFIER_BYTES = re.compile(rb"(?<![.\w$])[A-Za-z_$][\w$]{0,2}(?![\w$])")
+_WHITESPACE = re.compile(r"\s+")
+_WHITESPACE_BYTES = re.compile(rb"\s+")
+_STATEMENT_END = re.compile(r"[;{}]")
+_STATEMENT_END_BYTES = re.compile(rb"[;{}]")
+
+# A fingerprint with the span of code it was taken from
+Fingerprint = Tuple[int, int, int]
+
+
+def fingerprints(content: Union[str, bytes], window_size: int = SCAN_WINDOW) -> List[Fingerprint]:
+    """
+    Compute the winnowed fingerprints of a piece of code.
+
+    Normalization never adds or removes ";", "{" or "}", so the statements
+    of the normalized code line up with those of the original, and each
+    fingerprint can be traced back to a span of the original.
+
+    Args:
+        content (Union[str, bytes]): The code, as text or bytes-like content
+        window_size (int, optional): Characters (or bytes) normalized at a time, see
+            iter_fingerprints. Defaults to SCAN_WINDOW.
+
+    Returns:
+        List[Fingerprint]: (hash, start, end) of each fingerprint, in file order
+    """
+    return list(iter_fingerprints(content, window_size))
+
+
+def iter_fingerprints(content: Union[str, bytes], window_size: int = SCAN_WINDOW) -> Iterator[Fingerprint]:
+    """
+    Yield the winnowed fingerprints of a piece of code, in file order.
+
+    The code is normalized and split into statements one window at a time,
+    each window ending just after a statement, and k-grams and winnowing
+    carry their last KGRAM statements and WINDOW candidates over to the
+    next window. The fingerprints are the same as for the code as a whole,
+    while memory stays proportional to window_size, so a memory-mapped
+    file is never copied whole.
+
+    Args:
+        content (Union[str, bytes]): The code, as text or bytes-like content
+        window_size (int, optional): Characters (or bytes) normalized at a time. Defaults to
+            SCAN_WINDOW.
+
+    Yields:
+        Fingerprint: (hash, start, end) of each fingerprint
+    """
+    # Hash runs of KGRAM consecutive statements
+    run: Deque[Tuple[int, int, int]] = deque(maxlen=KGRAM)
+    # Keep the smallest hash of each window of candidates, rightmost on ties, once per position
+    candidates: Deque[Tuple[int, Fingerprint]] = deque(maxlen=WINDOW)
+    count = 0
+    last = -1
+    for statement in _statements(content, window_size):
+        run.append(statement)
+        if len(run) < KGRAM:
+            continue
+        value = 0
+        for statement_hash, _, _ in run:
+            value = (value * _HASH_MULTIPLIER + statement_hash) & _HASH_MASK
+        candidates.append((count, (value, run[0][1], run[-1][2])))
+        count += 1
+        if len(candidates) == WINDOW:
+            # min returns the first smallest item, so scan the window right to left
+            chosen, candidate = min(reversed(candidates), key=lambda item: item[1][0])
+            if chosen != last:
+                yield candidate
+                last = chosen
+    if 0 < count < WINDOW:
+        yield min(candidate for _, candidate in candidates)
+
+
+def _statements(content: Union[str, bytes], window_size: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Yield the hash and span of each statement long enough to be distinctive.
+
+    Args:
+        content (Union[str, bytes]): The code, as text or bytes-like content
+        window_size (int): Characters (or bytes) normalized at a time
+
+    Yields:
+        Tuple[int, int, int]: (hash, start, end) of each statement
+    """
+    if isinstance(content, str):
+        identifier, whitespace, statement_end = _SHORT_IDENTIFIER, _WHITESPACE, _STATEMENT_END
+        placeholder, empty, ends_chars = "_", "", ";{}"
+        encode = lambda text: text.encode("utf-8", errors="replace")
+    else:
+        identifier, whitespace = _SHORT_IDENTIFIER_BYTES, _WHITESPACE_BYTES
+        statement_end = _STATEMENT_END_BYTES
+        placeholder, empty, ends_chars = b"_", b"", [b";", b"{", b"}"]
+        encode = bytes
+
+    length = len(content)
+    offset = 0
+    while offset < length:
+        # End the window just after a statement, so no statement or whitespace run spans two
+        window_end = min(offset + window_size, length)
+        if window_end < length:
+            cut = max(content.rfind(end, offset, window_end) for end in ends_chars)
+            if cut < offset:
+                cut = min((position for position in (content.find(end, window_end) for end in ends_chars)
+                           if position >= 0), default=length - 1)
+            window_end = cut + 1
+
+        window = content[offset:window_end]
+        normalized = statement_end.split(whitespace.sub(empty, identifier.sub(placeholder, window)))
+        ends = [match.end() + offset for match in statement_end.finditer(window)]
+        ends.append(window_end)
+
+        start = offset
+        for text, end in zip(normalized, ends):
+            if len(text) >= MIN_STATEMENT:
+                yield zlib.crc32(encode(text)), start, end
+            start = end
+        offset = window_end
+
+
+class VendorDatabase:
+    """
+    Fingerprints of known libraries, used to find the regions of a file they cover.
+
+    Fingerprints found in more than one library are ignored, since they
+    cannot tell the libraries apart.
+    """
+
+    def __init__(self, libraries: Optional[Dict[str, Iterable[int]]] = None):
+        """
+        Create a database from already computed fingerprints.
+
+        Args:
+            libraries (Optional[Dict[str, Iterable[int]]]): Fingerprint hashes of each library
+        """
+        self.libraries: Dict[str, Set[int]] = {
+            name: set(hashes) for name, hashes in (libraries or {}).items()
+        }
+        self._index_owners()
+
+    @classmethod
+    def load(cls, path: str) -> "VendorDatabase":
+        """
+        Load a database saved with save.
+
+        Args:
+            path (str): Path to the gzipped JSON database
+
+        Returns:
+            VendorDatabase: The database
+
+        Raises:
+            ValueError: If the database was built by an incompatible version
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != DATABASE_VERSION:
+            raise ValueError(
+                f"vendor database {path} has version {data.get('version')}, expected {DATABASE_VERSION}"
+            )
+        return cls(data["libraries"])
+
+    def save(self, path: str) -> None:
+        """
+        Save the database as gzipped JSON.
+
+        Args:
+            path (str): Path to write the database to
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            "version": DATABASE_VERSION,
+            "libraries": {name: sorted(hashes) for name, hashes in sorted(self.libraries.items())},
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    @property
+    def digest(self) -> str:
+        """Hex digest identifying the database contents."""
+        return content_digest(
+            DATABASE_VERSION, {name: sorted(hashes) for name, hashes in self.libraries.items()}
+        )
+
+    def add_library(self, name: str, content: Union[str, bytes]) -> int:
+        """
+        Add the fingerprints of one build of a library.
+
+        Adding several builds of a library (e.g. its development and
+        minified builds) helps recognize it however it was bundled.
+
+        Args:
+            name (str): The library's name, e.g. "lodash"
+            content (Union[str, bytes]): The library's code
+
+        Returns:
+            int: Number of fingerprints the build added
+        """
+        hashes = self.libraries.setdefault(name, set())
+        before = len(hashes)
+        hashes.update(value for value, _, _ in iter_fingerprints(content))
+        self._index_owners()
+        return len(hashes) - before
+
+    def find_regions(
+        self,
+        content: Union[str, bytes],
+        min_matches: int = DEFAULT_MIN_MATCHES,
+        max_gap: int = DEFAULT_MAX_GAP,
+    ) -> List[VendorRegion]:
+        """
+        Find the regions of a file covered by known libraries.
+
+        Matching fingerprints of the same library no more than max_gap
+        characters apart are merged into one region, and regions with fewer
+        than min_matches fingerprints are dropped as chance matches.
+
+        Args:
+            content (Union[str, bytes]): The code, as text or bytes-like content
+            min_matches (int, optional): Fewest matching fingerprints in a region. Defaults to 3.
+            max_gap (int, optional): Largest gap between matches merged into one region.
+                Defaults to 4096.
+
+        Returns:
+            List[VendorRegion]: The regions, ordered by start offset
+        """
+        if not self._owners:
+            return []
+
+        open_regions: Dict[str, VendorRegion] = {}
+        regions: List[VendorRegion] = []
+        for value, start, end in iter_fingerprints(content):
+            library = self._owners.get(value)
+            if library is None:
+                continue
+            region = open_regions.get(library)
+            if region is not None and start - region.end <= max_gap:
+                region.end = max(region.end, end)
+                region.matches += 1
+            else:
+                if region is not None:
+                    regions.append(region)
+                open_regions[library] = VendorRegion(library, start, end, 1)
+        regions.extend(open_regions.values())
+
+        regions = [region for region in regions if region.matches >= min_matches]
+        regions.sort(key=lambda region: (region.start, region.end))
+        return regions
+
+    def _index_owners(self) -> None:
+        """Map each fingerprint found in exactly one library to that library."""
+        owners: Dict[int, Optional[str]] = {}
+        for name, hashes in self.libraries.items():
+            for value in hashes:
+                owners[value] = name if value not in owners else None
+        self._owners = {value: name for value, name in owners.items() if name is not None}
+
+
+def open_vendor_database(config: Dict[str, Any]) -> Optional[VendorDatabase]:
+    """
+    Open the vendor database described by the "vendor" section of the configuration.
+
+    Args:
+        config (Dict[str, Any]): Configuration parameters for the analysis process
+
+    Returns:
+        Optional[VendorDatabase]: The database, or None if fingerprinting is disabled or
+                                  no database has been built yet
+    """
+    vendor_config = config.get("vendor", {})
+    if not vendor_config.get("enabled", True):
+        return None
+
+    path = vendor_config.get("database", DEFAULT_DATABASE_PATH)
+    if not os.path.exists(path):
+        logger.debug(f"No vendor database at {path}, not fingerprinting vendor code")
+        return None
+
+    try:
+        return VendorDatabase.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable vendor database {path}: {e}")
+        return None
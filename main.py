@@ -3,29 +3,302 @@
 JALAPI - JavaScript API Analyzer
 
 Main script for running the JavaScript API analyzer. This script provides a command-line
-interface for analyzing JavaScript files to discover API endpoints.
+interface for analyzing JavaScript files to discover API endpoints, either one file at a
+time or in batches spread over worker processes.
 """
 
 import argparse
 import json
+import os
+import sys
+from typing import Any, Dict, List
 
 from jalapi.core.analysis_agent import JavaScriptAnalysisAgent
 from jalapi.config.config_manager import load_config
+from jalapi.cache.disk_cache import open_cache
+from jalapi.core.batch import analyze_batch, collect_files, read_file_list
 from jalapi.logging.log_setup import setup_logging
+from jalapi.utils.vendor import DEFAULT_DATABASE_PATH, VendorDatabase
+
+
+def print_results(results: Dict[str, Any]) -> None:
+    """Print the results of analyzing a single file in human-readable form.
+    
+    Args:
+        results (Dict[str, Any]): Analysis results for one file
+        
+    Returns:
+        None
+    """
+    print("\nAnalysis Summary:")
+    print(f"Total Endpoints: {results['summary']['total_endpoints']}")
+    print(f"Found by Regex: {results['summary']['regex_findings']}")
+    print(f"Found by LLM: {results['summary']['llm_findings']}")
+    source_map = results["summary"].get("source_map")
+    if source_map:
+        print(f"Source Map: {source_map['modules']} original sources analyzed "
+              f"({source_map['excluded_modules']} excluded)")
+    bundle = results["summary"].get("bundle")
+    if bundle:
+        print(f"Bundle: {bundle['modules']} modules and {bundle['runtime_pieces']} runtime pieces "
+              f"analyzed separately ({bundle['layout']})")
+    print_llm_stats(results["summary"])
+    print_usage(results["summary"])
+    print_vendor_stats(results["summary"])
+    print_cache_stats(results["summary"])
+    print_timings(results["summary"])
+
+    # Print endpoints
+    print("\nDiscovered Endpoints:")
+    for endpoint in results["endpoints"]:
+        print(f"\n  Path: {endpoint['path']}")
+        print(f"  Method: {endpoint['method']}")
+        print(f"  Detector: {endpoint['detector']}")
+        print(f"  Confidence: {endpoint['confidence']}")
+        
+        # Display the original source file for bundles analyzed through their source map
+        if "source" in endpoint:
+            print(f"  Source: {endpoint['source']}")
+
+        # Display the bundle module for bundles split into their modules
+        if "module" in endpoint:
+            print(f"  Module: {endpoint['module']}")
+
+        # Display line number if available
+        if 'line_number' in endpoint:
+            print(f"  Line: {endpoint['line_number']}")
+
+        if "auth" in endpoint:
+            print(f"  Auth Required: {endpoint['auth']['required']}")
+            if endpoint["auth"].get("type"):
+                print(f"  Auth Type: {endpoint['auth']['type']}")
+            if endpoint["auth"].get("location"):
+                print(f"  Auth Location: {endpoint['auth']['location']}")
+
+
+def print_llm_stats(summary: Dict[str, Any]) -> None:
+    """Print how many chunks the LLM stage sent or skipped, if it ran.
+    
+    Args:
+        summary (Dict[str, Any]): Summary of a single file or of a batch
+        
+    Returns:
+        None
+    """
+    llm_stats = summary.get("llm")
+    if llm_stats:
+        print(f"LLM Chunks: {llm_stats['chunks']} "
+              f"({llm_stats['skipped_chunks']} skipped, ~{llm_stats['skipped_tokens']} tokens saved, "
+              f"{llm_stats.get('overlap_dropped_findings', 0)} overlap duplicates dropped)")
+
+        coverage = llm_stats.get("coverage", {})
+        if coverage.get("measured_chunks"):
+            resolved = coverage["resolved_literals"] / max(1, coverage["url_literals"])
+            print(f"Regex Coverage: {resolved:.0%} of {coverage['url_literals']} endpoint literals resolved, "
+                  f"{coverage['dynamic_chunks']}/{coverage['measured_chunks']} chunks dynamic, "
+                  f"{coverage['skipped_chunks']} chunks skipped (~{coverage['skipped_tokens']} tokens saved)")
+
+        vendor = llm_stats.get("vendor", {})
+        if vendor.get("excluded_bytes"):
+            print(f"Vendor Code: {format_bytes(vendor['excluded_bytes'])} left out of LLM requests "
+                  f"(~{vendor['excluded_tokens']} tokens saved)")
+
+        prompt_cache = llm_stats.get("prompt_cache", {})
+        if prompt_cache.get("requests"):
+            input_tokens = prompt_cache["cached_input_tokens"] + prompt_cache["uncached_input_tokens"]
+            print(f"Prompt Cache: {prompt_cache['cached_input_tokens']} of {input_tokens} input tokens cached "
+                  f"over {prompt_cache['requests']} requests")
+
+
+def print_usage(summary: Dict[str, Any]) -> None:
+    """Print the tokens and estimated cost of the LLM requests sent, with the costliest chunks or files.
+    
+    Args:
+        summary (Dict[str, Any]): Summary of a single file or of a batch
+        
+    Returns:
+        None
+    """
+    usage = summary.get("usage")
+    if not usage or not usage.get("requests"):
+        return
+
+    estimated = f", {usage['estimated_requests']} estimated" if usage.get("estimated_requests") else ""
+    unpriced = f", {usage['unpriced_requests']} unpriced" if usage.get("unpriced_requests") else ""
+    print(f"LLM Usage: {usage['input_tokens']} input, {usage['cached_input_tokens']} cached input, "
+          f"{usage['cache_write_tokens']} cache write and {usage['output_tokens']} output tokens "
+          f"over {usage['requests']} requests{estimated}{unpriced}, ~${usage['cost_usd']:.4f}")
+
+    for chunk in usage.get("top_chunks", []):
+        origin = chunk.get("source") or chunk.get("module")
+        where = f"lines {chunk['start_line']}-{chunk['end_line']}" + (f" of {origin}" if origin else "")
+        print(f"  {where}: {chunk['input_tokens'] + chunk['cache_write_tokens']} input, "
+              f"{chunk['cached_input_tokens']} cached, {chunk['output_tokens']} output tokens, "
+              f"~${chunk['cost_usd']:.4f}")
+
+    for file_usage in usage.get("top_files", []):
+        print(f"  {file_usage['source']}: {file_usage['requests']} requests, "
+              f"{file_usage['input_tokens']} input, {file_usage['output_tokens']} output tokens, "
+              f"~${file_usage['cost_usd']:.4f}")
+
+
+def print_vendor_stats(summary: Dict[str, Any]) -> None:
+    """Print the bytes of known vendor libraries recognized in the code, if any.
+    
+    Args:
+        summary (Dict[str, Any]): Summary of a single file or of a batch
+        
+    Returns:
+        None
+    """
+    vendor = summary.get("vendor")
+    if vendor and vendor.get("bytes"):
+        libraries = ", ".join(f"{name}: {size} bytes" for name, size in sorted(vendor["bytes"].items()))
+        print(f"Vendor Code Skipped: {libraries}")
+
+
+def print_cache_stats(summary: Dict[str, Any]) -> None:
+    """Print cache hit and miss counts from a summary, if caching was enabled.
+    
+    Args:
+        summary (Dict[str, Any]): Summary of a single file or of a batch
+        
+    Returns:
+        None
+    """
+    cache_stats = summary.get("cache")
+    if cache_stats:
+        stats = ", ".join(f"{name.replace('_', ' ')}: {value}" for name, value in cache_stats.items())
+        print(f"Cache: {stats}")
+
+
+def format_bytes(size: float) -> str:
+    """Format a number of bytes with a binary unit.
+    
+    Args:
+        size (float): Number of bytes
+        
+    Returns:
+        str: The size, e.g. "1.5 MB"
+    """
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def print_timings(summary: Dict[str, Any]) -> None:
+    """Print the time and throughput of each stage and LLM request latencies, if measured.
+    
+    Args:
+        summary (Dict[str, Any]): Summary of a single file or of a batch
+        
+    Returns:
+        None
+    """
+    timings = summary.get("timings")
+    if not timings:
+        return
+
+    print("Timings:")
+    for name, stage in timings.get("stages", {}).items():
+        line = f"  {name}: {stage['wall_s']:.3f}s wall, {stage['cpu_s']:.3f}s CPU"
+        if stage.get("bytes"):
+            line += f", {format_bytes(stage['bytes'])} at {format_bytes(stage['bytes_per_s'])}/s"
+        print(line)
+
+    latency = timings.get("llm_latency")
+    if latency:
+        if "p50_s" in latency:
+            print(f"LLM Latency: {latency['requests']} requests, p50 {latency['p50_s']:.3f}s, "
+                  f"p90 {latency['p90_s']:.3f}s, p99 {latency['p99_s']:.3f}s, max {latency['max_s']:.3f}s")
+        else:
+            print(f"LLM Latency: {latency['requests']} requests, mean {latency['mean_s']:.3f}s")
+
+
+def print_batch_results(results: Dict[str, Any]) -> None:
+    """Print the results of a batch run in human-readable form.
+    
+    Args:
+        results (Dict[str, Any]): Merged batch results keyed by file
+        
+    Returns:
+        None
+    """
+    for filepath, file_results in results["files"].items():
+        print(f"\n=== {filepath} ===")
+        if "error" in file_results:
+            print(f"Error: {file_results['error']}")
+        else:
+            print_results(file_results)
+
+    summary = results["summary"]
+    print("\nBatch Summary:")
+    print(f"Files Analyzed: {summary['files']}")
+    print(f"Files Failed: {summary['failed_files']}")
+    if summary.get("cassette_misses"):
+        print(f"Cassette Misses: {summary['cassette_misses']}")
+    print(f"Total Endpoints: {summary.get('total_endpoints', 0)}")
+    print_llm_stats(summary)
+    print_usage(summary)
+    print_vendor_stats(summary)
+    print_cache_stats(summary)
+    print_timings(summary)
+
+
+def add_vendor_library(config: Dict[str, Any], name: str, files: List[str]) -> None:
+    """Fingerprint builds of a library into the vendor database named in the config.
+    
+    Args:
+        config (Dict[str, Any]): Configuration parameters for the analysis process
+        name (str): Name of the library, e.g. "lodash"
+        files (List[str]): Builds of the library to fingerprint
+        
+    Returns:
+        None
+    """
+    path = config.get("vendor", {}).get("database", DEFAULT_DATABASE_PATH)
+    database = VendorDatabase.load(path) if os.path.exists(path) else VendorDatabase()
+
+    for filepath in files:
+        with open(filepath, "rb") as f:
+            added = database.add_library(name, f.read())
+        print(f"Added {added} fingerprints of {name} from {filepath}")
+
+    database.save(path)
+    print(f"Vendor database {path} now holds {len(database.libraries)} libraries")
 
 
 def main():
     """Main entry point for the JALAPI application.
     
     Parses command-line arguments, sets up logging, initializes the analysis agent,
-    and runs the analysis process. Outputs results to console (in human-readable or JSON format)
-    and optionally to a file.
+    and runs the analysis process. A single --js file is analyzed in-process; --batch and
+    --file-list inputs are fanned out to a pool of worker processes. Outputs results to
+    console (in human-readable or JSON format) and optionally to a file. Exits with
+    status 1 if the analysis fails, or if any prompt is missing from a replayed cassette.
     
     Returns:
         None
     """
     parser = argparse.ArgumentParser(description="JavaScript API Endpoint Discovery")
-    parser.add_argument("--js", required=True, help="JavaScript file to analyze")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--js", help="JavaScript file to analyze")
+    inputs.add_argument(
+        "--batch", nargs="+", metavar="PATH",
+        help="Files, directories or glob patterns to analyze in parallel"
+    )
+    inputs.add_argument(
+        "--file-list", help="File listing files, directories or glob patterns to analyze, one per line"
+    )
+    inputs.add_argument(
+        "--add-vendor", nargs="+", metavar="ARG",
+        help="Fingerprint a library into the vendor database: its name, then one or more of its builds"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=None, help="Number of worker processes for batch mode (default: CPU count)"
+    )
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     parser.add_argument("--output", help="Output JSON file path")
     parser.add_argument(
@@ -34,43 +307,58 @@ def main():
     parser.add_argument(
         "--json", action="store_true", help="Output results as JSON instead of human-readable format"
     )
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the result cache")
+    parser.add_argument(
+        "--clear-cache", action="store_true", help="Remove all cached entries before analyzing"
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="CASSETTE", help="Record every LLM response into a cassette file")
+    cassette.add_argument(
+        "--replay", metavar="CASSETTE", help="Answer LLM requests from a recorded cassette, without the provider"
+    )
     args = parser.parse_args()
 
     try:
         setup_logging(debug=args.debug)
         config = load_config(args.config)
 
-        agent = JavaScriptAnalysisAgent(config)
-        results = agent.analyze(args.js)
+        if args.no_cache:
+            config["cache"] = {**config.get("cache", {}), "enabled": False}
+        elif args.clear_cache:
+            cache = open_cache(config)
+            if cache is not None:
+                cache.clear()
+                cache.close()
+
+        if args.record or args.replay:
+            llm_config = config.setdefault("llm", {})
+            llm_config["cassette"] = {
+                "mode": "record" if args.record else "replay",
+                "path": args.record or args.replay,
+            }
+
+        if args.add_vendor:
+            if len(args.add_vendor) < 2:
+                parser.error("--add-vendor needs a library name and at least one file")
+            add_vendor_library(config, args.add_vendor[0], args.add_vendor[1:])
+            return
+
+        if args.js:
+            agent = JavaScriptAnalysisAgent(config)
+            results = agent.analyze(args.js)
+        else:
+            batch_inputs = args.batch or read_file_list(args.file_list)
+            files = collect_files(batch_inputs)
+            results = analyze_batch(files, config, jobs=args.jobs, debug=args.debug)
 
         # Output as JSON if requested
         if args.json:
             print(json.dumps(results, indent=2))
-        else:
+        elif args.js:
             # Print human-readable summary
-            print("\nAnalysis Summary:")
-            print(f"Total Endpoints: {results['summary']['total_endpoints']}")
-            print(f"Found by Regex: {results['summary']['regex_findings']}")
-            print(f"Found by LLM: {results['summary']['llm_findings']}")
-
-            # Print endpoints
-            print("\nDiscovered Endpoints:")
-            for endpoint in results["endpoints"]:
-                print(f"\n  Path: {endpoint['path']}")
-                print(f"  Method: {endpoint['method']}")
-                print(f"  Detector: {endpoint['detector']}")
-                print(f"  Confidence: {endpoint['confidence']}")
-                
-                # Display line number if available
-                if 'line_number' in endpoint:
-                    print(f"  Line: {endpoint['line_number']}")
-
-                if "auth" in endpoint:
-                    print(f"  Auth Required: {endpoint['auth']['required']}")
-                    if endpoint["auth"].get("type"):
-                        print(f"  Auth Type: {endpoint['auth']['type']}")
-                    if endpoint["auth"].get("location"):
-                        print(f"  Auth Location: {endpoint['auth']['location']}")
+            print_results(results)
+        else:
+            print_batch_results(results)
 
         # Save to file if output path provided
         if args.output:
@@ -79,10 +367,16 @@ def main():
             if not args.json:
                 print(f"\nFull results saved to {args.output}")
 
+        # Incomplete replays must fail, so CI notices a stale cassette
+        if not args.js and results["summary"].get("cassette_misses"):
+            sys.exit(1)
+
     except Exception as e:
+        # Includes CassetteMissError from a single-file replay
         print(f"Error: {e}")
         if args.debug:
             raise
+        sys.exit(1)
 
 
 if __name__ == "__main__":
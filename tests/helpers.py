@@ -0,0 +1,25 @@
+"""
+Shared helpers for the unit tests.
+
+This module locates the bundled JavaScript samples and tells whether the
+LLM client library is installed, for the tests that need either.
+"""
+
+import importlib.util
+import os
+
+# Tests of the analyzers are skipped when the LLM client library is missing
+HAS_PARLAI = importlib.util.find_spec("voidwire_parlai") is not None
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "javascript")
+
+
+def load_sample(name: str) -> str:
+    """Read one of the bundled JavaScript samples."""
+    with open(os.path.join(SAMPLES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_samples() -> str:
+    """Concatenate the bundled JavaScript samples."""
+    return "\n".join(load_sample(name) for name in sorted(os.listdir(SAMPLES_DIR)))
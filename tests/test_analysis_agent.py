@@ -0,0 +1,378 @@
+"""
+Unit tests for the JavaScriptAnalysisAgent class.
+
+These tests cover loading files, including reuse of cached beautified output
+for minified files, analyzing bundles through their source maps,
+splitting bundles into modules, overlapping the regex and LLM stages,
+reporting stage timings and LLM usage, and replaying recorded LLM responses.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from tests.helpers import HAS_PARLAI
+
+if HAS_PARLAI:
+    from jalapi.core import analysis_agent
+    from jalapi.core.analysis_agent import JavaScriptAnalysisAgent
+    from jalapi.core.fake_provider import FakeProvider
+    from jalapi.models.models import Endpoint, VendorRegion
+    from jalapi.utils.line_index import LineIndex
+
+MODEL = "claude-3-5-sonnet-20241022"
+
+# Offline provider answering each request after exactly LATENCY seconds
+LATENCY = 0.2
+FAKE_LLM = {"provider": "fake", "fake": {"latency_ms": LATENCY * 1000, "jitter_ms": 0}}
+
+MINIFIED = "var a={get:function(){return fetch('/api/users')}};" * 40
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestBeautifyCache(unittest.TestCase):
+    """Tests for caching beautified output."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = {"cache": {"path": os.path.join(self.directory, "cache.db")}, "llm": FAKE_LLM}
+        self.path = os.path.join(self.directory, "bundle.min.js")
+        with open(self.path, "w") as f:
+            f.write(MINIFIED)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_reuses_beautified_output(self):
+        """Test that an unchanged minified file is only reflowed once."""
+        agent = JavaScriptAnalysisAgent(self.config)
+        with mock.patch.object(analysis_agent, "reflow", wraps=analysis_agent.reflow) as reflow:
+            first = agent._load_javascript(self.path)
+            self.assertEqual(agent._beautify_stats, {"beautify_hits": 0, "beautify_misses": 1})
+
+            second = JavaScriptAnalysisAgent(self.config)._load_javascript(self.path)
+
+        self.assertEqual(reflow.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertGreater(first.count("\n"), 40)
+
+    def test_key_includes_beautifier(self):
+        """Test that changed contents or a new reflow version miss the cache."""
+        agent = JavaScriptAnalysisAgent(self.config)
+        agent._load_javascript(self.path)
+
+        with open(self.path, "a") as f:
+            f.write("var b=1;")
+        agent._load_javascript(self.path)
+        self.assertEqual(agent._beautify_stats["beautify_misses"], 1)
+
+        with mock.patch.object(analysis_agent, "REFLOW_VERSION", 999):
+            agent._load_javascript(self.path)
+        self.assertEqual(agent._beautify_stats["beautify_misses"], 1)
+
+        agent._load_javascript(self.path)
+        self.assertEqual(agent._beautify_stats["beautify_hits"], 1)
+
+    def test_disabled_cache(self):
+        """Test that beautification still works without a cache."""
+        agent = JavaScriptAnalysisAgent({"cache": {"enabled": False}, "llm": FAKE_LLM})
+        self.assertIn("\n", agent._load_javascript(self.path))
+        self.assertEqual(agent._beautify_stats, {})
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestSourceMapAnalysis(unittest.TestCase):
+    """Tests for analyzing the original sources embedded in a source map."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = {"cache": {"path": os.path.join(self.directory, "cache.db")}, "llm": FAKE_LLM}
+        self.path = os.path.join(self.directory, "bundle.js")
+        with open(self.path, "w") as f:
+            f.write(MINIFIED + "\n//# sourceMappingURL=bundle.js.map\n")
+        self.write_map("fetch('/api/orders');")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_map(self, app_source: str) -> None:
+        source_map = {
+            "version": 3,
+            "sources": ["src/app.js", "src/api.js", "node_modules/lib/index.js"],
+            "sourcesContent": [
+                app_source,
+                "// API client\n\nexport function users() {\n  return fetch('/api/users');\n}\n",
+                "fetch('/api/vendor');",
+            ],
+            "mappings": "",
+        }
+        with open(self.path + ".map", "w") as f:
+            json.dump(source_map, f)
+
+    def analyze(self, config):
+        agent = JavaScriptAnalysisAgent(config)
+        with mock.patch.object(agent.llm, "analyze_endpoints", return_value=[]):
+            return agent.analyze(self.path)
+
+    def test_original_sources_and_lines(self):
+        """Test that endpoints report their original file and line, skipping excluded sources."""
+        config = {**self.config, "loading": {"source_maps": {"exclude": ["node_modules/"]}}}
+        results = self.analyze(config)
+
+        found = {endpoint["path"]: endpoint for endpoint in results["endpoints"]}
+        self.assertEqual(set(found), {"/api/orders", "/api/users"})
+        self.assertEqual(found["/api/users"]["source"], "src/api.js")
+        self.assertEqual(found["/api/users"]["line_number"], 4)
+        self.assertEqual(results["summary"]["source_map"], {"modules": 2, "excluded_modules": 1})
+        self.assertNotIn("beautify_misses", results["summary"]["cache"])
+
+    def test_unchanged_sources_reuse_cache(self):
+        """Test that only original sources changed since the last build are analyzed again."""
+        self.analyze(self.config)
+        self.write_map("axios.post('/api/orders');")
+
+        results = self.analyze(self.config)
+
+        self.assertEqual(results["summary"]["cache"]["result_misses"], 1)
+        self.assertEqual(results["summary"]["cache"]["module_hits"], 2)
+        self.assertEqual(results["summary"]["cache"]["module_misses"], 1)
+        found = {endpoint["path"]: endpoint for endpoint in results["endpoints"]}
+        self.assertEqual(found["/api/users"]["source"], "src/api.js")
+        self.assertEqual(found["/api/orders"]["method"], "POST")
+
+    def test_disabled(self):
+        """Test that the bundle itself is analyzed when source maps are disabled."""
+        results = self.analyze({**self.config, "loading": {"source_maps": {"enabled": False}}})
+
+        self.assertNotIn("source_map", results["summary"])
+        self.assertEqual([endpoint["path"] for endpoint in results["endpoints"]], ["/api/users"])
+        self.assertNotIn("source", results["endpoints"][0])
+
+
+def development_bundle(count: int, changed: int = -1) -> str:
+    """Build a development webpack bundle whose modules each fetch one endpoint."""
+    modules = "".join(
+        f'/***/ "./src/m{i}.js":\n/***/ (function(module, exports) {{\n\n'
+        f"fetch('/api/item{i}{'-v2' if i == changed else ''}');\n\n/***/ }}),\n\n"
+        for i in range(count)
+    )
+    return "/******/ (function(modules) {\n/******/ })\n/******/ ({\n\n" + modules + "/******/ });\n"
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestBundleModules(unittest.TestCase):
+    """Tests for analyzing the modules of a bundle separately."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.config = {
+            "cache": {"path": os.path.join(self.directory, "cache.db")},
+            "system_prompt": "Find endpoints.",
+            "analysis_prompt": "CODE CONTEXT:{context}\nMAIN CODE:{code_chunk}",
+            "llm": {**FAKE_LLM, "concurrency": 4, "triage": {"enabled": False}},
+        }
+        self.path = os.path.join(self.directory, "bundle.js")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def analyze(self, content: str):
+        with open(self.path, "w") as f:
+            f.write(content)
+        return JavaScriptAnalysisAgent(self.config).analyze(self.path)
+
+    def test_findings_keyed_by_module_and_line(self):
+        """Test that findings carry their module ID and their line in the bundle."""
+        content = development_bundle(8)
+        start = time.perf_counter()
+        results = self.analyze(content)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(results["summary"]["bundle"], {"layout": "markers", "modules": 8, "runtime_pieces": 2})
+        lines = content.split("\n")
+        for endpoint in results["endpoints"]:
+            index = int(endpoint["path"].removeprefix("/api/item"))
+            self.assertEqual(endpoint["module"], f"./src/m{index}.js")
+            self.assertIn(endpoint["path"], lines[endpoint["line_number"] - 1])
+        self.assertEqual(len(results["endpoints"]), 8)
+        # Ten requests (eight modules and two runtime pieces) of LATENCY each, four at a time
+        self.assertLess(elapsed, 10 * LATENCY / 2)
+
+    def test_only_changed_modules_reanalyzed(self):
+        """Test that a rebuild changing one module only analyzes that module again."""
+        self.analyze(development_bundle(8))
+        results = self.analyze(development_bundle(8, changed=3))
+
+        cache = results["summary"]["cache"]
+        self.assertEqual((cache["module_hits"], cache["module_misses"]), (9, 1))
+        self.assertEqual(results["summary"]["llm"]["chunks"], 1)
+        paths = {endpoint["path"]: endpoint["module"] for endpoint in results["endpoints"]}
+        self.assertEqual(paths["/api/item3-v2"], "./src/m3.js")
+        self.assertEqual(paths["/api/item5"], "./src/m5.js")
+
+    def test_timings(self):
+        """Test that the summary reports stage timings and LLM latencies, unless disabled."""
+        timings = self.analyze(development_bundle(4))["summary"]["timings"]
+
+        self.assertLessEqual({"cache_lookup", "load", "split", "regex", "llm", "chunking", "dedup",
+                              "serialize", "total"}, set(timings["stages"]))
+        # Four modules and two runtime pieces, each analyzed and sent separately
+        self.assertEqual(timings["stages"]["regex"]["runs"], 6)
+        self.assertEqual(timings["llm_latency"]["requests"], 6)
+        # The fake provider answers after exactly LATENCY, plus scheduling overhead
+        for key in ("p50_s", "p90_s", "max_s"):
+            self.assertGreaterEqual(timings["llm_latency"][key], LATENCY)
+            self.assertLess(timings["llm_latency"][key], LATENCY + 0.1)
+
+        self.config["timings"] = {"enabled": False}
+        self.assertNotIn("timings", self.analyze(development_bundle(4, changed=1))["summary"])
+
+    def test_usage_by_chunk(self):
+        """Test that the costliest chunks are reported with their module and bundle lines."""
+        self.config["llm"]["pricing"] = {"report_top": 3, "models": {MODEL: {"input": 3.0, "output": 15.0}}}
+        content = development_bundle(6)
+        usage = self.analyze(content)["summary"]["usage"]
+
+        # Six modules and two runtime pieces, with usage reported by the fake provider
+        self.assertEqual((usage["requests"], usage["estimated_requests"]), (8, 0))
+        self.assertGreater(usage["cost_usd"], 0)
+        self.assertEqual(len(usage["top_chunks"]), 3)
+        lines = content.split("\n")
+        for chunk in usage["top_chunks"]:
+            if "module" in chunk:
+                self.assertIn("/api/item", lines[chunk["start_line"] + 2])
+
+        # Results and modules served from the cache cost nothing
+        self.assertNotIn("usage", self.analyze(content)["summary"])
+
+        # The fake provider's answers do not depend on timing, so a fresh run costs the same
+        self.config["cache"]["path"] = os.path.join(self.directory, "fresh.db")
+        self.assertEqual(self.analyze(content)["summary"]["usage"], usage)
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestStageOverlap(unittest.TestCase):
+    """Tests for running the regex stage while the LLM stage waits on the provider."""
+
+    def setUp(self):
+        self.config = {
+            "cache": {"enabled": False},
+            "system_prompt": "Find endpoints.",
+            "analysis_prompt": "CODE CONTEXT:{context}\nMAIN CODE:{code_chunk}",
+            "llm": {**FAKE_LLM, "concurrency": 1},
+        }
+        self.agent = JavaScriptAnalysisAgent(self.config)
+        self.code = "fetch('/api/users');\naxios.post('/api/orders');\n"
+
+    def slow_regex(self):
+        """Make the regex stage take about as long as one LLM request."""
+        discover = self.agent.regex.discover_endpoints
+
+        def slow(*args):
+            time.sleep(LATENCY)
+            return discover(*args)
+
+        return mock.patch.object(self.agent.regex, "discover_endpoints", side_effect=slow)
+
+    def test_overlapped_wall_time(self):
+        """Test that the stages take about max(regex, llm) and find what a sequential run finds."""
+        with self.slow_regex():
+            found, (regex_time, llm_time, wall_time), _ = self.agent._discover_endpoints(
+                self.code, "utf-8", self.agent.llm, self.config
+            )
+            sequential = self.agent.regex.discover_endpoints(self.code, LineIndex(self.code), "utf-8")
+        sequential += self.agent.llm.analyze_endpoints(self.code, self.config)
+
+        self.assertGreaterEqual(llm_time, LATENCY)
+        self.assertGreaterEqual(wall_time, max(regex_time, llm_time))
+        self.assertLess(wall_time, 0.8 * (regex_time + llm_time))
+        self.assertEqual(found, sequential)
+
+    def test_llm_failure_joins_stage_before_closing(self):
+        """Test that a mapped file stays open until a failing LLM stage has finished with it."""
+        path = os.path.join(tempfile.mkdtemp(), "bundle.js")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, "w") as f:
+            f.write(self.code)
+        self.config["loading"] = {"mmap_threshold_mb": 0}
+        events = []
+
+        def failing_llm(js_content, *args):
+            time.sleep(LATENCY)
+            events.append(("llm read", bytes(js_content[:5])))
+            raise RuntimeError("provider down")
+
+        close = analysis_agent.MappedSource.close
+
+        def recording_close(source):
+            events.append(("closed", None))
+            close(source)
+
+        agent = JavaScriptAnalysisAgent(self.config)
+        with mock.patch.object(agent.llm, "analyze_endpoints", side_effect=failing_llm), \
+                mock.patch.object(analysis_agent.MappedSource, "close", recording_close):
+            with self.assertRaises(RuntimeError):
+                agent.analyze(path)
+
+        self.assertEqual(events, [("llm read", b"fetch"), ("closed", None)])
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestCassetteRuns(unittest.TestCase):
+    """Tests for recording and replaying the LLM responses of whole runs."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "app.js")
+        with open(self.path, "w") as f:
+            f.write("const base = cfg.root + '/v1';\nclient.send(base + '/items/' + id, opts);\n")
+        self.cassette = os.path.join(self.directory, "llm.cassette.gz")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_with_cassette(self, mode: str) -> set:
+        """Analyze the file with the cassette in the given mode, returning the LLM's paths."""
+        config = {
+            "cache": {"path": os.path.join(self.directory, "cache.db")},
+            "system_prompt": "Find endpoints.",
+            "analysis_prompt": "CODE CONTEXT:{context}\nMAIN CODE:{code_chunk}",
+            "llm": {**FAKE_LLM, "cassette": {"mode": mode, "path": self.cassette}},
+        }
+        results = JavaScriptAnalysisAgent(config).analyze(self.path)
+        return {endpoint["path"] for endpoint in results["endpoints"] if "llm" in endpoint["detector"]}
+
+    def test_replay_reads_rerecorded_cassette(self):
+        """Test that replaying a cassette recorded again at the same path returns its new responses."""
+        first = self.run_with_cassette("record")
+        self.assertEqual(self.run_with_cassette("replay"), first)
+
+        os.remove(self.cassette)
+        rerecorded = [{"path": "/api/rerecorded", "method": "GET", "confidence": 0.9, "line_number": 2}]
+        with mock.patch.object(FakeProvider, "_find_endpoints", return_value=rerecorded):
+            self.assertEqual(self.run_with_cassette("record"), {"/api/rerecorded"})
+
+        self.assertEqual(self.run_with_cassette("replay"), {"/api/rerecorded"})
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestVendorDownWeight(unittest.TestCase):
+    """Tests for down-weighting regex findings inside vendor code."""
+
+    def test_only_fully_covered_lines(self):
+        """Test that only findings on lines entirely inside a vendor region are down-weighted."""
+        code = "app('/api/a');\nlib('/api/b');\nlib('/api/c');app('/api/d');\n"
+        region = VendorRegion("lib", code.index("lib"), code.index("app('/api/d')"), 5)
+        endpoints = [Endpoint(path, line_number=line) for path, line in (("/api/a", 1), ("/api/b", 2), ("/api/c", 3))]
+
+        JavaScriptAnalysisAgent._down_weight_vendor_findings(endpoints, [region], LineIndex(code), 0.3)
+
+        self.assertEqual([endpoint.confidence for endpoint in endpoints], [1.0, 0.3, 1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Unit tests for batch analysis.
+
+These tests cover expanding inputs into files, isolating files that fail to
+analyze, and merging per-file summaries into batch totals.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.helpers import HAS_PARLAI
+
+if HAS_PARLAI:
+    from jalapi.core import batch
+    from jalapi.core.batch import _batch_summary, analyze_batch, collect_files, read_file_list
+    from jalapi.core.cassette import CassetteMissError
+
+CONFIG = {
+    "system_prompt": "Find endpoints.",
+    "analysis_prompt": "CODE CONTEXT:{context}\nMAIN CODE:{code_chunk}",
+    "cache": {"enabled": False},
+    "timings": {"enabled": False},
+    "llm": {"provider": "fake", "fake": {"latency_ms": 0, "jitter_ms": 0}},
+}
+
+
+def file_result(endpoints: int, cost: float, hits: int = 0) -> dict:
+    """Build the result of one analyzed file with the given summary figures."""
+    return {
+        "summary": {
+            "total_endpoints": endpoints,
+            "cache": {"result_hits": hits, "result_misses": 1 - hits},
+            "usage": {
+                "requests": 2,
+                "input_tokens": 100,
+                "cached_input_tokens": 0,
+                "output_tokens": 10,
+                "cost_usd": cost,
+            },
+        },
+        "endpoints": [],
+    }
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestCollectFiles(unittest.TestCase):
+    """Tests for collect_files and read_file_list."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ("app.js", "lib/util.mjs", "lib/nested/worker.cjs", "lib/style.css", "README.md"):
+            path = os.path.join(self.directory, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("fetch('/api/x');\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def test_directories(self):
+        """Test that directories are searched recursively for JavaScript files only."""
+        self.assertEqual(
+            collect_files([self.directory]),
+            [self.path("app.js"), self.path("lib/util.mjs"), self.path("lib/nested/worker.cjs")],
+        )
+
+    def test_globs_and_duplicates(self):
+        """Test that globs expand to files and duplicates keep their first position."""
+        files = collect_files([self.path("lib/**/*"), self.path("app.js"), self.path("lib")])
+
+        self.assertEqual(files, [
+            self.path("lib/nested/worker.cjs"),
+            self.path("lib/style.css"),
+            self.path("lib/util.mjs"),
+            self.path("app.js"),
+        ])
+
+    def test_plain_paths_kept(self):
+        """Test that listed files are kept whatever their extension, even if missing."""
+        files = collect_files([self.path("README.md"), self.path("missing.js")])
+
+        self.assertEqual(files, [self.path("README.md"), self.path("missing.js")])
+
+    def test_read_file_list(self):
+        """Test that blank lines and comments are skipped in file lists."""
+        list_path = self.path("files.txt")
+        with open(list_path, "w") as f:
+            f.write(f"# bundles\n{self.path('app.js')}\n\n  {self.path('lib')}  \n")
+
+        self.assertEqual(read_file_list(list_path), [self.path("app.js"), self.path("lib")])
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestAnalyzeBatch(unittest.TestCase):
+    """Tests for analyze_batch and _batch_summary."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_failing_file_is_isolated(self):
+        """Test that a file that cannot be analyzed is reported without stopping the others."""
+        first = self.write("a.js", "fetch('/api/a');\n")
+        second = self.write("b.js", "axios.post('/api/b');\n")
+        missing = os.path.join(self.directory, "missing.js")
+
+        results = analyze_batch([first, missing, second], CONFIG, jobs=2)
+
+        self.assertEqual(list(results["files"]), [first, missing, second])
+        self.assertIn("error", results["files"][missing])
+        self.assertEqual(results["files"][first]["endpoints"][0]["path"], "/api/a")
+        self.assertEqual(results["files"][second]["endpoints"][0]["path"], "/api/b")
+        self.assertEqual((results["summary"]["files"], results["summary"]["failed_files"]), (3, 1))
+
+    def test_worker_exception_is_captured(self):
+        """Test that an exception raised by the worker's agent becomes an error entry."""
+        agent = mock.Mock()
+        agent.analyze.side_effect = RuntimeError("boom")
+        with mock.patch.object(batch, "_worker_agent", agent):
+            self.assertEqual(batch._analyze_file("a.js"), {"source": "a.js", "error": "boom"})
+
+    def test_cassette_miss_is_flagged(self):
+        """Test that a prompt missing from a replayed cassette is flagged and counted."""
+        agent = mock.Mock()
+        agent.analyze.side_effect = CassetteMissError("no recorded response")
+        with mock.patch.object(batch, "_worker_agent", agent):
+            result = batch._analyze_file("a.js")
+        self.assertEqual(result, {"source": "a.js", "error": "no recorded response", "cassette_miss": True})
+
+        summary = _batch_summary({"a.js": result, "b.js": {"source": "b.js", "error": "unreadable"}})
+        self.assertEqual((summary["failed_files"], summary["cassette_misses"]), (2, 1))
+
+    def test_summary_totals(self):
+        """Test that numeric statistics are summed, failures counted and costliest files listed."""
+        results = {
+            "a.js": file_result(3, 0.002),
+            "b.js": {"source": "b.js", "error": "unreadable"},
+            "c.js": file_result(4, 0.005, hits=1),
+            "d.js": file_result(1, 0.001),
+        }
+
+        summary = _batch_summary(results, report_top=2)
+
+        self.assertEqual((summary["files"], summary["failed_files"], summary["cassette_misses"]), (4, 1, 0))
+        self.assertEqual(summary["total_endpoints"], 8)
+        self.assertEqual(summary["cache"], {"result_hits": 1, "result_misses": 2})
+        self.assertEqual(summary["usage"]["requests"], 6)
+        self.assertAlmostEqual(summary["usage"]["cost_usd"], 0.008)
+        self.assertEqual([entry["source"] for entry in summary["usage"]["top_files"]], ["c.js", "a.js"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Unit tests for bundle splitting.
+
+These tests check that webpack module maps and development build markers
+are split into modules by ID, that the pieces cover every non-trivial part
+of the bundle, and that bundles the lexer cannot parse are left whole.
+"""
+
+import unittest
+
+from jalapi.utils.bundle import split_bundle
+
+CHUNK = (
+    "(self.webpackChunkapp=self.webpackChunkapp||[]).push([[179],{"
+    "123:function(e,t,n){var r=/}/g;n.get(`/api/${e+\"}\"}`)},"
+    "\"ab\":(e,t)=>{t.x={a:1,b:[2,3]}},"
+    "7:e=>{e.exports=fetch(\"/api/x\",{method:\"POST\"})}}]);"
+)
+
+JSONP_ARRAY = (
+    "(window.webpackJsonp=window.webpackJsonp||[]).push([[0],"
+    "[function(e,t){a(\"/a\")},,function(e){b(\"/b\")}]]);"
+)
+
+DEVELOPMENT = """/******/ (function(modules) { // webpackBootstrap
+/******/ 	var installedModules = {};
+/******/ })
+/************************************************************************/
+/******/ ({
+
+/***/ "./src/api.js":
+/*!********************!*\\
+  !*** ./src/api.js ***!
+  \\********************/
+/***/ (function(module, exports) {
+
+fetch('/api/users');
+
+/***/ }),
+
+/***/ "./src/index.js":
+/***/ (function(module, exports, __webpack_require__) {
+
+__webpack_require__("./src/api.js");
+
+/***/ })
+
+/******/ });"""
+
+
+def pieces(content: str):
+    """Split content and return its (module ID, code) pieces."""
+    layout, spans = split_bundle(content)
+    return layout, [(module_id, content[start:end]) for module_id, start, end in spans]
+
+
+class TestSplitBundle(unittest.TestCase):
+    """Tests for split_bundle."""
+
+    def test_module_map_object(self):
+        """Test that module functions are split at top-level commas, not inside literals."""
+        layout, found = pieces(CHUNK)
+
+        self.assertEqual(layout, "module_map")
+        self.assertEqual([module_id for module_id, _ in found], [None, "123", "ab", "7", None])
+        self.assertEqual(found[1][1], "123:function(e,t,n){var r=/}/g;n.get(`/api/${e+\"}\"}`)}")
+        self.assertEqual(found[3][1], "7:e=>{e.exports=fetch(\"/api/x\",{method:\"POST\"})}")
+        self.assertEqual(found[-1][1], "}]);")
+
+    def test_module_map_array(self):
+        """Test that array module maps are keyed by index, skipping holes."""
+        _, found = pieces(JSONP_ARRAY)
+
+        modules = [(module_id, code) for module_id, code in found if module_id is not None]
+        self.assertEqual(modules, [("0", "function(e,t){a(\"/a\")}"), ("2", "function(e){b(\"/b\")}")])
+
+    def test_development_markers(self):
+        """Test that development builds are split at their /***/ markers."""
+        layout, found = pieces(DEVELOPMENT)
+
+        self.assertEqual(layout, "markers")
+        self.assertEqual([module_id for module_id, _ in found], [None, "./src/api.js", "./src/index.js", None])
+        self.assertIn("fetch('/api/users');", found[1][1])
+        self.assertTrue(found[2][1].startswith('/***/ "./src/index.js":'))
+        self.assertEqual(found[-1][1], "/******/ });")
+
+    def test_not_a_bundle(self):
+        """Test that plain code and unparseable module maps are left whole."""
+        self.assertIsNone(split_bundle("function a(){return fetch('/api/x')}"))
+        self.assertIsNone(split_bundle(CHUNK[:-20]))
+        self.assertIsNone(split_bundle(CHUNK, min_modules=4))
+
+
+if __name__ == "__main__":
+    unittest.main()
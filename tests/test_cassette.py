@@ -0,0 +1,82 @@
+"""
+Unit tests for LLM response cassettes.
+
+These tests cover recording responses into a cassette, replaying them, and
+failing on requests the cassette does not hold.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from jalapi.core.cassette import CassetteMissError, RecordingProvider, ReplayProvider, load_cassette
+from jalapi.core.fake_provider import FakeProvider
+
+SYSTEM = "Find endpoints."
+
+
+def prompt(index: int) -> str:
+    return f"MAIN CODE:fetch('/api/item{index}');"
+
+
+class TestCassette(unittest.TestCase):
+    """Tests for RecordingProvider and ReplayProvider."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "runs", "llm.cassette.gz")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, indexes) -> list:
+        recorder = RecordingProvider(FakeProvider(latency_ms=0, jitter_ms=0), self.path)
+        responses = [recorder.chat("model", "", prompt(index), SYSTEM) for index in indexes]
+        recorder.flush()
+        return responses
+
+    def test_replay(self):
+        """Test that recorded responses are replayed as they were returned."""
+        recorded = self.record(range(3))
+
+        replay = ReplayProvider(self.path)
+        self.assertEqual([replay.chat("model", "", prompt(index), SYSTEM) for index in range(3)], recorded)
+        self.assertEqual(recorded[1]["endpoints"][0]["path"], "/api/item1")
+
+    def test_appended_recordings(self):
+        """Test that each flush appends to the cassette, with nothing written for an empty one."""
+        self.record(range(2))
+        self.record(range(2, 4))
+        recorder = RecordingProvider(FakeProvider(latency_ms=0, jitter_ms=0), self.path)
+        recorder.flush()
+
+        self.assertEqual(len(load_cassette(self.path)), 4)
+
+    def test_marked_system_prompt(self):
+        """Test that marking the system prompt for caching does not change the key."""
+        self.record([0])
+        marked = [{"type": "text", "text": SYSTEM, "cache_control": {"type": "ephemeral"}}]
+
+        response = ReplayProvider(self.path).chat("model", "", prompt(0), marked)
+
+        self.assertEqual(response["endpoints"][0]["path"], "/api/item0")
+
+    def test_missing_prompt(self):
+        """Test that unrecorded prompts, models and system prompts raise."""
+        self.record([0])
+        replay = ReplayProvider(self.path)
+
+        for model, text, system in (("model", prompt(1), SYSTEM), ("other", prompt(0), SYSTEM),
+                                    ("model", prompt(0), "Changed.")):
+            with self.assertRaises(CassetteMissError):
+                replay.chat(model, "", text, system)
+
+    def test_missing_cassette(self):
+        """Test that replaying a cassette that was never recorded fails."""
+        with self.assertRaises(FileNotFoundError):
+            ReplayProvider(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+"""
+Unit tests for code chunking.
+
+These tests check that the span-based chunkers split code exactly where the
+original line-by-line and prefix-counting implementations did, benchmark them
+against each other, and check that token-sized chunks fit their budget.
+"""
+
+import re
+import time
+import unittest
+from typing import List, Tuple
+
+from jalapi.utils.chunk import (
+    MIN_CHUNK_TOKENS,
+    chunk_code,
+    chunk_code_spans,
+    simple_chunk_code,
+    simple_chunk_spans,
+    token_chunk_code,
+    token_chunk_spans,
+)
+from jalapi.models.models import ChunkRegion
+from jalapi.utils.tokens import estimate_tokens
+from tests.helpers import load_samples
+
+
+def line_chunk_reference(code: str, max_chunk_size: int = 4000) -> List[Tuple[str, str]]:
+    """The original chunk_code, which rejoins the current chunk after every line."""
+    chunks = []
+    current_chunk = []
+    current_context = []
+
+    for line in code.split("\n"):
+        if re.match(r"^\s*(async\s+)?function|^\s*const\s+\w+\s*=\s*(?:async\s+)?function", line):
+            if current_chunk:
+                chunks.append(("\n".join(current_chunk), "\n".join(current_context[-5:])))
+            current_chunk = []
+            current_context = []
+        current_chunk.append(line)
+        if len(line.strip()) > 0:
+            current_context.append(line)
+            if len(current_context) > 5:
+                current_context.pop(0)
+        if len("\n".join(current_chunk)) > max_chunk_size:
+            chunks.append(("\n".join(current_chunk), "\n".join(current_context[-5:])))
+            current_chunk = []
+            current_context = []
+
+    if current_chunk:
+        chunks.append(("\n".join(current_chunk), "\n".join(current_context[-5:])))
+    return chunks
+
+
+def window_chunk_reference(code: str, max_size: int = 3000, overlap: int = 1000) -> List[Tuple[str, int]]:
+    """The original simple_chunk_code boundaries, counting the prefix for each line number."""
+    chunks = []
+    start = 0
+    while start < len(code):
+        end = min(start + max_size, len(code))
+        if end < len(code):
+            for delimiter in ["\n}", "\n});", "\n  });", "\n    });"]:
+                last_delimiter = code.rfind(delimiter, start, end)
+                if last_delimiter > start:
+                    end = last_delimiter + len(delimiter)
+                    break
+        chunks.append((code[start:end], code[:start].count("\n") + 1))
+        start = min(end, start + max(max_size // 3, max_size - overlap))
+    return chunks
+
+
+class TestSpanChunking(unittest.TestCase):
+    """Tests for chunk_code and simple_chunk_code against the original implementations."""
+
+    def setUp(self):
+        self.samples = [
+            load_samples(),
+            "",
+            "\n",
+            "function a() {}\n",
+            "  async function a() {\n}\n\n" * 50,
+            "x" * 5000 + "\nconst f = function() {\n" + "  y();\n" * 2000 + "});\n",
+            "a.b(function(){return 1}),c(function(){})," * 500,
+        ]
+
+    def test_chunk_code_matches_reference(self):
+        """Test that chunk_code returns exactly what the line-by-line loop returned."""
+        for code in self.samples:
+            for max_chunk_size in (1, 200, 4000):
+                with self.subTest(size=len(code), max_chunk_size=max_chunk_size):
+                    self.assertEqual(
+                        chunk_code(code, max_chunk_size), line_chunk_reference(code, max_chunk_size)
+                    )
+
+    def test_simple_chunk_code_matches_reference(self):
+        """Test that simple_chunk_code keeps the original boundaries and line numbers."""
+        for code in self.samples:
+            for max_size, overlap in ((3000, 1000), (100, 30)):
+                with self.subTest(size=len(code), max_size=max_size):
+                    actual = [(chunk, line) for chunk, _, line in simple_chunk_code(code, max_size, overlap)]
+                    self.assertEqual(actual, window_chunk_reference(code, max_size, overlap))
+
+    def test_spans(self):
+        """Test that spans index the chunks in the code and bytes input gives the same spans."""
+        code = self.samples[0]
+
+        for start, end, line in simple_chunk_spans(code):
+            self.assertEqual(line, code[:start].count("\n") + 1)
+        self.assertEqual(list(simple_chunk_spans(code.encode())), list(simple_chunk_spans(code)))
+        self.assertEqual(
+            [code[start:end] for start, end, _ in chunk_code_spans(code)],
+            [chunk for chunk, _ in chunk_code(code)],
+        )
+
+    def test_bounded_spans(self):
+        """Test that chunking between two offsets chunks that stretch as if it were the whole code."""
+        code = self.samples[0]
+        start, end = len(code) // 3, 2 * len(code) // 3
+        stretch = code[start:end]
+        shifted = [(s + start, e + start) for s, e, _ in simple_chunk_spans(stretch)]
+        bounded = list(simple_chunk_spans(code, start_offset=start, end_offset=end))
+
+        self.assertEqual([(s, e) for s, e, _ in bounded], shifted)
+        self.assertEqual(bounded[0][2], code[:start].count("\n") + 1)
+        self.assertEqual(
+            [(s, e) for s, e, _ in token_chunk_spans(code, max_tokens=800, start_offset=start, end_offset=end)],
+            [(s + start, e + start) for s, e, _ in token_chunk_spans(stretch, max_tokens=800)],
+        )
+
+    def test_benchmark(self):
+        """Benchmark the span chunkers against the original implementations."""
+        code = (load_samples() + "\n") * 100
+
+        start = time.perf_counter()
+        expected = line_chunk_reference(code)
+        line_time = time.perf_counter() - start
+        start = time.perf_counter()
+        self.assertEqual(chunk_code(code), expected)
+        chunk_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        window_chunk_reference(code)
+        window_time = time.perf_counter() - start
+        start = time.perf_counter()
+        list(simple_chunk_spans(code))
+        span_time = time.perf_counter() - start
+
+        # Measured at about 10x and 70x; the bounds leave room for noisy machines
+        self.assertGreater(line_time / chunk_time, 3)
+        self.assertGreater(window_time / span_time, 10)
+        print(f"\nChunking of {len(code)} chars - chunk_code: {line_time * 1000:.1f}ms -> "
+              f"{chunk_time * 1000:.1f}ms, simple_chunk_code: {window_time * 1000:.1f}ms -> "
+              f"{span_time * 1000:.1f}ms")
+
+
+SAMPLE = "".join(
+    f"function handler{i}(req) {{\n  return fetch('/api/items/{i}', {{ method: 'GET' }});\n}}\n"
+    for i in range(400)
+)
+
+CONFIG_SAMPLE = "const CONFIG = { baseUrl: 'https://api.example.com' };\n" + SAMPLE
+
+
+class TestTokenChunking(unittest.TestCase):
+    """Tests for token_chunk_code."""
+
+    def check_chunks(self, code, max_tokens, reserved_tokens=0):
+        chunks = list(token_chunk_code(code, max_tokens=max_tokens, reserved_tokens=reserved_tokens))
+        context = chunks[0][1]
+        budget = max_tokens - reserved_tokens - estimate_tokens(context)
+        spans = list(token_chunk_spans(code, max_tokens=max_tokens, reserved_tokens=max_tokens - budget))
+        self.assertEqual(len(spans), len(chunks))
+
+        previous_start, previous_end = -1, 0
+        for (chunk, _, start_line), (start, end, line) in zip(chunks, spans):
+            self.assertLessEqual(estimate_tokens(chunk), budget)
+            self.assertEqual(code[start:start + len(chunk)], chunk)
+            self.assertEqual(end, start + len(chunk))
+            self.assertEqual(start_line, line)
+            self.assertEqual(start_line, code[:start].count("\n") + 1)
+            # Chunks move forward and leave no gap after the previous one
+            self.assertGreater(start, previous_start)
+            self.assertLessEqual(start, previous_end)
+            previous_start, previous_end = start, end
+
+        # Chunks cover the whole file and all but the last fill most of the budget
+        self.assertEqual((spans[0][0], spans[-1][1]), (0, len(code)))
+        for chunk, _, _ in chunks[:-1]:
+            self.assertGreater(estimate_tokens(chunk), budget * 0.5)
+        return chunks
+
+    def test_budget(self):
+        """Test that chunks fit and fill the token budget."""
+        self.check_chunks(SAMPLE, max_tokens=800)
+
+    def test_reserved_tokens(self):
+        """Test that reserved prompt tokens and the config context shrink the chunks."""
+        full = self.check_chunks(CONFIG_SAMPLE, max_tokens=1200)
+        reserved = self.check_chunks(CONFIG_SAMPLE, max_tokens=1200, reserved_tokens=500)
+
+        self.assertIn("IMPORTANT CONFIGURATION", full[0][1])
+        self.assertGreater(len(reserved), len(full))
+
+    def test_dense_code_gets_shorter_chunks(self):
+        """Test that symbol-dense code is split into fewer characters per chunk."""
+        dense = "a.b(c,d),e[f]=g?h:i,j&&k(l);\n" * 600
+        sparse = "const requestHandlerForUsers = createRequestHandler;\n" * 300
+
+        dense_size = len(next(token_chunk_code(dense, max_tokens=600))[0])
+        sparse_size = len(next(token_chunk_code(sparse, max_tokens=600))[0])
+
+        self.assertLess(dense_size, sparse_size)
+
+    def test_minimum_budget(self):
+        """Test that an oversized reservation still produces chunks of the minimum size."""
+        chunks = list(token_chunk_code(SAMPLE, max_tokens=100, reserved_tokens=500))
+
+        self.assertTrue(all(estimate_tokens(chunk) <= MIN_CHUNK_TOKENS for chunk, _, _ in chunks))
+        self.assertTrue(SAMPLE.endswith(chunks[-1][0]))
+
+    def test_bytes(self):
+        """Test that bytes input is chunked at the same boundaries as text."""
+        text_chunks = list(token_chunk_code(SAMPLE, max_tokens=800))
+        byte_chunks = list(token_chunk_code(SAMPLE.encode(), max_tokens=800))
+
+        self.assertEqual(text_chunks, byte_chunks)
+
+
+class TestChunkRegion(unittest.TestCase):
+    """Tests for ownership of overlapping chunks."""
+
+    def test_overlap_split_at_middle(self):
+        """Test that each offset of overlapping spans is owned by exactly one chunk."""
+        code = (load_samples() + "\n") * 3
+        regions = []
+        for start, end, line in simple_chunk_spans(code):
+            region = ChunkRegion(start, end, line)
+            if regions:
+                region.follow(regions[-1])
+            regions.append(region)
+
+        for offset in range(0, len(code), 7):
+            self.assertEqual(sum(region.owns(offset) for region in regions), 1)
+
+    def test_gap(self):
+        """Test that chunks separated by a gap keep their whole span."""
+        first, second = ChunkRegion(0, 100, 1), ChunkRegion(300, 400, 20)
+        second.follow(first)
+
+        self.assertTrue(first.owns(99))
+        self.assertTrue(second.owns(300))
+
+
+if __name__ == "__main__":
+    unittest.main()
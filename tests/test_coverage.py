@@ -0,0 +1,82 @@
+"""
+Unit tests for regex coverage measurement.
+
+These tests check which chunks count as fully resolved by the regex stage and
+which must still be escalated to the LLM.
+"""
+
+import unittest
+
+from jalapi.core.coverage import measure_coverage
+from jalapi.core.regex_analyzer import RegexAnalyzer
+
+
+class TestCoverage(unittest.TestCase):
+    """Tests for measure_coverage."""
+
+    def setUp(self):
+        self.regex = RegexAnalyzer()
+
+    def test_static_calls_are_covered(self):
+        """Test that static literals found with a known method are fully covered."""
+        coverage = measure_coverage("axios.get('/api/users');\naxios.post('/api/orders');", self.regex)
+
+        self.assertEqual((coverage.url_literals, coverage.resolved_literals), (2, 2))
+        self.assertTrue(coverage.fully_covered())
+
+    def test_dynamic_construction_is_escalated(self):
+        """Test that interpolation, concatenation and URL constructors are escalated."""
+        chunks = [
+            "axios.get(`/api/users/${id}`);",
+            "axios.get('/api/users/' + id);",
+            "axios.get('/api/users'); const u = new URL('/api/x', base);",
+        ]
+
+        for chunk in chunks:
+            with self.subTest(chunk=chunk):
+                coverage = measure_coverage(chunk, self.regex)
+                self.assertTrue(coverage.dynamic)
+                self.assertFalse(coverage.fully_covered())
+
+    def test_unresolved_literals(self):
+        """Test that literals without a known method lower the ratio."""
+        coverage = measure_coverage("axios.get('/api/users');\nconst other = '/api/orders';", self.regex)
+
+        self.assertEqual(coverage.ratio, 0.5)
+        self.assertFalse(coverage.fully_covered())
+        self.assertTrue(coverage.fully_covered(threshold=0.5))
+
+    def test_method_from_call_site(self):
+        """Test that only a method stated by the call counts, not method-like words nearby."""
+        covered = [
+            "fetch('/api/users');",
+            "fetch('/api/users', { method: 'DELETE', headers: h });",
+            "axios({ url: '/api/users', method: 'put' });",
+            "$.ajax({ url: '/api/users', type: 'POST' });",
+        ]
+        escalated = [
+            "const target = form(); fetch('/api/users', options);",
+            "const inputs = form(); fetch('/api/users', { headers: h });",
+            "const offset = 1; axios({ url: '/api/users' });",
+            "axios.get('/api/users'); axios.post('/api/users');",
+        ]
+
+        for chunk in covered:
+            with self.subTest(chunk=chunk):
+                self.assertTrue(measure_coverage(chunk, self.regex).fully_covered())
+        for chunk in escalated:
+            with self.subTest(chunk=chunk):
+                coverage = measure_coverage(chunk, self.regex)
+                self.assertGreater(coverage.url_literals, 0)
+                self.assertEqual(coverage.resolved_literals, 0)
+
+    def test_no_endpoint_literals(self):
+        """Test that chunks without endpoint literals are never considered covered."""
+        coverage = measure_coverage("const logo = '/static/logo.png';", self.regex)
+
+        self.assertIsNone(coverage.ratio)
+        self.assertFalse(coverage.fully_covered())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for the DiskCache class.
+
+These tests cover storing and reading entries, namespaces, persistence across
+connections, least-recently-used eviction, the running size total and
+buffered access times.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from jalapi.cache.disk_cache import DiskCache, content_digest, file_digest
+
+
+class TestDiskCache(unittest.TestCase):
+    """Tests for the DiskCache class."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache", "cache.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def stored_size(cache: DiskCache) -> int:
+        """Sum the sizes of the stored entries directly."""
+        return cache._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def test_round_trip_and_persistence(self):
+        """Test that entries survive reopening the database."""
+        cache = DiskCache(self.path)
+        cache.set_json("results", "a", {"endpoints": [{"path": "/api/x"}]})
+        cache.close()
+
+        cache = DiskCache(self.path)
+        self.assertEqual(cache.get_json("results", "a"), {"endpoints": [{"path": "/api/x"}]})
+        self.assertIsNone(cache.get_json("results", "b"))
+        cache.close()
+
+    def test_namespaces(self):
+        """Test that namespaces are independent and can be cleared separately."""
+        cache = DiskCache(self.path)
+        cache.set("results", "k", b"1")
+        cache.set("chunks", "k", b"2")
+
+        cache.clear("results")
+
+        self.assertIsNone(cache.get("results", "k"))
+        self.assertEqual(cache.get("chunks", "k"), b"2")
+        cache.close()
+
+    def test_lru_eviction(self):
+        """Test that the least recently read entries are evicted first."""
+        cache = DiskCache(self.path, max_bytes=2500)
+        values = {key: os.urandom(1000) for key in "abc"}
+
+        cache.set("results", "a", values["a"])
+        time.sleep(0.01)
+        cache.set("results", "b", values["b"])
+        time.sleep(0.01)
+        cache.get("results", "a")
+        time.sleep(0.01)
+        cache.set("results", "c", values["c"])
+
+        self.assertEqual(cache.get("results", "a"), values["a"])
+        self.assertIsNone(cache.get("results", "b"))
+        self.assertEqual(cache.get("results", "c"), values["c"])
+        cache.close()
+
+    def test_running_size(self):
+        """Test that the stored size follows writes, replacements, clears and reopening."""
+        cache = DiskCache(self.path)
+        cache.set("results", "a", os.urandom(1000))
+        cache.set("results", "a", os.urandom(500))
+        cache.set("chunks", "b", os.urandom(300))
+        cache.close()
+
+        cache = DiskCache(self.path)
+        self.assertEqual(cache.size(), self.stored_size(cache))
+        self.assertGreater(cache.size(), 800)
+        cache.clear("chunks")
+        self.assertEqual(cache.size(), self.stored_size(cache))
+        cache.clear()
+        self.assertEqual(cache.size(), 0)
+        cache.close()
+
+    def test_buffered_touches(self):
+        """Test that reads are written in batches, with the next write or on close."""
+        cache = DiskCache(self.path)
+        cache.set("results", "a", b"1")
+        written = cache._db.execute("SELECT accessed FROM entries").fetchone()[0]
+
+        time.sleep(0.01)
+        cache.get("results", "a")
+        self.assertEqual(cache._db.execute("SELECT accessed FROM entries").fetchone()[0], written)
+
+        cache.close()
+        cache = DiskCache(self.path)
+        self.assertGreater(cache._db.execute("SELECT accessed FROM entries").fetchone()[0], written)
+        cache.close()
+
+    def test_digests(self):
+        """Test that digests are stable and sensitive to every part."""
+        self.assertEqual(content_digest("a", {"x": 1, "y": 2}), content_digest("a", {"y": 2, "x": 1}))
+        self.assertNotEqual(content_digest("ab", "c"), content_digest("a", "bc"))
+
+        path = os.path.join(self.directory, "file.js")
+        with open(path, "wb") as f:
+            f.write(b"fetch('/api/x')")
+        self.assertEqual(file_digest(path, block_size=4), file_digest(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,7 +7,8 @@ at correctly identifying API endpoints and suggest improvements.
 
 import unittest
 import re
-from jalapi.core.endpoint_processor import EndpointProcessor
+import time
+from jalapi.core.endpoint_processor import API_PATTERNS, EndpointProcessor
 
 
 def improved_is_endpoint(url: str) -> bool:
@@ -89,6 +90,28 @@ def improved_is_endpoint(url: str) -> bool:
     return any(re.search(pattern, url, re.IGNORECASE) for pattern in api_patterns)
 
 
+def per_pattern_is_endpoint(url: str) -> bool:
+    """
+    The original uncached is_endpoint, running one search per pattern.
+    
+    Args:
+        url (str): The URL or path to check
+        
+    Returns:
+        bool: True if the URL likely represents an API endpoint, False otherwise
+    """
+    url = url.strip("`'\"")
+    return any(re.search(pattern, url, re.IGNORECASE) for pattern in API_PATTERNS)
+
+
+BENCHMARK_URLS = [
+    f"/{prefix}/{name}{i}"
+    for i in range(200)
+    for prefix in ("api", "static", "v2", "assets", "users", "img")
+    for name in ("items", "logo.svg", "profile", "token", "bundle.js")
+]
+
+
 class TestEndpointProcessor(unittest.TestCase):
     """Tests for the EndpointProcessor class with focus on endpoint detection."""
 
@@ -238,6 +261,63 @@ class TestEndpointProcessor(unittest.TestCase):
         print(f"\nSample output endpoints - Current: {current_detected}/{len(sample_endpoints)}, "
               f"Improved: {improved_detected}/{len(sample_endpoints)}")
 
+    def test_classifier_matches_per_pattern_search(self):
+        """Test that the combined classifier agrees with one search per pattern."""
+        for url in BENCHMARK_URLS + ["'/api/x'", "/Profile", "/profile/", "/ML-model", "/a/{id}"]:
+            with self.subTest(url=url):
+                self.assertEqual(EndpointProcessor.is_endpoint(url), per_pattern_is_endpoint(url))
+
+    def test_classify_many(self):
+        """Test batch classification keeps input order and repeats."""
+        urls = ["/api/users", "/about", "/api/users", "/oauth/token"]
+        self.assertEqual(EndpointProcessor.classify_many(urls), [True, False, True, True])
+
+    def test_normalize_path(self):
+        """Test path normalization of template variables, quotes and slashes."""
+        self.assertEqual(
+            EndpointProcessor.normalize_path("`/api//users/${userId}`"), "/api/users/{userId}"
+        )
+
+    def test_benchmark_is_endpoint(self):
+        """Micro-benchmark the cached classifier against per-pattern searches."""
+        start = time.perf_counter()
+        expected = [per_pattern_is_endpoint(url) for url in BENCHMARK_URLS]
+        per_pattern_time = time.perf_counter() - start
+
+        EndpointProcessor.is_endpoint.cache_clear()
+        start = time.perf_counter()
+        cold = EndpointProcessor.classify_many(BENCHMARK_URLS)
+        cold_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm = EndpointProcessor.classify_many(BENCHMARK_URLS)
+        warm_time = time.perf_counter() - start
+
+        self.assertEqual(cold, expected)
+        self.assertEqual(warm, expected)
+        print(f"\nis_endpoint on {len(BENCHMARK_URLS)} urls - Per-pattern: {per_pattern_time * 1000:.1f}ms, "
+              f"Combined: {cold_time * 1000:.1f}ms, Cached: {warm_time * 1000:.1f}ms")
+
+    def test_benchmark_normalize_path(self):
+        """Micro-benchmark the precompiled normalize_path against inline substitutions."""
+        urls = [f"`/api//items/${{id{i % 500}}}`" for i in range(5000)]
+
+        start = time.perf_counter()
+        expected = [
+            re.sub(r"/+", "/", re.sub(r"\${([^}]+)}", r"{\1}", url).strip("`'\""))
+            for url in urls
+        ]
+        inline_time = time.perf_counter() - start
+
+        EndpointProcessor.normalize_path.cache_clear()
+        start = time.perf_counter()
+        actual = [EndpointProcessor.normalize_path(url) for url in urls]
+        compiled_time = time.perf_counter() - start
+
+        self.assertEqual(actual, expected)
+        print(f"\nnormalize_path on {len(urls)} urls - Inline: {inline_time * 1000:.1f}ms, "
+              f"Precompiled: {compiled_time * 1000:.1f}ms")
+
     def test_recommendation(self):
         """Provide recommendations for improving the is_endpoint function."""
         print("\nRecommendations:")
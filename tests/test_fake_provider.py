@@ -0,0 +1,85 @@
+"""
+Unit tests for the offline fake LLM provider.
+
+These tests cover the endpoints it derives from prompts, its usage
+reports, and reproducible latency, failure and rate-limit injection.
+"""
+
+import time
+import unittest
+
+from jalapi.core.fake_provider import FakeProvider, FakeProviderError, FakeRateLimitError
+
+PROMPT = (
+    "CODE CONTEXT:\nMAIN CODE:const a = 1;\n"
+    "axios.post('/api/orders', body);\n"
+    "fetch(`https://api.example.com/v1/users`);\n"
+    "fetch('/api/orders');\n"
+    "First, CAREFULLY analyze this code."
+)
+
+
+class TestFakeProvider(unittest.TestCase):
+    """Tests for FakeProvider."""
+
+    def test_endpoints_from_prompt(self):
+        """Test that path and URL literals are reported with their method and line in the code."""
+        response = FakeProvider(latency_ms=0, jitter_ms=0).chat("model", "", PROMPT, "Find endpoints.")
+
+        found = [(ep["path"], ep["method"], ep["line_number"]) for ep in response["endpoints"]]
+        self.assertEqual(found, [
+            ("/api/orders", "POST", 2),
+            ("https://api.example.com/v1/users", "UNKNOWN", 3),
+            ("/api/orders", "UNKNOWN", 4),
+        ])
+        self.assertGreater(response["usage"]["input_tokens"], 0)
+        self.assertGreater(response["usage"]["output_tokens"], 0)
+
+    def test_cached_system_prompt(self):
+        """Test that a marked system prompt is written to the cache once, then read."""
+        provider = FakeProvider(latency_ms=0, jitter_ms=0)
+        system = [{"type": "text", "text": "Find endpoints. " * 50, "cache_control": {"type": "ephemeral"}}]
+
+        first = provider.chat("model", "", PROMPT, system)["usage"]
+        second = provider.chat("model", "", PROMPT, system)["usage"]
+
+        self.assertGreater(first["cache_creation_input_tokens"], 0)
+        self.assertEqual(first["cache_read_input_tokens"], 0)
+        self.assertEqual(second["cache_read_input_tokens"], first["cache_creation_input_tokens"])
+
+    def test_latency(self):
+        """Test that responses take the configured latency plus or minus jitter."""
+        provider = FakeProvider(latency_ms=30, jitter_ms=10)
+        for index in range(5):
+            start = time.perf_counter()
+            provider.chat("model", "", f"{PROMPT}{index}", "")
+            self.assertGreaterEqual(time.perf_counter() - start, 0.02)
+
+    def test_injected_failures(self):
+        """Test failure and rate-limit rates, and that they repeat for the same seed."""
+        self.assertRaises(FakeRateLimitError, FakeProvider(0, 0, rate_limit_rate=1.0).chat, "m", "", PROMPT, "")
+        self.assertRaises(FakeProviderError, FakeProvider(0, 0, error_rate=1.0).chat, "m", "", PROMPT, "")
+
+        def outcomes(seed):
+            provider = FakeProvider(0, 0, error_rate=0.3, rate_limit_rate=0.2, seed=seed)
+            results = []
+            for index in range(200):
+                try:
+                    provider.chat("m", "", f"{PROMPT}{index % 50}", "")
+                    results.append("ok")
+                except FakeRateLimitError as e:
+                    self.assertEqual(e.status_code, 429)
+                    results.append("rate_limit")
+                except FakeProviderError:
+                    results.append("error")
+            return results
+
+        first = outcomes(seed=1)
+        self.assertEqual(first, outcomes(seed=1))
+        self.assertNotEqual(first, outcomes(seed=2))
+        self.assertAlmostEqual(first.count("rate_limit") / 200, 0.2, delta=0.1)
+        self.assertAlmostEqual(first.count("error") / 200, 0.3, delta=0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
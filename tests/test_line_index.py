@@ -0,0 +1,72 @@
+"""
+Unit tests for the LineIndex class.
+
+These tests check offset to line lookups against plain newline counting and
+benchmark the two on a large input.
+"""
+
+import time
+import unittest
+
+from jalapi.utils.chunk import simple_chunk_code
+from jalapi.utils.line_index import LineIndex
+
+
+class TestLineIndex(unittest.TestCase):
+    """Tests for the LineIndex class."""
+
+    def test_matches_prefix_count(self):
+        """Test that line_of agrees with counting newlines in the prefix."""
+        content = "const a = 1;\n\nfunction b() {\n  return '/api/x';\n}\n"
+        index = LineIndex(content)
+
+        for offset in range(len(content) + 1):
+            with self.subTest(offset=offset):
+                self.assertEqual(index.line_of(offset), content[:offset].count("\n") + 1)
+
+    def test_line_col(self):
+        """Test line and column lookups and line starts."""
+        content = "ab\ncde\n\nf"
+        index = LineIndex(content)
+
+        self.assertEqual(index.line_count, 4)
+        self.assertEqual(index.line_col(0), (1, 1))
+        self.assertEqual(index.line_col(4), (2, 2))
+        self.assertEqual(index.line_col(8), (4, 1))
+        self.assertEqual(index.line_start(3), 7)
+        self.assertEqual(index.lines_in(0, 7), 2)
+
+    def test_bytes_content(self):
+        """Test that bytes content is indexed the same way as text."""
+        content = "x\ny\nz"
+        self.assertEqual(LineIndex(content.encode())._newlines, LineIndex(content)._newlines)
+
+    def test_chunk_start_lines(self):
+        """Test that chunk start lines match prefix counting."""
+        content = "".join(f"function f{i}() {{\n  return '/api/{i}';\n}}\n" for i in range(500))
+
+        for chunk, _, start_line in simple_chunk_code(content):
+            start = content.index(chunk)
+            self.assertEqual(start_line, content[:start].count("\n") + 1)
+
+    def test_benchmark(self):
+        """Benchmark indexed lookups against prefix counting."""
+        content = "fetch('/api/items').then(r => r.json());\n" * 50000
+        offsets = list(range(0, len(content), len(content) // 2000))
+
+        start = time.perf_counter()
+        expected = [content[:offset].count("\n") + 1 for offset in offsets]
+        count_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = LineIndex(content)
+        actual = [index.line_of(offset) for offset in offsets]
+        index_time = time.perf_counter() - start
+
+        self.assertEqual(actual, expected)
+        print(f"\nLine lookups for {len(offsets)} offsets in {len(content)} chars - "
+              f"Prefix count: {count_time * 1000:.1f}ms, Index: {index_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
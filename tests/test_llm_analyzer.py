@@ -0,0 +1,427 @@
+"""
+Unit tests for the LLMAnalyzer class.
+
+These tests use a stand-in client with injected latency to check that
+concurrent chunk dispatch keeps results deterministic, isolates failing
+chunks and speeds up with the concurrency limit, and that per-chunk
+responses are served from the cache.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from tests.helpers import HAS_PARLAI
+
+if HAS_PARLAI:
+    from jalapi.cache.disk_cache import DiskCache
+    from jalapi.core.cassette import CassetteMissError
+    from jalapi.core.llm_analyzer import LLMAnalyzer
+    from jalapi.core.regex_analyzer import RegexAnalyzer
+    from jalapi.models.models import VendorRegion
+
+CONFIG = {
+    "system_prompt": "Find endpoints.",
+    "analysis_prompt": "CODE CONTEXT:{context}\nMAIN CODE:{code_chunk}",
+}
+
+SAMPLE = "".join(
+    f"function load{i}() {{\n" + "  const x = 1;\n" * 60 + f"  return fetch('/api/item{i}');\n}}\n"
+    for i in range(24)
+)
+
+
+class ProviderError(Exception):
+    """Provider failure carrying an HTTP status code."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class InvalidRequestError(Exception):
+    """Rejection raised by a client that names the error type but no status code."""
+
+
+class SlowClient:
+    """Client that answers after a fixed delay with the paths found in the prompt."""
+
+    def __init__(self, latency: float, fail_on: str = None):
+        self.latency = latency
+        self.fail_on = fail_on
+        self.systems = []
+
+    def chat(self, model, context, prompt, system):
+        time.sleep(self.latency)
+        self.systems.append(system)
+        if self.fail_on and self.fail_on in prompt:
+            raise RuntimeError("provider error")
+        code = prompt.split("MAIN CODE:", 1)[1]
+        return {
+            "endpoints": [
+                {"path": m.group(1), "line_number": code[:m.start()].count("\n") + 1}
+                for m in re.finditer(r"'(/api/item\d+)'", code)
+            ]
+        }
+
+
+@unittest.skipUnless(HAS_PARLAI, "voidwire_parlai is not installed")
+class TestLLMAnalyzer(unittest.TestCase):
+    """Tests for concurrent chunk dispatch in LLMAnalyzer."""
+
+    def make_analyzer(self, client, regex=None, cache=None):
+        with mock.patch("voidwire_parlai.create_provider", return_value=client):
+            return LLMAnalyzer("anthropic", "test-model", cache=cache, regex=regex)
+
+    def make_cache(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cache = DiskCache(os.path.join(directory, "cache.db"))
+        self.addCleanup(cache.close)
+        return cache
+
+    def run_analysis(self, client, concurrency):
+        config = {**CONFIG, "llm": {"concurrency": concurrency}}
+        return self.make_analyzer(client).analyze_endpoints(SAMPLE, config)
+
+    def test_deterministic_order(self):
+        """Test that concurrent dispatch returns the same endpoints in the same order."""
+        sequential = self.run_analysis(SlowClient(0.0), concurrency=1)
+        concurrent = self.run_analysis(SlowClient(0.0), concurrency=8)
+
+        self.assertEqual(concurrent, sequential)
+        for endpoint in concurrent:
+            expected_line = SAMPLE[:SAMPLE.index(f"'{endpoint.path}'")].count("\n") + 1
+            self.assertEqual(endpoint.line_number, expected_line)
+
+    def test_failing_chunk_is_isolated(self):
+        """Test that one failing chunk does not cancel the others."""
+        endpoints = self.run_analysis(SlowClient(0.0, fail_on="/api/item5'"), concurrency=4)
+        paths = {endpoint.path for endpoint in endpoints}
+
+        self.assertNotIn("/api/item5", paths)
+        self.assertIn("/api/item23", paths)
+
+    def test_overlap_findings_reported_once(self):
+        """Test that endpoints in the overlap of two chunks are kept from one chunk only."""
+        minified = "".join(f"function f{i}(){{return fetch('/api/item{i}')}};" + "x=1;" * 100 for i in range(24))
+        analyzer = self.make_analyzer(SlowClient(0.0))
+
+        for code in (SAMPLE, minified, minified.encode()):
+            with self.subTest(code=code[:20]):
+                endpoints = analyzer.analyze_endpoints(code, CONFIG)
+
+                self.assertEqual(sorted(endpoint.path for endpoint in endpoints),
+                                 sorted(f"/api/item{i}" for i in range(24)))
+                self.assertGreater(analyzer.run_stats["overlap_dropped_findings"], 0)
+
+    def test_chunk_cache(self):
+        """Test that a second run over the same code is answered from the chunk cache."""
+        cache = self.make_cache()
+        first = self.make_analyzer(SlowClient(0.0), cache=cache)
+        expected = first.analyze_endpoints(SAMPLE, CONFIG)
+        requests = first.run_stats["prompt_cache"]["requests"]
+        self.assertEqual(first.cache_stats, {"llm_chunk_hits": 0, "llm_chunk_misses": requests})
+
+        client = SlowClient(0.0)
+        second = self.make_analyzer(client, cache=cache)
+
+        self.assertEqual(second.analyze_endpoints(SAMPLE, CONFIG), expected)
+        self.assertEqual(second.cache_stats, {"llm_chunk_hits": requests, "llm_chunk_misses": 0})
+        self.assertEqual(client.systems, [])
+        self.assertEqual(second.usage_stats["requests"], 0)
+
+    def test_chunk_cache_remaps_lines(self):
+        """Test that a cached chunk seen at another line reports lines relative to its new start."""
+        client = SlowClient(0.0)
+        analyzer = self.make_analyzer(client, cache=self.make_cache())
+        # An empty run resets the statistics the chunk requests below add to
+        analyzer.analyze_endpoints("", CONFIG)
+        chunk = "const a = 1;\nfetch('/api/item1');\n"
+        prompt = CONFIG["analysis_prompt"].format(context="", code_chunk=chunk)
+
+        first = analyzer._analyze_chunk(chunk, 1, CONFIG["system_prompt"], prompt)
+        moved = analyzer._analyze_chunk(chunk, 101, CONFIG["system_prompt"], prompt)
+
+        self.assertEqual(len(client.systems), 1)
+        self.assertEqual(analyzer.cache_stats, {"llm_chunk_hits": 1, "llm_chunk_misses": 1})
+        self.assertEqual([endpoint.line_number for endpoint in first], [2])
+        self.assertEqual([endpoint.line_number for endpoint in moved], [102])
+
+    def test_failed_chunks_not_cached(self):
+        """Test that a chunk whose request failed is sent again on the next run."""
+        cache = self.make_cache()
+        self.make_analyzer(SlowClient(0.0, fail_on="/api/item5'"), cache=cache).analyze_endpoints(SAMPLE, CONFIG)
+
+        client = SlowClient(0.0)
+        analyzer = self.make_analyzer(client, cache=cache)
+        endpoints = analyzer.analyze_endpoints(SAMPLE, CONFIG)
+
+        self.assertIn("/api/item5", {endpoint.path for endpoint in endpoints})
+        self.assertGreaterEqual(analyzer.cache_stats["llm_chunk_misses"], 1)
+        self.assertEqual(len(client.systems), analyzer.cache_stats["llm_chunk_misses"])
+        self.assertGreater(analyzer.cache_stats["llm_chunk_hits"], 0)
+
+    def test_triage_skips_irrelevant_chunks(self):
+        """Test that triage skips chunks without API signals and reports the savings."""
+        filler = "function render(e){\n" + "  e = e.map(function(t){ return t + 1; });\n" * 200 + "}\n"
+        config = {**CONFIG, "llm": {"triage": {"enabled": True}}}
+        analyzer = self.make_analyzer(SlowClient(0.0))
+
+        endpoints = analyzer.analyze_endpoints(filler + SAMPLE, config)
+
+        self.assertEqual(len({endpoint.path for endpoint in endpoints}), 24)
+        self.assertGreater(analyzer.run_stats["skipped_chunks"], 0)
+        self.assertGreater(analyzer.run_stats["skipped_tokens"], 0)
+
+    def test_vendor_regions_skipped(self):
+        """Test that code inside vendor regions is never sent and the rest is analyzed."""
+        half = SAMPLE.index("function load12(")
+        client = SlowClient(0.0)
+        analyzer = self.make_analyzer(client)
+
+        endpoints = analyzer.analyze_endpoints(SAMPLE, CONFIG, vendor_regions=[VendorRegion("lib", 0, half, 10)])
+
+        self.assertEqual({endpoint.path for endpoint in endpoints}, {f"/api/item{i}" for i in range(12, 24)})
+        self.assertEqual(analyzer.run_stats["vendor"], {"excluded_bytes": half, "excluded_tokens": half // 4})
+
+    def test_partial_vendor_chunk(self):
+        """Test that a vendor region inside a chunk is cut out and the code around it is sent."""
+        start, end = SAMPLE.index("function load3("), SAMPLE.index("function load4(")
+        lines = []
+
+        class PromptClient(SlowClient):
+            def chat(self, model, context, prompt, system):
+                lines.append(prompt)
+                return super().chat(model, context, prompt, system)
+
+        analyzer = self.make_analyzer(PromptClient(0.0))
+        endpoints = analyzer.analyze_endpoints(SAMPLE, CONFIG, vendor_regions=[VendorRegion("lib", start, end, 5)])
+
+        found = {endpoint.path: endpoint.line_number for endpoint in endpoints}
+        self.assertNotIn("/api/item3", found)
+        # The region is a third of a chunk, yet none of it is sent
+        self.assertLess(end - start, 3000 / 2)
+        self.assertFalse(any("function load3(" in prompt for prompt in lines))
+        for path in ("/api/item2", "/api/item4"):
+            self.assertEqual(found[path], SAMPLE[:SAMPLE.index(f"'{path}'")].count("\n") + 1)
+
+    def test_trivial_gaps_dropped(self):
+        """Test that punctuation between two vendor regions is not sent on its own."""
+        code = "var a = lib1();\n;\n" + "var b = lib2();\n" + "fetch('/api/item1');\n"
+        regions = [VendorRegion("one", 0, 15, 3), VendorRegion("two", 18, 34, 3)]
+        client = SlowClient(0.0)
+
+        endpoints = self.make_analyzer(client).analyze_endpoints(code, CONFIG, vendor_regions=regions)
+
+        self.assertEqual(len(client.systems), 1)
+        self.assertEqual([(endpoint.path, endpoint.line_number) for endpoint in endpoints], [("/api/item1", 4)])
+
+    def test_coverage_skips_resolved_chunks(self):
+        """Test that chunks fully resolved by regex are skipped and dynamic ones are not."""
+        static = "function a() {\n  return axios.get('/api/static');\n}\n" * 3
+        dynamic = "function b() {\n  return axios.get(`/api/dynamic/${id}`);\n}\n"
+        config = {**CONFIG, "llm": {"coverage": {"enabled": True}}}
+        analyzer = self.make_analyzer(SlowClient(0.0), regex=RegexAnalyzer())
+
+        analyzer.analyze_endpoints(static, config)
+        self.assertEqual(analyzer.run_stats["coverage"]["skipped_chunks"], 1)
+
+        analyzer.analyze_endpoints(dynamic, config)
+        self.assertEqual(analyzer.run_stats["coverage"]["skipped_chunks"], 0)
+        self.assertEqual(analyzer.run_stats["coverage"]["dynamic_chunks"], 1)
+
+    def test_prompt_cache_prefix(self):
+        """Test that the config context moves into one marked system prompt shared by all chunks."""
+        code = "const CONFIG = { base: '/api/base' };\n" + SAMPLE
+        config = {**CONFIG, "llm": {"prompt_cache": {"enabled": True, "min_tokens": 0}}}
+        client = SlowClient(0.0)
+        analyzer = self.make_analyzer(client)
+
+        endpoints = analyzer.analyze_endpoints(code, config)
+
+        self.assertEqual(len({endpoint.path for endpoint in endpoints}), 24)
+        self.assertEqual(len({str(system) for system in client.systems}), 1)
+        block = client.systems[0][0]
+        self.assertEqual(block["cache_control"], {"type": "ephemeral"})
+        self.assertIn("IMPORTANT CONFIGURATION", block["text"])
+
+        stats = analyzer.run_stats["prompt_cache"]
+        self.assertEqual(stats["requests"], len(client.systems))
+        self.assertGreater(stats["cached_input_tokens"], 0)
+
+    def test_usage_and_cost(self):
+        """Test that reported usage is recorded per chunk and summed with its cost."""
+
+        class UsageClient(SlowClient):
+            def chat(self, model, context, prompt, system):
+                response = super().chat(model, context, prompt, system)
+                response["usage"] = {
+                    "input_tokens": 1000,
+                    "cache_creation_input_tokens": 0,
+                    "cache_read_input_tokens": 500,
+                    "output_tokens": 100,
+                }
+                return response
+
+        prices = {"input": 3.0, "output": 15.0, "cache_read": 0.3}
+        config = {**CONFIG, "llm": {"pricing": {"models": {"test-model": prices}}}}
+        analyzer = self.make_analyzer(UsageClient(0.0))
+
+        analyzer.analyze_endpoints(SAMPLE, config)
+
+        usage = analyzer.usage_stats
+        requests = len(analyzer.chunk_usage)
+        self.assertGreater(requests, 1)
+        self.assertEqual((usage["requests"], usage["estimated_requests"], usage["unpriced_requests"]), (requests, 0, 0))
+        self.assertEqual((usage["input_tokens"], usage["output_tokens"]), (1000 * requests, 100 * requests))
+        self.assertAlmostEqual(usage["cost_usd"], requests * (3000 + 150 + 1500) / 1e6)
+        first = min(analyzer.chunk_usage, key=lambda chunk: chunk["start_line"])
+        self.assertEqual(first["start_line"], 1)
+        self.assertGreater(first["end_line"], first["start_line"])
+
+    def test_estimated_usage(self):
+        """Test that usage is estimated without provider counts, and unknown models are unpriced."""
+        analyzer = self.make_analyzer(SlowClient(0.0))
+        analyzer.analyze_endpoints(SAMPLE, CONFIG)
+
+        usage = analyzer.usage_stats
+        self.assertEqual(usage["estimated_requests"], usage["requests"])
+        self.assertEqual(usage["unpriced_requests"], usage["requests"])
+        self.assertGreater(usage["output_tokens"], 0)
+        self.assertEqual(usage["cost_usd"], 0.0)
+
+    def test_fake_provider(self):
+        """Test that the fake provider selected by name answers every chunk offline."""
+        analyzer = LLMAnalyzer("fake", "test-model", provider_options={"latency_ms": 0, "jitter_ms": 0})
+
+        endpoints = analyzer.analyze_endpoints(SAMPLE, CONFIG)
+
+        self.assertEqual({endpoint.path for endpoint in endpoints}, {f"/api/item{i}" for i in range(24)})
+        self.assertEqual(analyzer.usage_stats["estimated_requests"], 0)
+
+    def test_cassette_record_and_replay(self):
+        """Test that a recorded run replays without the provider and fails on new prompts."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "llm.cassette.gz")
+        config = {**CONFIG, "llm": {"prompt_cache": {"enabled": True}}}
+
+        with mock.patch("voidwire_parlai.create_provider", return_value=SlowClient(0.0)):
+            recorder = LLMAnalyzer("anthropic", "test-model", cassette={"mode": "record", "path": path})
+        recorded = recorder.analyze_endpoints(SAMPLE, config)
+
+        with mock.patch("voidwire_parlai.create_provider") as create_provider:
+            replay = LLMAnalyzer("anthropic", "test-model", cassette={"mode": "replay", "path": path})
+        create_provider.assert_not_called()
+        self.assertEqual(replay.analyze_endpoints(SAMPLE, config), recorded)
+
+        with self.assertRaises(CassetteMissError):
+            replay.analyze_endpoints(SAMPLE.replace("item7", "item99"), config)
+
+    def test_prompt_cache_mark_fallback(self):
+        """Test that a client rejecting structured system prompts gets plain text instead."""
+
+        class TextOnlyClient(SlowClient):
+            def chat(self, model, context, prompt, system):
+                return super().chat(model, context, prompt, "" + system)
+
+        config = {**CONFIG, "llm": {"prompt_cache": {"enabled": True}}}
+        client = TextOnlyClient(0.0)
+
+        endpoints = self.make_analyzer(client).analyze_endpoints(SAMPLE, config)
+
+        self.assertEqual(len({endpoint.path for endpoint in endpoints}), 24)
+        self.assertTrue(all(isinstance(system, str) for system in client.systems))
+
+    def test_prompt_cache_mark_rejected(self):
+        """Test that a rejected first marked request falls back to plain text."""
+
+        class StrictClient(SlowClient):
+            def chat(self, model, context, prompt, system):
+                if not isinstance(system, str):
+                    raise InvalidRequestError("invalid_request_error: system: Input should be a valid string")
+                return super().chat(model, context, prompt, system)
+
+        class ErrorPayloadClient(SlowClient):
+            def chat(self, model, context, prompt, system):
+                if not isinstance(system, str):
+                    return {"error": {"type": "invalid_request_error", "status": 400}}
+                return super().chat(model, context, prompt, system)
+
+        config = {**CONFIG, "llm": {"concurrency": 1, "prompt_cache": {"enabled": True}}}
+        for client in (StrictClient(0.0), ErrorPayloadClient(0.0)):
+            with self.subTest(client=type(client).__name__):
+                analyzer = self.make_analyzer(client)
+                with self.assertLogs("jalapi", level="WARNING"):
+                    endpoints = analyzer.analyze_endpoints(SAMPLE, config)
+
+                self.assertEqual(len({endpoint.path for endpoint in endpoints}), 24)
+                self.assertTrue(all(isinstance(system, str) for system in client.systems))
+
+                # Later runs of the same analyzer no longer try marking
+                client.systems.clear()
+                analyzer.analyze_endpoints(SAMPLE, config)
+                self.assertTrue(all(isinstance(system, str) for system in client.systems))
+
+    def test_prompt_cache_mark_transient_failure(self):
+        """Test that a transient failure of the first marked request keeps marking on."""
+
+        class BusyOnceClient(SlowClient):
+            def chat(self, model, context, prompt, system):
+                if not self.systems:
+                    self.systems.append(system)
+                    raise ProviderError("overloaded", status_code=529)
+                return super().chat(model, context, prompt, system)
+
+        client = BusyOnceClient(0.0)
+        config = {**CONFIG, "llm": {"concurrency": 1, "prompt_cache": {"enabled": True}}}
+        endpoints = self.make_analyzer(client).analyze_endpoints(SAMPLE, config)
+
+        # The failed chunk is lost like any other, and every request stays marked
+        paths = {endpoint.path for endpoint in endpoints}
+        self.assertNotIn("/api/item0", paths)
+        self.assertIn("/api/item23", paths)
+        self.assertFalse(any(isinstance(system, str) for system in client.systems))
+
+    def test_prompt_cache_mark_probed_once(self):
+        """Test that concurrent first requests wait for one marked request to be rejected."""
+
+        class StrictClient(SlowClient):
+            def chat(self, model, context, prompt, system):
+                if not isinstance(system, str):
+                    time.sleep(self.latency)
+                    self.systems.append(system)
+                    raise ProviderError("system must be a string", status_code=400)
+                return super().chat(model, context, prompt, system)
+
+        client = StrictClient(0.01)
+        config = {**CONFIG, "llm": {"concurrency": 8, "prompt_cache": {"enabled": True}}}
+        with self.assertLogs("jalapi", level="WARNING") as logs:
+            endpoints = self.make_analyzer(client).analyze_endpoints(SAMPLE, config)
+
+        self.assertEqual(len({endpoint.path for endpoint in endpoints}), 24)
+        self.assertEqual(sum(not isinstance(system, str) for system in client.systems), 1)
+        self.assertEqual(len(logs.records), 1)
+
+    def test_speedup(self):
+        """Test near-linear speedup up to the concurrency limit."""
+        start = time.perf_counter()
+        self.run_analysis(SlowClient(0.05), concurrency=1)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.run_analysis(SlowClient(0.05), concurrency=8)
+        concurrent_time = time.perf_counter() - start
+
+        print(f"\nLLM dispatch with 50ms latency - Sequential: {sequential_time * 1000:.0f}ms, "
+              f"Concurrency 8: {concurrent_time * 1000:.0f}ms")
+        self.assertGreater(sequential_time / concurrent_time, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Unit tests for the LiteralPrefilter class.
+
+These tests check that every literal occurrence is reported, including
+overlapping ones, mixed case and occurrences crossing block boundaries.
+"""
+
+import unittest
+
+from jalapi.utils.prefilter import LiteralPrefilter
+
+
+def naive_find(content: str, literals) -> list:
+    """Find literal offsets by checking every position."""
+    lowered = content.lower()
+    return [
+        i for i in range(len(content))
+        if any(lowered.startswith(literal, i) for literal in literals)
+    ]
+
+
+class TestLiteralPrefilter(unittest.TestCase):
+    """Tests for the LiteralPrefilter class."""
+
+    def test_finds_all_occurrences(self):
+        """Test that mixed-case and overlapping occurrences are all found."""
+        literals = ["/api/", "/v", "i/v", "url"]
+        content = "x = '/API/v1/users'; y = {URL: '/v2/x'}; u = '/api//api/';"
+
+        prefilter = LiteralPrefilter(literals)
+
+        self.assertEqual(list(prefilter.find(content)), naive_find(content, literals))
+
+    def test_block_boundaries(self):
+        """Test that literals crossing a block boundary are found once."""
+        literals = ["fetch", "axios"]
+        content = "..fetch(x);axios.get(y);" * 50
+
+        prefilter = LiteralPrefilter(literals)
+        prefilter.BLOCK_SIZE = 7
+
+        self.assertEqual(list(prefilter.find(content)), naive_find(content, literals))
+
+    def test_bytes_and_non_ascii(self):
+        """Test bytes input and text whose lowercase form changes length."""
+        prefilter = LiteralPrefilter(["path"])
+        content = "İ Path: '/x'; path"
+
+        self.assertEqual(list(prefilter.find(content)), [2, 14])
+        self.assertEqual(list(prefilter.find(b"PATH path")), [0, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
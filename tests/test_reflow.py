@@ -0,0 +1,114 @@
+"""
+Unit tests for minified code detection and reflow.
+
+These tests check that reflow only adds line breaks, never inside strings,
+regex literals, template literals or comments, and that minified files are
+told apart from readable ones by line lengths alone.
+"""
+
+import time
+import unittest
+
+from jalapi.utils.reflow import end_of_expression, is_minified, reflow
+from tests.helpers import load_sample
+
+
+class TestMinificationDetection(unittest.TestCase):
+    """Tests for is_minified."""
+
+    def test_samples(self):
+        """Test that the minified sample is detected and the readable ones are not."""
+        self.assertTrue(is_minified(load_sample("api-client.min.js")))
+        self.assertFalse(is_minified(load_sample("enterpriseintegration.js")))
+        self.assertFalse(is_minified(load_sample("analytic_service.js")))
+
+    def test_many_long_lines(self):
+        """Test that a bundle of several very long lines counts as minified."""
+        line = "a=1;" * 2500
+        self.assertTrue(is_minified("\n".join([line] * 20)))
+
+    def test_few_long_lines(self):
+        """Test that a readable file with an occasional long line does not."""
+        code = "const x = 1;\n" * 2000 + "const data = '" + "x" * 1000 + "';\n"
+        self.assertFalse(is_minified(code))
+
+
+class TestReflow(unittest.TestCase):
+    """Tests for reflow."""
+
+    def assertReflowed(self, code: str, expected: str):
+        actual = reflow(code)
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual.replace("\n", ""), code.replace("\n", ""))
+
+    def test_statements_and_braces(self):
+        """Test that statements and blocks are put on their own lines."""
+        self.assertReflowed(
+            "function f(a){if(a){return 1}else{g()}}f(1);",
+            "function f(a){\nif(a){\nreturn 1\n}\nelse{\ng()\n}\n}\nf(1);",
+        )
+
+    def test_for_loop_and_continuations(self):
+        """Test that for headers, empty braces and continued expressions are not split."""
+        self.assertReflowed(
+            "for(i=0;i<n;i++){a()}x={},y=[{a:1}];",
+            "for(i=0;i<n;i++){\na()\n}\nx={},y=[{\na:1\n}];",
+        )
+
+    def test_literals_untouched(self):
+        """Test that strings, regex literals, templates and comments are left alone."""
+        cases = [
+            "s='a;{b}';",
+            't="c;}";',
+            "r=/a;b{/g.test(s);",
+            "return/x;}/.test(y)",
+            "t=`a;{${ {b:1}.b };}`;",
+            "/* a;{b} */",
+            "// a;{b}",
+        ]
+        for code in cases:
+            with self.subTest(code=code):
+                self.assertEqual(reflow(code), code)
+
+    def test_division_is_not_a_regex(self):
+        """Test that divisions are not mistaken for regex literals."""
+        self.assertReflowed("a=b/2;c=(d)/e;f=g[0]/h;", "a=b/2;\nc=(d)/e;\nf=g[0]/h;")
+
+    def test_sample_roundtrip(self):
+        """Test that reflowing the minified sample only adds line breaks."""
+        code = load_sample("api-client.min.js")
+        reflowed = reflow(code)
+
+        self.assertEqual(reflowed.replace("\n", ""), code.replace("\n", ""))
+        self.assertGreater(reflowed.count("\n"), 100)
+        self.assertFalse(is_minified(reflowed))
+
+    def test_benchmark(self):
+        """Benchmark reflow on a multi-megabyte bundle."""
+        code = load_sample("api-client.min.js") * 200
+
+        start = time.perf_counter()
+        reflow(code)
+        elapsed = time.perf_counter() - start
+
+        print(f"\nReflow of {len(code)} chars: {elapsed * 1000:.0f}ms")
+
+
+class TestEndOfExpression(unittest.TestCase):
+    """Tests for end_of_expression."""
+
+    def test_top_level_separators(self):
+        """Test that only separators outside the expression's own brackets end it."""
+        code = "f(a,[b,c],{d:1}),next"
+        self.assertEqual(end_of_expression(code, 0), code.index(",next"))
+        self.assertEqual(end_of_expression("x=>{y;z}}", 0), 8)
+        self.assertEqual(end_of_expression("a+b", 0), 3)
+
+    def test_literals_skipped(self):
+        """Test that brackets and commas inside literals and comments are ignored."""
+        code = "function(){return '}',/,}/g,`${'}'},`,\"]\"/*,}*/}//,\n,rest"
+        self.assertEqual(end_of_expression(code, 0), code.index(",rest"))
+
+
+if __name__ == "__main__":
+    unittest.main()
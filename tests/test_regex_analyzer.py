@@ -0,0 +1,124 @@
+"""
+Unit tests for the RegexAnalyzer class.
+
+These tests check that the single-pass rule scanner finds exactly what the
+original one-scan-per-pattern loop found, and benchmark the two against each other.
+"""
+
+import re
+import time
+import unittest
+from typing import List
+
+from jalapi.core.endpoint_processor import EndpointProcessor
+from jalapi.core.regex_analyzer import RegexAnalyzer
+from jalapi.models.models import Endpoint
+from tests.helpers import load_samples
+
+
+def per_pattern_discover(analyzer: RegexAnalyzer, js_content: str) -> List[Endpoint]:
+    """
+    The original discovery loop, scanning the content once per pattern.
+
+    Args:
+        analyzer (RegexAnalyzer): Analyzer providing the patterns and helpers
+        js_content (str): JavaScript code content to analyze
+
+    Returns:
+        List[Endpoint]: List of discovered API endpoints
+    """
+    endpoints = []
+    seen_paths = set()
+
+    for rule, pattern in analyzer.patterns:
+        for match in re.finditer(pattern, js_content, re.IGNORECASE):
+            path = None
+            for group in match.groups():
+                if group and ("/" in group or "api" in group.lower()):
+                    path = group
+                    break
+
+            if not path:
+                continue
+
+            path = EndpointProcessor.normalize_path(path)
+            if not EndpointProcessor.is_endpoint(path) or path in seen_paths:
+                continue
+            seen_paths.add(path)
+
+            context = analyzer._get_context(js_content, match.start(), 200)
+            method = "UNKNOWN"
+            method_match = re.search(r"(get|post|put|delete|patch)", context, re.IGNORECASE)
+            if method_match:
+                method = method_match.group(1).upper()
+
+            endpoints.append(
+                Endpoint(
+                    path=path,
+                    method=method,
+                    auth=analyzer._detect_auth(context),
+                    confidence=0.7,
+                    detector="regex",
+                    line_number=js_content[:match.start()].count("\n") + 1,
+                    rule=rule,
+                )
+            )
+
+    return endpoints
+
+
+class TestRegexAnalyzer(unittest.TestCase):
+    """Tests for the RegexAnalyzer class with focus on the combined scanner."""
+
+    def setUp(self):
+        self.analyzer = RegexAnalyzer()
+
+    def test_matches_per_pattern_loop(self):
+        """Test that the combined scanner returns the same endpoints as the old loop."""
+        content = load_samples()
+
+        expected = per_pattern_discover(self.analyzer, content)
+        actual = self.analyzer.discover_endpoints(content)
+
+        self.assertTrue(expected, "Samples should contain regex-detectable endpoints")
+        self.assertEqual(actual, expected)
+
+    def test_reports_rule(self):
+        """Test that each endpoint records the rule that fired."""
+        content = "axios.get('/api/users');\n$.ajax({url: '/v1/orders'});\nfetch(`/api/items/${id}`);"
+
+        rules = {ep.path: ep.rule for ep in self.analyzer.discover_endpoints(content)}
+
+        self.assertEqual(rules["/api/users"], "axios_method")
+        self.assertEqual(rules["/v1/orders"], "jquery_ajax")
+        self.assertEqual(rules["/api/items/{id}"], "fetch")
+
+    def test_overlapping_rules(self):
+        """Test that matches from different rules may overlap, as with separate scans."""
+        content = "const a = {url: '/login'};\nconst b = '/login' + fetch('/v2/data/export');"
+
+        expected = per_pattern_discover(self.analyzer, content)
+        actual = self.analyzer.discover_endpoints(content)
+
+        self.assertEqual(actual, expected)
+
+    def test_benchmark(self):
+        """Benchmark the combined scanner against the per-pattern loop."""
+        filler = "function a(b,c){return b.map(function(d){return d+c*2})};\n" * 200
+        content = (load_samples() + filler) * 20
+
+        start = time.perf_counter()
+        expected = per_pattern_discover(self.analyzer, content)
+        per_pattern_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = self.analyzer.discover_endpoints(content)
+        combined_time = time.perf_counter() - start
+
+        self.assertEqual(actual, expected)
+        print(f"\nRegex scan of {len(content)} chars - Per-pattern: {per_pattern_time * 1000:.1f}ms, "
+              f"Combined: {combined_time * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    unittest.main()
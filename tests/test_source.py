@@ -0,0 +1,80 @@
+"""
+Unit tests for memory-mapped source loading.
+
+These tests check encoding detection and that scanning a mapped file as bytes
+finds the same endpoints and chunks as scanning the decoded text.
+"""
+
+import os
+import tempfile
+import unittest
+
+from jalapi.core.regex_analyzer import RegexAnalyzer
+from jalapi.utils.chunk import simple_chunk_code
+from jalapi.utils.source import MappedSource, detect_encoding
+
+SAMPLE = (
+    "// café résumé\n"
+    "const CONFIG = { base: '/api/v1' };\n"
+    "axios.get('/api/users');\n"
+    "$.ajax({url: '/v2/orders/é'});\n"
+    "function load() {\n  return fetch(`/api/items/${id}`);\n}\n"
+) * 40
+
+
+class TestMappedSource(unittest.TestCase):
+    """Tests for MappedSource and bytes-level scanning."""
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".js")
+        with os.fdopen(handle, "wb") as f:
+            f.write(SAMPLE.encode("utf-8"))
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_detect_encoding(self):
+        """Test UTF-8 detection, including a character cut off by the sample."""
+        self.assertEqual(detect_encoding("é".encode("utf-8")[:1]), "utf-8")
+        self.assertEqual(detect_encoding(b"caf\xe9 = 1"), "latin-1")
+
+    def test_decode_slices(self):
+        """Test that slices of the mapping decode with the detected encoding."""
+        with MappedSource(self.path) as source:
+            self.assertEqual(source.encoding, "utf-8")
+            self.assertEqual(len(source), len(SAMPLE.encode("utf-8")))
+            self.assertEqual(source.decode(0, len("// café résumé".encode())), "// café résumé")
+
+    def test_regex_over_mapping(self):
+        """Test that the regex stage finds the same endpoints in bytes and text."""
+        analyzer = RegexAnalyzer()
+        expected = analyzer.discover_endpoints(SAMPLE)
+
+        with MappedSource(self.path) as source:
+            actual = analyzer.discover_endpoints(source.data, encoding=source.encoding)
+
+        self.assertEqual(actual, expected)
+
+    def test_chunks_over_mapping(self):
+        """Test that chunks of a mapped ASCII file match chunks of its text."""
+        content = SAMPLE.replace("é", "e")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+        with MappedSource(self.path) as source:
+            actual = list(simple_chunk_code(source.data, encoding=source.encoding))
+
+        self.assertEqual(actual, list(simple_chunk_code(content)))
+
+    def test_empty_file(self):
+        """Test that empty files can be opened."""
+        with open(self.path, "wb"):
+            pass
+
+        with MappedSource(self.path) as source:
+            self.assertEqual(len(source), 0)
+            self.assertEqual(RegexAnalyzer().discover_endpoints(source.data), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
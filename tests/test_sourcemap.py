@@ -0,0 +1,89 @@
+"""
+Unit tests for source map loading.
+
+These tests cover finding inline, referenced and adjacent source maps, and
+extracting the original sources embedded in them.
+"""
+
+import base64
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from jalapi.utils.sourcemap import load_source_map, original_sources, source_map_path
+
+SOURCE_MAP = {
+    "version": 3,
+    "sources": ["src/api.js", "src/app.js"],
+    "sourcesContent": ["export const get = () => fetch('/api/users');\n", "import './api';\n"],
+    "mappings": "AAAA",
+}
+
+
+class TestSourceMaps(unittest.TestCase):
+    """Tests for load_source_map, source_map_path and original_sources."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.bundle = os.path.join(self.directory, "bundle.js")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, path: str, text: str) -> None:
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_inline_data_url(self):
+        """Test that a base64 data URL in the closing comment is decoded."""
+        payload = base64.b64encode(json.dumps(SOURCE_MAP).encode()).decode()
+        self.write(self.bundle, f"var a=1;\n//# sourceMappingURL=data:application/json;base64,{payload}\n")
+
+        self.assertEqual(load_source_map(self.bundle), SOURCE_MAP)
+        self.assertIsNone(source_map_path(self.bundle))
+
+    def test_referenced_and_adjacent_files(self):
+        """Test that a referenced map file is used, and <file>.map without a comment."""
+        os.mkdir(os.path.join(self.directory, "maps"))
+        map_path = os.path.join(self.directory, "maps", "bundle.js.map")
+        self.write(map_path, json.dumps(SOURCE_MAP))
+        self.write(self.bundle, "var a=1;\n/*# sourceMappingURL=maps/bundle.js.map */")
+        self.assertEqual(source_map_path(self.bundle), map_path)
+        self.assertEqual(load_source_map(self.bundle), SOURCE_MAP)
+
+        self.write(self.bundle, "var a=1;\n")
+        self.write(self.bundle + ".map", json.dumps(SOURCE_MAP))
+        self.assertEqual(source_map_path(self.bundle), self.bundle + ".map")
+        self.assertEqual(load_source_map(self.bundle), SOURCE_MAP)
+
+    def test_missing_or_unusable(self):
+        """Test that remote, missing, mentioned-only and malformed maps are ignored."""
+        self.write(self.bundle, "var a=1;\n//# sourceMappingURL=https://cdn.example.com/bundle.js.map\n")
+        self.assertIsNone(load_source_map(self.bundle))
+
+        self.write(self.bundle, "var c='//# sourceMappingURL=other.js.map';\nvar a=1;\n")
+        self.write(os.path.join(self.directory, "other.js.map"), json.dumps(SOURCE_MAP))
+        self.assertIsNone(load_source_map(self.bundle))
+
+        payload = base64.b64encode(b"not json").decode()
+        self.write(self.bundle, f"var a=1;\n//# sourceMappingURL=data:application/json;base64,{payload}\n")
+        self.assertIsNone(load_source_map(self.bundle))
+
+        self.write(self.bundle, "")
+        self.assertIsNone(load_source_map(self.bundle))
+
+    def test_original_sources(self):
+        """Test that sources need embedded content and are resolved against sourceRoot."""
+        self.assertEqual(
+            original_sources({**SOURCE_MAP, "sourceRoot": "webpack://app/"}),
+            [("webpack://app/src/api.js", SOURCE_MAP["sourcesContent"][0]),
+             ("webpack://app/src/app.js", SOURCE_MAP["sourcesContent"][1])],
+        )
+        self.assertIsNone(original_sources({**SOURCE_MAP, "sourcesContent": [None, "x"]}))
+        self.assertIsNone(original_sources({"version": 3, "sources": ["a.js"]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
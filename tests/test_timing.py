@@ -0,0 +1,84 @@
+"""
+Unit tests for stage timing.
+
+These tests cover accumulating stages, timing lazy iterables, latency
+percentiles, disabled timers and fixing up timings summed over files.
+"""
+
+import time
+import unittest
+
+from jalapi.utils.stats import add_stats
+from jalapi.utils.timing import StageTimer, finish_totals
+
+
+class TestStageTimer(unittest.TestCase):
+    """Tests for StageTimer and finish_totals."""
+
+    def test_stages_accumulate(self):
+        """Test that repeated runs of a stage add up, with sizes set inside the block."""
+        timer = StageTimer()
+        with timer.stage("regex", 1000):
+            time.sleep(0.01)
+        with timer.stage("regex") as stage:
+            stage.size = 500
+        timer.add("llm", 2.0, 0.1, 4000)
+
+        stages = timer.report()["stages"]
+        self.assertEqual(list(stages), ["regex", "llm"])
+        self.assertEqual((stages["regex"]["bytes"], stages["regex"]["runs"]), (1500, 2))
+        self.assertGreaterEqual(stages["regex"]["wall_s"], 0.01)
+        self.assertEqual(stages["llm"], {"wall_s": 2.0, "cpu_s": 0.1, "bytes": 4000, "bytes_per_s": 2000, "runs": 1})
+        self.assertNotIn("llm_latency", timer.report())
+
+    def test_iterate(self):
+        """Test that only the time spent producing items is counted."""
+        def produce():
+            for size in (10, 20):
+                time.sleep(0.01)
+                yield size
+
+        timer = StageTimer()
+        for _ in timer.iterate("chunking", produce(), size=lambda item: item):
+            time.sleep(0.05)
+
+        stage = timer.report()["stages"]["chunking"]
+        self.assertEqual(stage["bytes"], 30)
+        self.assertGreaterEqual(stage["wall_s"], 0.02)
+        self.assertLess(stage["wall_s"], 0.05)
+
+    def test_latency_percentiles(self):
+        """Test nearest-rank latency percentiles."""
+        timer = StageTimer()
+        for latency in range(100, 0, -1):
+            timer.record_latency(latency / 100)
+
+        latency = timer.report()["llm_latency"]
+        self.assertEqual(latency["requests"], 100)
+        self.assertEqual((latency["p50_s"], latency["p90_s"], latency["p99_s"], latency["max_s"]), (0.5, 0.9, 0.99, 1.0))
+
+    def test_disabled(self):
+        """Test that a disabled timer measures nothing and passes items through."""
+        timer = StageTimer(enabled=False)
+        with timer.stage("load", 10) as stage:
+            stage.size = 20
+        timer.record_latency(1.0)
+        self.assertEqual(list(timer.iterate("chunking", [1, 2])), [1, 2])
+        self.assertEqual(timer.report(), {"stages": {}})
+
+    def test_finish_totals(self):
+        """Test that summed throughputs are recomputed and percentiles replaced by the mean."""
+        totals = {}
+        for wall, latency in ((1.0, 0.2), (3.0, 0.6)):
+            timer = StageTimer()
+            timer.add("regex", wall, wall, 1000)
+            timer.record_latency(latency)
+            add_stats(totals, timer.report())
+
+        finish_totals(totals)
+        self.assertEqual(totals["stages"]["regex"]["bytes_per_s"], 500)
+        self.assertEqual(totals["llm_latency"], {"requests": 2, "total_s": 0.8, "mean_s": 0.4})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Unit tests for token estimation.
+"""
+
+import unittest
+
+from jalapi.utils.tokens import DEFAULT_CONTEXT_TOKENS, context_window, estimate_tokens, request_cost
+
+
+class TestTokens(unittest.TestCase):
+    """Tests for the token utilities."""
+
+    def test_empty(self):
+        """Test that empty text costs nothing."""
+        self.assertEqual(estimate_tokens(""), 0)
+
+    def test_density(self):
+        """Test that symbol-heavy and non-ASCII text costs more tokens per character."""
+        prose = "const requestHandler = createRequestHandler(options)"
+        minified = "a.b(c,d),e[f]=g?h:i,j&&k(l)}" * 2
+        unicode = "ユーザー一覧を取得しました" * 4
+
+        per_char = [estimate_tokens(text) / len(text) for text in (prose, minified, unicode)]
+
+        self.assertLess(per_char[0], per_char[1])
+        self.assertGreaterEqual(per_char[2], 1.0)
+
+    def test_context_window(self):
+        """Test that unknown models fall back to the default window."""
+        self.assertEqual(context_window("claude-3-5-sonnet-20241022"), 200000)
+        self.assertEqual(context_window("unknown-model"), DEFAULT_CONTEXT_TOKENS)
+
+    def test_request_cost(self):
+        """Test that each kind of token is charged at its price, cache tokens at the input price by default."""
+        usage = {"input_tokens": 1000, "cache_write_tokens": 2000, "cached_input_tokens": 4000, "output_tokens": 100}
+
+        prices = {"input": 3.0, "output": 15.0, "cache_write": 3.75, "cache_read": 0.3}
+        self.assertAlmostEqual(request_cost(usage, prices), (3000 + 7500 + 1200 + 1500) / 1e6)
+        self.assertAlmostEqual(request_cost(usage, {"input": 1.0}), 7000 / 1e6)
+
+
+if __name__ == "__main__":
+    unittest.main()
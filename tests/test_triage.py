@@ -0,0 +1,53 @@
+"""
+Unit tests for chunk triage.
+
+These tests check that chunks with network calls or URL-like literals score
+above the default threshold and framework code without them does not.
+"""
+
+import unittest
+
+from jalapi.utils.triage import DEFAULT_TRIAGE_THRESHOLD, count_signals, score_chunk
+
+
+class TestTriage(unittest.TestCase):
+    """Tests for chunk scoring."""
+
+    def test_relevant_chunks(self):
+        """Test that chunks with endpoint signals pass the default threshold."""
+        relevant = [
+            "const r = await fetch(url, { method: 'POST' });",
+            "xhr.open('GET', path);",
+            "const u = new URL(path, window.location.origin);",
+            "return '/api/v1/users/' + id;",
+            "socket = new WebSocket(`wss://${host}/ws`);",
+        ]
+
+        for chunk in relevant:
+            with self.subTest(chunk=chunk):
+                self.assertGreaterEqual(score_chunk(chunk), DEFAULT_TRIAGE_THRESHOLD)
+
+    def test_irrelevant_chunks(self):
+        """Test that framework code without endpoint signals is skipped."""
+        irrelevant = [
+            "function(e){return e.map(function(t){return React.createElement('div',{className:'row'},t)})}",
+            "var n=Object.prototype.hasOwnProperty;function r(e,t){return n.call(e,t)}",
+            "if (typeof Symbol === 'function' && Symbol.iterator) { polyfill(); }",
+        ]
+
+        for chunk in irrelevant:
+            with self.subTest(chunk=chunk):
+                self.assertLess(score_chunk(chunk), DEFAULT_TRIAGE_THRESHOLD)
+
+    def test_signal_counts(self):
+        """Test that each signal is counted separately."""
+        counts = count_signals("axios.get(`${CONFIG.base}/x`); axios.post('/y')")
+
+        self.assertEqual(counts["sink"], 2)
+        self.assertEqual(counts["template_literal"], 1)
+        self.assertEqual(counts["config_reference"], 1)
+        self.assertEqual(counts["url_literal"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Unit tests for vendor library fingerprinting.
+
+These tests check that fingerprints survive re-minification and
+reformatting, that library regions are located inside larger files without
+matching application code, and that databases round-trip through disk.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+from jalapi.utils.reflow import reflow
+from jalapi.utils.source import MappedSource
+from jalapi.utils.vendor import VendorDatabase, fingerprints
+from tests.helpers import load_sample
+
+LIBRARY = load_sample("api-client.min.js")
+APPLICATION = load_sample("enterpriseintegration.js")
+
+
+def rename_short_identifiers(code: str) -> str:
+    """Rename one-letter identifiers, as a second minifier run would."""
+    return re.sub(r"(?<![.\w$])([a-z])(?![\w$])", lambda m: chr((ord(m.group(1)) - 97 + 7) % 26 + 97), code)
+
+
+class TestVendorFingerprints(unittest.TestCase):
+    """Tests for fingerprints and VendorDatabase."""
+
+    def setUp(self):
+        self.database = VendorDatabase()
+        self.database.add_library("api-client", LIBRARY)
+
+    def test_fingerprints_normalized(self):
+        """Test that renaming and reflowing a library keeps its fingerprints."""
+        original = {value for value, _, _ in fingerprints(LIBRARY)}
+
+        for variant in (rename_short_identifiers(LIBRARY), reflow(LIBRARY), LIBRARY.encode()):
+            with self.subTest(variant=variant[:20]):
+                self.assertEqual({value for value, _, _ in fingerprints(variant)}, original)
+
+    def test_windowed_fingerprints(self):
+        """Test that fingerprinting window by window, as for mapped files, changes nothing."""
+        bundle = APPLICATION + "\n" + LIBRARY
+        whole = fingerprints(bundle, window_size=len(bundle))
+
+        for window_size in (64, 1000, 4096):
+            with self.subTest(window_size=window_size):
+                self.assertEqual(fingerprints(bundle, window_size=window_size), whole)
+                self.assertEqual(fingerprints(bundle.encode(), window_size=window_size), whole)
+
+        path = os.path.join(tempfile.mkdtemp(), "bundle.js")
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(bundle)
+        with MappedSource(path) as source:
+            self.assertEqual(fingerprints(source.data, window_size=1000), whole)
+
+    def test_find_regions(self):
+        """Test that an embedded library is located and application code is not matched."""
+        bundle = APPLICATION + "\n" + rename_short_identifiers(LIBRARY) + "\n" + APPLICATION
+        start = len(APPLICATION) + 1
+
+        regions = self.database.find_regions(bundle)
+
+        self.assertEqual(len(regions), 1)
+        self.assertEqual(regions[0].library, "api-client")
+        self.assertGreaterEqual(regions[0].start, start)
+        self.assertLessEqual(regions[0].end, start + len(LIBRARY))
+        self.assertGreater(regions[0].end - regions[0].start, 0.9 * len(LIBRARY))
+        self.assertEqual(self.database.find_regions(APPLICATION), [])
+
+    def test_shared_fingerprints_ignored(self):
+        """Test that fingerprints found in two libraries identify neither."""
+        self.database.add_library("copy", LIBRARY)
+
+        self.assertEqual(self.database.find_regions(LIBRARY), [])
+
+    def test_save_and_load(self):
+        """Test that a saved database finds the same regions after loading."""
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "vendor", "db.json.gz")
+            self.database.save(path)
+            loaded = VendorDatabase.load(path)
+        finally:
+            shutil.rmtree(directory)
+
+        self.assertEqual(loaded.digest, self.database.digest)
+        self.assertEqual(loaded.find_regions(LIBRARY), self.database.find_regions(LIBRARY))
+
+
+if __name__ == "__main__":
+    unittest.main()